@@ -0,0 +1,98 @@
+"""Month-to-date per-category expense counters
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "category_month_totals",
+        sa.Column("household_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("category_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("category_id", "month"),
+        sa.ForeignKeyConstraint(["household_id"], ["pairledger.households.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["category_id"], ["pairledger.categories.id"], ondelete="CASCADE"),
+        schema="pairledger",
+    )
+    op.create_index(
+        "idx_category_month_totals_household", "category_month_totals", ["household_id", "month"], schema="pairledger",
+    )
+
+    # Keep the counters in step with every write to expenses, including bulk
+    # statements: transition tables let each statement apply one aggregated
+    # delta per (category, month) instead of one upsert per row.
+    op.execute("""
+        CREATE FUNCTION pairledger.apply_category_month_totals() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE pairledger.category_month_totals AS t
+                SET total = t.total - d.total, count = t.count - d.count
+                FROM (
+                    SELECT category_id, date_trunc('month', date)::date AS month,
+                           SUM(amount) AS total, COUNT(*) AS count
+                    FROM old_rows
+                    WHERE category_id IS NOT NULL
+                    GROUP BY 1, 2
+                ) AS d
+                WHERE t.category_id = d.category_id AND t.month = d.month;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO pairledger.category_month_totals AS t (household_id, category_id, month, total, count)
+                SELECT household_id, category_id, date_trunc('month', date)::date,
+                       SUM(amount), COUNT(*)
+                FROM new_rows
+                WHERE category_id IS NOT NULL
+                GROUP BY 1, 2, 3
+                ON CONFLICT (category_id, month) DO UPDATE
+                SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_expenses_month_totals_ins AFTER INSERT ON pairledger.expenses
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.apply_category_month_totals()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_expenses_month_totals_upd AFTER UPDATE ON pairledger.expenses
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.apply_category_month_totals()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_expenses_month_totals_del AFTER DELETE ON pairledger.expenses
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.apply_category_month_totals()
+    """)
+
+    # Backfill from existing history
+    op.execute("""
+        INSERT INTO pairledger.category_month_totals (household_id, category_id, month, total, count)
+        SELECT household_id, category_id, date_trunc('month', date)::date, SUM(amount), COUNT(*)
+        FROM pairledger.expenses
+        WHERE category_id IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_expenses_month_totals_del ON pairledger.expenses")
+    op.execute("DROP TRIGGER IF EXISTS trg_expenses_month_totals_upd ON pairledger.expenses")
+    op.execute("DROP TRIGGER IF EXISTS trg_expenses_month_totals_ins ON pairledger.expenses")
+    op.execute("DROP FUNCTION IF EXISTS pairledger.apply_category_month_totals()")
+    op.drop_table("category_month_totals", schema="pairledger")
@@ -0,0 +1,60 @@
+"""Per-household data version for result caching
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ("expenses", "settlements", "incomes", "categories", "recurring_expenses")
+EVENTS = (
+    ("ins", "INSERT", "REFERENCING NEW TABLE AS new_rows"),
+    ("upd", "UPDATE", "REFERENCING NEW TABLE AS new_rows"),
+    ("del", "DELETE", "REFERENCING OLD TABLE AS old_rows"),
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "households",
+        sa.Column("data_version", sa.BigInteger(), nullable=False, server_default="0"),
+        schema="pairledger",
+    )
+
+    # One bump per statement and household, however many rows it touched.
+    op.execute("""
+        CREATE FUNCTION pairledger.bump_household_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                UPDATE pairledger.households SET data_version = data_version + 1
+                WHERE id IN (SELECT household_id FROM old_rows);
+            ELSE
+                UPDATE pairledger.households SET data_version = data_version + 1
+                WHERE id IN (SELECT household_id FROM new_rows);
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    for table in VERSIONED_TABLES:
+        for suffix, event, referencing in EVENTS:
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_version_{suffix} AFTER {event} ON pairledger.{table}
+                {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION pairledger.bump_household_version()
+            """)
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        for suffix, _, _ in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_{suffix} ON pairledger.{table}")
+    op.execute("DROP FUNCTION IF EXISTS pairledger.bump_household_version()")
+    op.drop_column("households", "data_version", schema="pairledger")
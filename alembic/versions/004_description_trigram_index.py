@@ -0,0 +1,24 @@
+"""Trigram index on expense descriptions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public")
+    op.execute("""
+        CREATE INDEX idx_expenses_description_trgm ON pairledger.expenses
+        USING GIN (description public.gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS pairledger.idx_expenses_description_trgm")
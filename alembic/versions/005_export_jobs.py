@@ -0,0 +1,37 @@
+"""Asynchronous export jobs
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("household_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("data_version", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(10), nullable=False, server_default="queued"),
+        sa.Column("size", sa.BigInteger()),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["household_id"], ["pairledger.households.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("household_id", "data_version", name="uq_export_job_version"),
+        sa.CheckConstraint("status IN ('queued', 'running', 'done', 'failed')", name="ck_export_job_status"),
+        schema="pairledger",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("export_jobs", schema="pairledger")
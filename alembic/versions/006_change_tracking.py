@@ -0,0 +1,101 @@
+"""Change tracking and tombstones for delta sync
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ("expenses", "settlements", "incomes", "categories", "recurring_expenses")
+
+
+def upgrade() -> None:
+    for table in TRACKED_TABLES:
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            schema="pairledger",
+        )
+        op.add_column(
+            table,
+            sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default="0"),
+            schema="pairledger",
+        )
+        op.create_index(f"idx_{table}_change_seq", table, ["household_id", "change_seq"], schema="pairledger")
+
+    op.create_table(
+        "tombstones",
+        sa.Column("household_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("table_name", sa.String(40), nullable=False),
+        sa.Column("row_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("change_seq", sa.BigInteger(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("table_name", "row_id"),
+        sa.ForeignKeyConstraint(["household_id"], ["pairledger.households.id"], ondelete="CASCADE"),
+        schema="pairledger",
+    )
+    op.create_index("idx_tombstones_change_seq", "tombstones", ["household_id", "change_seq"], schema="pairledger")
+
+    # Rows written by a statement are stamped with the household's next data
+    # version; the statement-level trigger from 003 then bumps the version to
+    # match. Locking the household row serializes writers per household, so
+    # change_seq values become visible in commit order and a reader's cursor
+    # never skips a row.
+    op.execute("""
+        CREATE FUNCTION pairledger.stamp_change() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            SELECT data_version + 1 INTO NEW.change_seq
+            FROM pairledger.households WHERE id = NEW.household_id
+            FOR UPDATE;
+            NEW.updated_at := now();
+            RETURN NEW;
+        END;
+        $$
+    """)
+    # Named to sort before trg_<table>_version_del, so it sees the version
+    # before the bump.
+    op.execute("""
+        CREATE FUNCTION pairledger.record_tombstones() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO pairledger.tombstones (household_id, table_name, row_id, change_seq)
+            SELECT o.household_id, TG_TABLE_NAME, o.id, h.data_version + 1
+            FROM old_rows o
+            JOIN pairledger.households h ON h.id = o.household_id
+            FOR UPDATE OF h
+            ON CONFLICT (table_name, row_id) DO UPDATE SET change_seq = EXCLUDED.change_seq;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    for table in TRACKED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_stamp_change BEFORE INSERT OR UPDATE ON pairledger.{table}
+            FOR EACH ROW EXECUTE FUNCTION pairledger.stamp_change()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_tombstone AFTER DELETE ON pairledger.{table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION pairledger.record_tombstones()
+        """)
+
+
+def downgrade() -> None:
+    for table in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_tombstone ON pairledger.{table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_stamp_change ON pairledger.{table}")
+    op.execute("DROP FUNCTION IF EXISTS pairledger.record_tombstones()")
+    op.execute("DROP FUNCTION IF EXISTS pairledger.stamp_change()")
+    op.drop_table("tombstones", schema="pairledger")
+    for table in TRACKED_TABLES:
+        op.drop_index(f"idx_{table}_change_seq", table_name=table, schema="pairledger")
+        op.drop_column(table, "change_seq", schema="pairledger")
+        op.drop_column(table, "updated_at", schema="pairledger")
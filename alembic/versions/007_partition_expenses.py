@@ -0,0 +1,171 @@
+"""Range-partition expenses by date (yearly)
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+Requires PostgreSQL 13+ (BEFORE row triggers on partitioned tables).
+"""
+from datetime import date
+
+from alembic import op
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+INDEXES = """
+    CREATE INDEX idx_expenses_household_date ON pairledger.expenses (household_id, date);
+    CREATE INDEX idx_expenses_date ON pairledger.expenses (date);
+    CREATE INDEX idx_expenses_category ON pairledger.expenses (category_id);
+    CREATE INDEX idx_expenses_paid_by ON pairledger.expenses (paid_by);
+    CREATE INDEX idx_expenses_tags ON pairledger.expenses USING GIN (tags);
+    CREATE INDEX idx_expenses_fts ON pairledger.expenses USING GIN(
+        to_tsvector('english', coalesce(description, '') || ' ' || coalesce(notes, ''))
+    );
+    CREATE INDEX idx_expenses_description_trgm ON pairledger.expenses USING GIN (description public.gin_trgm_ops);
+    CREATE INDEX idx_expenses_change_seq ON pairledger.expenses (household_id, change_seq);
+"""
+
+FOREIGN_KEYS = """
+    ALTER TABLE pairledger.expenses ADD CONSTRAINT expenses_household_id_fkey
+        FOREIGN KEY (household_id) REFERENCES pairledger.households (id) ON DELETE CASCADE;
+    ALTER TABLE pairledger.expenses ADD CONSTRAINT expenses_category_id_fkey
+        FOREIGN KEY (category_id) REFERENCES pairledger.categories (id) ON DELETE SET NULL;
+"""
+
+# Triggers from 002 (month totals), 003 (data version) and 006 (change tracking)
+TRIGGERS = """
+    CREATE TRIGGER trg_expenses_month_totals_ins AFTER INSERT ON pairledger.expenses
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.apply_category_month_totals();
+    CREATE TRIGGER trg_expenses_month_totals_upd AFTER UPDATE ON pairledger.expenses
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.apply_category_month_totals();
+    CREATE TRIGGER trg_expenses_month_totals_del AFTER DELETE ON pairledger.expenses
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.apply_category_month_totals();
+    CREATE TRIGGER trg_expenses_version_ins AFTER INSERT ON pairledger.expenses
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.bump_household_version();
+    CREATE TRIGGER trg_expenses_version_upd AFTER UPDATE ON pairledger.expenses
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.bump_household_version();
+    CREATE TRIGGER trg_expenses_version_del AFTER DELETE ON pairledger.expenses
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.bump_household_version();
+    CREATE TRIGGER trg_expenses_stamp_change BEFORE INSERT OR UPDATE ON pairledger.expenses
+        FOR EACH ROW EXECUTE FUNCTION pairledger.stamp_change();
+    CREATE TRIGGER trg_expenses_tombstone AFTER DELETE ON pairledger.expenses
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION pairledger.record_tombstones();
+"""
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE pairledger.expenses_partitioned (
+            LIKE pairledger.expenses INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (date)
+    """)
+    op.execute("CREATE TABLE pairledger.expenses_default PARTITION OF pairledger.expenses_partitioned DEFAULT")
+
+    # One partition per year from the oldest expense through next year;
+    # anything outside that lands in the default partition until
+    # create_expense_partition() carves out its year.
+    this_year = date.today().year
+    first_year = op.get_bind().exec_driver_sql(
+        "SELECT COALESCE(EXTRACT(YEAR FROM MIN(date))::int, %s) FROM pairledger.expenses" % this_year
+    ).scalar()
+    for year in range(min(first_year, this_year), this_year + 2):
+        op.execute(f"""
+            CREATE TABLE pairledger.expenses_{year} PARTITION OF pairledger.expenses_partitioned
+            FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')
+        """)
+
+    # Copy before any triggers exist on the new table: the counters,
+    # versions and change stamps already reflect these rows.
+    op.execute("INSERT INTO pairledger.expenses_partitioned SELECT * FROM pairledger.expenses")
+    op.execute("DROP TABLE pairledger.expenses")
+    op.execute("ALTER TABLE pairledger.expenses_partitioned RENAME TO expenses")
+    op.execute("ALTER TABLE pairledger.expenses ADD CONSTRAINT expenses_pkey PRIMARY KEY (id, date)")
+    op.execute(FOREIGN_KEYS)
+    op.execute(INDEXES)
+    op.execute(TRIGGERS)
+
+    # Partition maintenance, used by pairledger_api/partitions.py
+    op.execute("""
+        CREATE FUNCTION pairledger.create_expense_partition(year int) RETURNS boolean
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            part text := format('expenses_%s', year);
+            lo date := make_date(year, 1, 1);
+            hi date := make_date(year + 1, 1, 1);
+        BEGIN
+            IF to_regclass(format('pairledger.%I', part)) IS NOT NULL THEN
+                RETURN false;
+            END IF;
+            -- Build the partition standalone, move its rows out of the default
+            -- partition, then attach. Statements against the partitions
+            -- directly don't fire the parent's statement triggers, so the
+            -- move leaves counters, versions and tombstones untouched.
+            EXECUTE format(
+                'CREATE TABLE pairledger.%I (LIKE pairledger.expenses INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', part
+            );
+            EXECUTE format(
+                'ALTER TABLE pairledger.%I ADD CONSTRAINT %I CHECK (date >= %L AND date < %L)',
+                part, part || '_range', lo, hi
+            );
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM pairledger.expenses_default WHERE date >= %L AND date < %L RETURNING *) '
+                'INSERT INTO pairledger.%I SELECT * FROM moved',
+                lo, hi, part
+            );
+            EXECUTE format(
+                'ALTER TABLE pairledger.expenses ATTACH PARTITION pairledger.%I FOR VALUES FROM (%L) TO (%L)',
+                part, lo, hi
+            );
+            EXECUTE format('ALTER TABLE pairledger.%I DROP CONSTRAINT %I', part, part || '_range');
+            RETURN true;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE FUNCTION pairledger.detach_expense_partition(year int) RETURNS boolean
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            part text := format('expenses_%s', year);
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_inherits
+                WHERE inhparent = 'pairledger.expenses'::regclass
+                  AND inhrelid = to_regclass(format('pairledger.%I', part))
+            ) THEN
+                RETURN false;
+            END IF;
+            EXECUTE format('ALTER TABLE pairledger.expenses DETACH PARTITION pairledger.%I', part);
+            RETURN true;
+        END;
+        $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS pairledger.detach_expense_partition(int)")
+    op.execute("DROP FUNCTION IF EXISTS pairledger.create_expense_partition(int)")
+    op.execute("""
+        CREATE TABLE pairledger.expenses_plain (
+            LIKE pairledger.expenses INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        )
+    """)
+    op.execute("INSERT INTO pairledger.expenses_plain SELECT * FROM pairledger.expenses")
+    op.execute("DROP TABLE pairledger.expenses CASCADE")
+    op.execute("ALTER TABLE pairledger.expenses_plain RENAME TO expenses")
+    op.execute("ALTER TABLE pairledger.expenses ADD CONSTRAINT expenses_pkey PRIMARY KEY (id)")
+    op.execute(FOREIGN_KEYS)
+    op.execute(INDEXES.replace(
+        "CREATE INDEX idx_expenses_household_date ON pairledger.expenses (household_id, date);",
+        "CREATE INDEX idx_expenses_household ON pairledger.expenses (household_id);",
+    ))
+    op.execute(TRIGGERS)
@@ -0,0 +1,97 @@
+"""Balance checkpoints (closed periods)
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+WATCHED_TABLES = ("expenses", "settlements")
+TOTAL_COLUMNS = (
+    "a_paid", "b_paid", "shared_total", "equal_total",
+    "a_personal", "b_personal", "settled_a_to_b", "settled_b_to_a",
+)
+TRIGGERS = (
+    ("ins", "INSERT", "REFERENCING NEW TABLE AS new_rows"),
+    ("upd", "UPDATE", "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("del", "DELETE", "REFERENCING OLD TABLE AS old_rows"),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "balance_checkpoints",
+        sa.Column("id", postgresql.UUID(as_uuid=True), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("household_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("through_date", sa.Date(), nullable=False),
+        *(sa.Column(name, sa.Numeric(14, 2), nullable=False, server_default="0") for name in TOTAL_COLUMNS),
+        sa.Column("stale", sa.Boolean(), nullable=False, server_default="false"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["household_id"], ["pairledger.households.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("household_id", "through_date", name="uq_balance_checkpoint_date"),
+        schema="pairledger",
+    )
+
+    # A write dated inside a closed period marks that checkpoint and every
+    # later one stale; the balance endpoint recomputes them on next read.
+    # Locking the household first serializes this with closing a period,
+    # which holds the same lock while it sums.
+    op.execute("""
+        CREATE FUNCTION pairledger.mark_checkpoints_stale() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            household_ids uuid[];
+            first_dates date[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+                FROM (SELECT household_id, MIN(date) AS first_date FROM new_rows GROUP BY 1) AS t;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+                FROM (SELECT household_id, MIN(date) AS first_date FROM old_rows GROUP BY 1) AS t;
+            ELSE
+                SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+                FROM (
+                    SELECT household_id, MIN(date) AS first_date
+                    FROM (SELECT household_id, date FROM old_rows
+                          UNION ALL
+                          SELECT household_id, date FROM new_rows) AS r
+                    GROUP BY 1
+                ) AS t;
+            END IF;
+            IF household_ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            PERFORM 1 FROM pairledger.households WHERE id = ANY(household_ids) ORDER BY id FOR UPDATE;
+            UPDATE pairledger.balance_checkpoints AS c
+            SET stale = true
+            FROM unnest(household_ids, first_dates) AS t(household_id, first_date)
+            WHERE c.household_id = t.household_id AND c.through_date >= t.first_date AND NOT c.stale;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    for table in WATCHED_TABLES:
+        for suffix, event, referencing in TRIGGERS:
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_checkpoint_{suffix} AFTER {event} ON pairledger.{table}
+                {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION pairledger.mark_checkpoints_stale()
+            """)
+
+
+def downgrade() -> None:
+    for table in WATCHED_TABLES:
+        for suffix, _, _ in TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_checkpoint_{suffix} ON pairledger.{table}")
+    op.execute("DROP FUNCTION IF EXISTS pairledger.mark_checkpoints_stale()")
+    op.drop_table("balance_checkpoints", schema="pairledger")
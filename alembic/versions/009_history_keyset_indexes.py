@@ -0,0 +1,33 @@
+"""Keyset pagination indexes for settlements and incomes
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The household_id prefix covers everything the single-column indexes did
+    op.create_index(
+        "idx_settlements_household_keyset", "settlements",
+        ["household_id", "date", "created_at", "id"], schema="pairledger",
+    )
+    op.drop_index("idx_settlements_household", table_name="settlements", schema="pairledger")
+    op.create_index(
+        "idx_incomes_household_keyset", "incomes",
+        ["household_id", "effective_from", "created_at", "id"], schema="pairledger",
+    )
+    op.drop_index("idx_incomes_household", table_name="incomes", schema="pairledger")
+
+
+def downgrade() -> None:
+    op.create_index("idx_incomes_household", "incomes", ["household_id"], schema="pairledger")
+    op.drop_index("idx_incomes_household_keyset", table_name="incomes", schema="pairledger")
+    op.create_index("idx_settlements_household", "settlements", ["household_id"], schema="pairledger")
+    op.drop_index("idx_settlements_household_keyset", table_name="settlements", schema="pairledger")
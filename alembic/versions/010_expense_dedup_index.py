@@ -0,0 +1,38 @@
+"""Hash index for expense de-duplication on import
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Identity of an expense for import de-duplication: household, day,
+    # amount and the description with case and whitespace runs folded.
+    # Days are encoded as an offset so the function stays IMMUTABLE
+    # (date::text depends on DateStyle).
+    op.execute(r"""
+        CREATE FUNCTION pairledger.expense_dedup_key(household_id uuid, day date, amount numeric, description text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT md5(
+                household_id::text || '|' || (day - DATE '2000-01-01')::text || '|' || amount::text || '|'
+                || lower(regexp_replace(btrim(description), '\s+', ' ', 'g'))
+            )
+        $$
+    """)
+    op.execute("""
+        CREATE INDEX idx_expenses_dedup ON pairledger.expenses
+        USING HASH (pairledger.expense_dedup_key(household_id, date, amount, description))
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS pairledger.idx_expenses_dedup")
+    op.execute("DROP FUNCTION IF EXISTS pairledger.expense_dedup_key(uuid, date, numeric, text)")
@@ -0,0 +1,24 @@
+"""Index for the duplicate-expense self-join
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Inner side of the duplicates join: same household and amount, a few days apart
+    op.create_index(
+        "idx_expenses_household_amount_date", "expenses",
+        ["household_id", "amount", "date"], schema="pairledger",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_expenses_household_amount_date", table_name="expenses", schema="pairledger")
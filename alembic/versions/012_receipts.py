@@ -0,0 +1,43 @@
+"""Content-addressed receipt store
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per stored blob (data_dir/receipts/objects/<sha[:2]>/<sha>);
+    # expenses sharing a photo share the row.
+    op.create_table(
+        "receipts",
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("content_type", sa.String(100), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("sha256"),
+        schema="pairledger",
+    )
+    op.add_column(
+        "expenses",
+        sa.Column("receipt_sha256", sa.String(64), sa.ForeignKey("pairledger.receipts.sha256")),
+        schema="pairledger",
+    )
+    # Orphan collection looks receipts up by reference
+    op.create_index(
+        "idx_expenses_receipt", "expenses", ["receipt_sha256"], schema="pairledger",
+        postgresql_where=sa.text("receipt_sha256 IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_expenses_receipt", table_name="expenses", schema="pairledger")
+    op.drop_column("expenses", "receipt_sha256", schema="pairledger")
+    op.drop_table("receipts", schema="pairledger")
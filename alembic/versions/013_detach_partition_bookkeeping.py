@@ -0,0 +1,95 @@
+"""Keep derived state consistent when detaching an expense partition
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+ORIGINAL = """
+    CREATE OR REPLACE FUNCTION pairledger.detach_expense_partition(year int) RETURNS boolean
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        part text := format('expenses_%s', year);
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_inherits
+            WHERE inhparent = 'pairledger.expenses'::regclass
+              AND inhrelid = to_regclass(format('pairledger.%I', part))
+        ) THEN
+            RETURN false;
+        END IF;
+        EXECUTE format('ALTER TABLE pairledger.expenses DETACH PARTITION pairledger.%I', part);
+        RETURN true;
+    END;
+    $$
+"""
+
+
+def upgrade() -> None:
+    # DETACH fires no row or statement triggers, so do by hand what deleting
+    # the year's rows would have: tombstones for sync clients, the year's
+    # month totals, stale checkpoints from Jan 1 on and a data_version bump
+    # for the cache. Households are locked first, in id order, as
+    # mark_checkpoints_stale() does.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION pairledger.detach_expense_partition(year int) RETURNS boolean
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            part text := format('expenses_%s', year);
+            lo date := make_date(year, 1, 1);
+            hi date := make_date(year + 1, 1, 1);
+            household_ids uuid[];
+            fk record;
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_inherits
+                WHERE inhparent = 'pairledger.expenses'::regclass
+                  AND inhrelid = to_regclass(format('pairledger.%I', part))
+            ) THEN
+                RETURN false;
+            END IF;
+
+            EXECUTE format('SELECT array_agg(DISTINCT household_id) FROM pairledger.%I', part) INTO household_ids;
+            IF household_ids IS NOT NULL THEN
+                PERFORM 1 FROM pairledger.households WHERE id = ANY(household_ids) ORDER BY id FOR UPDATE;
+                EXECUTE format(
+                    'INSERT INTO pairledger.tombstones (household_id, table_name, row_id, change_seq) '
+                    'SELECT e.household_id, %L, e.id, h.data_version + 1 '
+                    'FROM pairledger.%I e JOIN pairledger.households h ON h.id = e.household_id '
+                    'ON CONFLICT (table_name, row_id) DO UPDATE SET change_seq = EXCLUDED.change_seq',
+                    'expenses', part
+                );
+                DELETE FROM pairledger.category_month_totals
+                WHERE household_id = ANY(household_ids) AND month >= lo AND month < hi;
+                UPDATE pairledger.balance_checkpoints
+                SET stale = true
+                WHERE household_id = ANY(household_ids) AND through_date >= lo AND NOT stale;
+                UPDATE pairledger.households SET data_version = data_version + 1
+                WHERE id = ANY(household_ids);
+            END IF;
+
+            EXECUTE format('ALTER TABLE pairledger.expenses DETACH PARTITION pairledger.%I', part);
+
+            -- The detached rows are out of the ledger; don't let their
+            -- receipt references block orphan collection
+            FOR fk IN
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = to_regclass(format('pairledger.%I', part))
+                  AND confrelid = 'pairledger.receipts'::regclass
+            LOOP
+                EXECUTE format('ALTER TABLE pairledger.%I DROP CONSTRAINT %I', part, fk.conname);
+            END LOOP;
+            RETURN true;
+        END;
+        $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute(ORIGINAL)
@@ -0,0 +1,25 @@
+"""Export job ownership and heartbeats
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Workers in any process claim queued jobs; a running job whose owner
+    # stopped heartbeating is failed instead of every job at startup
+    op.add_column("export_jobs", sa.Column("owner", sa.String(64)), schema="pairledger")
+    op.add_column("export_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True)), schema="pairledger")
+
+
+def downgrade() -> None:
+    op.drop_column("export_jobs", "heartbeat_at", schema="pairledger")
+    op.drop_column("export_jobs", "owner", schema="pairledger")
@@ -0,0 +1,108 @@
+"""Only balance-relevant updates mark checkpoints stale
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "015"
+down_revision = "014"
+branch_labels = None
+depends_on = None
+
+ORIGINAL = """
+    CREATE OR REPLACE FUNCTION pairledger.mark_checkpoints_stale() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        household_ids uuid[];
+        first_dates date[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+            FROM (SELECT household_id, MIN(date) AS first_date FROM new_rows GROUP BY 1) AS t;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+            FROM (SELECT household_id, MIN(date) AS first_date FROM old_rows GROUP BY 1) AS t;
+        ELSE
+            SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+            FROM (
+                SELECT household_id, MIN(date) AS first_date
+                FROM (SELECT household_id, date FROM old_rows
+                      UNION ALL
+                      SELECT household_id, date FROM new_rows) AS r
+                GROUP BY 1
+            ) AS t;
+        END IF;
+        IF household_ids IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        PERFORM 1 FROM pairledger.households WHERE id = ANY(household_ids) ORDER BY id FOR UPDATE;
+        UPDATE pairledger.balance_checkpoints AS c
+        SET stale = true
+        FROM unnest(household_ids, first_dates) AS t(household_id, first_date)
+        WHERE c.household_id = t.household_id AND c.through_date >= t.first_date AND NOT c.stale;
+        RETURN NULL;
+    END;
+    $$
+"""
+
+
+def upgrade() -> None:
+    # Statement triggers with transition tables can't take a column list, so
+    # UPDATEs compare each row's balance columns old vs new by id. Tag, note,
+    # category and receipt edits (and category deletes via SET NULL) no longer
+    # force every later checkpoint to be rebuilt.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION pairledger.mark_checkpoints_stale() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            household_ids uuid[];
+            first_dates date[];
+            -- Columns that feed a balance; edits to anything else leave it alone
+            balance_columns text[] := CASE TG_TABLE_NAME
+                WHEN 'expenses' THEN ARRAY['amount', 'paid_by', 'split_type', 'date', 'household_id']
+                ELSE ARRAY['amount', 'from_user', 'to_user', 'date', 'household_id']
+            END;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+                FROM (SELECT household_id, MIN(date) AS first_date FROM new_rows GROUP BY 1) AS t;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+                FROM (SELECT household_id, MIN(date) AS first_date FROM old_rows GROUP BY 1) AS t;
+            ELSE
+                WITH changed AS (
+                    SELECT o.id
+                    FROM old_rows o
+                    JOIN new_rows n ON n.id = o.id
+                    WHERE ARRAY(SELECT to_jsonb(o) -> k FROM unnest(balance_columns) AS k)
+                          IS DISTINCT FROM ARRAY(SELECT to_jsonb(n) -> k FROM unnest(balance_columns) AS k)
+                )
+                SELECT array_agg(household_id), array_agg(first_date) INTO household_ids, first_dates
+                FROM (
+                    SELECT household_id, MIN(date) AS first_date
+                    FROM (SELECT household_id, date FROM old_rows WHERE id IN (SELECT id FROM changed)
+                          UNION ALL
+                          SELECT household_id, date FROM new_rows WHERE id IN (SELECT id FROM changed)) AS r
+                    GROUP BY 1
+                ) AS t;
+            END IF;
+            IF household_ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            PERFORM 1 FROM pairledger.households WHERE id = ANY(household_ids) ORDER BY id FOR UPDATE;
+            UPDATE pairledger.balance_checkpoints AS c
+            SET stale = true
+            FROM unnest(household_ids, first_dates) AS t(household_id, first_date)
+            WHERE c.household_id = t.household_id AND c.through_date >= t.first_date AND NOT c.stale;
+            RETURN NULL;
+        END;
+        $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute(ORIGINAL)
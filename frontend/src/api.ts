@@ -1,17 +1,38 @@
 import type {
   Household,
   Income,
+  IncomeListResponse,
+  HistorySummary,
+  IncomeFilters,
   SplitRatio,
   Category,
+  CategoryMergeResult,
   Expense,
   ExpenseListResponse,
+  ExpenseFilterSet,
+  ExpenseBulkResult,
+  DuplicateGroup,
+  DuplicateResolveResult,
   Settlement,
+  SettlementListResponse,
+  SettlementFilters,
   RecurringExpense,
   Balance,
+  BalanceCheckpoint,
   MonthlySummary,
   CategorySpending,
   MonthlyTrend,
+  TrendResponse,
+  TagSpending,
+  CompareResponse,
+  ForecastResponse,
+  BudgetStatusResponse,
   SearchResult,
+  DescriptionSuggestion,
+  ExportJob,
+  SyncResponse,
+  CsvImportOptions,
+  CsvImportResult,
 } from "./types";
 
 const BASE = "/api";
@@ -34,6 +55,12 @@ async function request<T>(path: string, init?: RequestInit): Promise<T> {
   return res.json();
 }
 
+function toQuery(params?: object): URLSearchParams {
+  const qs = new URLSearchParams();
+  for (const [k, v] of Object.entries(params || {})) if (v != null) qs.set(k, String(v));
+  return qs;
+}
+
 // Household
 export const getHousehold = () => request<Household>("/household");
 export const createHousehold = (name?: string) =>
@@ -55,7 +82,10 @@ export const regenerateInvite = () =>
   request<Household>("/household/regenerate-invite", { method: "POST" });
 
 // Income
-export const getIncomes = () => request<Income[]>("/incomes");
+export const getIncomes = (params?: IncomeFilters & { cursor?: string; limit?: number }) =>
+  request<IncomeListResponse>(`/incomes?${toQuery(params)}`);
+export const getIncomeSummary = (params?: IncomeFilters) =>
+  request<HistorySummary>(`/incomes/summary?${toQuery(params)}`);
 export const createIncome = (data: {
   amount: number;
   effective_from: string;
@@ -84,6 +114,10 @@ export const updateCategory = (id: string, data: Record<string, unknown>) =>
   });
 export const deleteCategory = (id: string) =>
   request<void>(`/categories/${id}`, { method: "DELETE" });
+export const mergeCategory = (id: string, targetId: string) =>
+  request<CategoryMergeResult>(`/categories/${id}/merge-into/${targetId}`, {
+    method: "POST",
+  });
 
 // Expenses
 export const getExpenses = (params?: {
@@ -94,6 +128,8 @@ export const getExpenses = (params?: {
   category_id?: string;
   paid_by?: string;
   split_type?: string;
+  tags_all?: string[];
+  tags_any?: string[];
 }) => {
   const qs = new URLSearchParams();
   if (params?.page) qs.set("page", String(params.page));
@@ -103,6 +139,8 @@ export const getExpenses = (params?: {
   if (params?.category_id) qs.set("category_id", params.category_id);
   if (params?.paid_by) qs.set("paid_by", params.paid_by);
   if (params?.split_type) qs.set("split_type", params.split_type);
+  params?.tags_all?.forEach((t) => qs.append("tags_all", t));
+  params?.tags_any?.forEach((t) => qs.append("tags_any", t));
   return request<ExpenseListResponse>(`/expenses?${qs}`);
 };
 export const getExpense = (id: string) => request<Expense>(`/expenses/${id}`);
@@ -124,9 +162,52 @@ export const updateExpense = (id: string, data: Record<string, unknown>) =>
   });
 export const deleteExpense = (id: string) =>
   request<void>(`/expenses/${id}`, { method: "DELETE" });
+export const bulkUpdateExpenses = (data: {
+  ids?: string[];
+  filters?: ExpenseFilterSet;
+  changes: Record<string, unknown>;
+}) =>
+  request<ExpenseBulkResult>("/expenses/bulk", {
+    method: "PATCH",
+    body: JSON.stringify(data),
+  });
+export const bulkDeleteExpenses = (data: {
+  ids?: string[];
+  filters?: ExpenseFilterSet;
+}) =>
+  request<ExpenseBulkResult>("/expenses/bulk", {
+    method: "DELETE",
+    body: JSON.stringify(data),
+  });
+export const uploadReceipt = (id: string, file: File) =>
+  request<Expense>(`/expenses/${id}/receipt`, {
+    method: "POST",
+    headers: { "Content-Type": file.type || "application/octet-stream" },
+    body: file,
+  });
+export const deleteReceipt = (id: string) =>
+  request<void>(`/expenses/${id}/receipt`, { method: "DELETE" });
+export const findDuplicateExpenses = (params?: {
+  days?: number;
+  min_similarity?: number;
+  date_from?: string;
+  date_to?: string;
+  max_groups?: number;
+}) => request<DuplicateGroup[]>(`/expenses/duplicates?${toQuery(params)}`);
+export const resolveDuplicateExpenses = (data: {
+  groups: { keep: string; remove: string[] }[];
+  merge?: boolean;
+}) =>
+  request<DuplicateResolveResult>("/expenses/duplicates/resolve", {
+    method: "POST",
+    body: JSON.stringify(data),
+  });
 
 // Settlements
-export const getSettlements = () => request<Settlement[]>("/settlements");
+export const getSettlements = (params?: SettlementFilters & { cursor?: string; limit?: number }) =>
+  request<SettlementListResponse>(`/settlements?${toQuery(params)}`);
+export const getSettlementSummary = (params?: SettlementFilters) =>
+  request<HistorySummary>(`/settlements/summary?${toQuery(params)}`);
 export const createSettlement = (data: {
   from_user: string;
   to_user: string;
@@ -166,6 +247,14 @@ export const deleteRecurring = (id: string) =>
 
 // Balance & Stats
 export const getBalance = () => request<Balance>("/balance");
+export const closeBalancePeriod = (through_date?: string) =>
+  request<BalanceCheckpoint>("/balance/close", {
+    method: "POST",
+    body: JSON.stringify({ through_date }),
+  });
+export const getBalanceCheckpoints = () => request<BalanceCheckpoint[]>("/balance/checkpoints");
+export const deleteBalanceCheckpoint = (id: string) =>
+  request<void>(`/balance/checkpoints/${id}`, { method: "DELETE" });
 export const getMonthlyStats = (year: number, month: number) =>
   request<MonthlySummary>(`/stats/monthly?year=${year}&month=${month}`);
 export const getCategoryStats = (year?: number, month?: number) => {
@@ -176,13 +265,63 @@ export const getCategoryStats = (year?: number, month?: number) => {
 };
 export const getTrends = (months?: number) =>
   request<MonthlyTrend[]>(`/stats/trends?months=${months || 12}`);
+export const getTrendSeries = (params?: {
+  granularity?: "week" | "month" | "quarter" | "year";
+  periods?: number;
+  series_by?: "category" | "payer";
+}) => {
+  const qs = new URLSearchParams();
+  if (params?.granularity) qs.set("granularity", params.granularity);
+  if (params?.periods) qs.set("periods", String(params.periods));
+  if (params?.series_by) qs.set("series_by", params.series_by);
+  return request<TrendResponse>(`/stats/trends/series?${qs}`);
+};
+export const getTagStats = (year?: number, month?: number) => {
+  const qs = new URLSearchParams();
+  if (year) qs.set("year", String(year));
+  if (month) qs.set("month", String(month));
+  return request<TagSpending[]>(`/stats/tags?${qs}`);
+};
+export const getComparison = (year?: number, month?: number) =>
+  request<CompareResponse>(`/stats/compare?${toQuery({ year, month })}`);
+export const getForecast = (months?: number, history_months?: number) =>
+  request<ForecastResponse>(`/forecast?${toQuery({ months, history_months })}`);
+
+// Budgets
+export const getBudgetStatus = () =>
+  request<BudgetStatusResponse>("/budgets/status");
 
 // Search & Tags
 export const search = (q: string) =>
   request<SearchResult[]>(`/search?q=${encodeURIComponent(q)}`);
+export const suggestDescriptions = (q: string) =>
+  request<DescriptionSuggestion[]>(`/search/suggest?q=${encodeURIComponent(q)}`);
 export const getTags = () => request<string[]>("/tags");
 
+// Sync
+export const sync = (since?: number) =>
+  request<SyncResponse>(since === undefined ? "/sync" : `/sync?since=${since}`);
+
 // Export
 export const exportData = () => {
   window.open(`${BASE}/export`, "_blank");
 };
+export const createExportJob = () =>
+  request<ExportJob>("/export/jobs", { method: "POST" });
+export const getExportJob = (id: string) =>
+  request<ExportJob>(`/export/jobs/${id}`);
+export const downloadExportJob = (job: ExportJob) => {
+  if (job.download_url) window.open(job.download_url, "_blank");
+};
+
+// Import
+export const importCsv = (file: File, options?: CsvImportOptions) => {
+  const { tags, ...rest } = options || {};
+  const qs = toQuery(rest);
+  for (const tag of tags || []) qs.append("tags", tag);
+  return request<CsvImportResult>(`/import/csv?${qs}`, {
+    method: "POST",
+    headers: { "Content-Type": "text/csv" },
+    body: file,
+  });
+};
@@ -8,7 +8,10 @@ interface Props {
 }
 
 export default function IncomeManager({ household, currentUserId }: Props) {
-  const [incomes, setIncomes] = useState<Income[]>([]);
+  const [myIncomes, setMyIncomes] = useState<Income[]>([]);
+  const [myCursor, setMyCursor] = useState<string | null>(null);
+  const [partnerIncomes, setPartnerIncomes] = useState<Income[]>([]);
+  const [partnerCursor, setPartnerCursor] = useState<string | null>(null);
   const [ratio, setRatio] = useState<SplitRatio | null>(null);
   const [showForm, setShowForm] = useState(false);
   const [amount, setAmount] = useState("");
@@ -19,11 +22,51 @@ export default function IncomeManager({ household, currentUserId }: Props) {
   const [error, setError] = useState("");
   const [saving, setSaving] = useState(false);
 
+  const partnerId =
+    household.user_a_id === currentUserId ? household.user_b_id : household.user_a_id;
+
   const load = () => {
-    api.getIncomes().then(setIncomes).catch(() => {});
+    api
+      .getIncomes({ user_id: currentUserId })
+      .then((r) => {
+        setMyIncomes(r.incomes);
+        setMyCursor(r.next_cursor);
+      })
+      .catch(() => {});
+    if (partnerId) {
+      api
+        .getIncomes({ user_id: partnerId })
+        .then((r) => {
+          setPartnerIncomes(r.incomes);
+          setPartnerCursor(r.next_cursor);
+        })
+        .catch(() => {});
+    }
     api.getSplitRatio().then(setRatio).catch(() => {});
   };
 
+  const loadMoreMine = () => {
+    if (!myCursor) return;
+    api
+      .getIncomes({ user_id: currentUserId, cursor: myCursor })
+      .then((r) => {
+        setMyIncomes((prev) => [...prev, ...r.incomes]);
+        setMyCursor(r.next_cursor);
+      })
+      .catch(() => {});
+  };
+
+  const loadMorePartner = () => {
+    if (!partnerId || !partnerCursor) return;
+    api
+      .getIncomes({ user_id: partnerId, cursor: partnerCursor })
+      .then((r) => {
+        setPartnerIncomes((prev) => [...prev, ...r.incomes]);
+        setPartnerCursor(r.next_cursor);
+      })
+      .catch(() => {});
+  };
+
   useEffect(() => {
     load();
   }, []);
@@ -63,9 +106,6 @@ export default function IncomeManager({ household, currentUserId }: Props) {
     }
   };
 
-  const myIncomes = incomes.filter((i) => i.user_id === currentUserId);
-  const partnerIncomes = incomes.filter((i) => i.user_id !== currentUserId);
-
   return (
     <div className="animate-fadeIn">
       <div className="flex items-center justify-between mb-4">
@@ -223,6 +263,14 @@ export default function IncomeManager({ household, currentUserId }: Props) {
                   </button>
                 </div>
               ))}
+              {myCursor && (
+                <button
+                  onClick={loadMoreMine}
+                  className="apple-card rounded-xl px-4 py-2.5 text-sm font-medium text-slate-600 dark:text-slate-300 apple-button shadow-sm w-full"
+                >
+                  Load more
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -251,6 +299,14 @@ export default function IncomeManager({ household, currentUserId }: Props) {
                     </div>
                   </div>
                 ))}
+                {partnerCursor && (
+                  <button
+                    onClick={loadMorePartner}
+                    className="apple-card rounded-xl px-4 py-2.5 text-sm font-medium text-slate-600 dark:text-slate-300 apple-button shadow-sm w-full"
+                  >
+                    Load more
+                  </button>
+                )}
               </div>
             )}
           </div>
@@ -16,6 +16,7 @@ export default function SettlementList({
   onSettled,
 }: Props) {
   const [settlements, setSettlements] = useState<Settlement[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [showForm, setShowForm] = useState(false);
   const [amount, setAmount] = useState("");
   const [date, setDate] = useState(new Date().toISOString().slice(0, 10));
@@ -24,7 +25,24 @@ export default function SettlementList({
   const [saving, setSaving] = useState(false);
 
   const load = () => {
-    api.getSettlements().then(setSettlements).catch(() => {});
+    api
+      .getSettlements()
+      .then((r) => {
+        setSettlements(r.settlements);
+        setNextCursor(r.next_cursor);
+      })
+      .catch(() => {});
+  };
+
+  const loadMore = () => {
+    if (!nextCursor) return;
+    api
+      .getSettlements({ cursor: nextCursor })
+      .then((r) => {
+        setSettlements((prev) => [...prev, ...r.settlements]);
+        setNextCursor(r.next_cursor);
+      })
+      .catch(() => {});
   };
 
   useEffect(() => {
@@ -199,6 +217,14 @@ export default function SettlementList({
               </button>
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              className="apple-card rounded-xl px-4 py-2.5 text-sm font-medium text-slate-600 dark:text-slate-300 apple-button shadow-sm w-full"
+            >
+              Load more
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -19,6 +19,22 @@ export interface Income {
   created_at: string;
 }
 
+export interface IncomeListResponse {
+  incomes: Income[];
+  next_cursor: string | null;
+}
+
+export interface IncomeFilters {
+  date_from?: string;
+  date_to?: string;
+  user_id?: string;
+}
+
+export interface HistorySummary {
+  count: number;
+  total: number;
+}
+
 export interface SplitRatio {
   user_a_id: string;
   user_a_income: number;
@@ -37,6 +53,12 @@ export interface Category {
   created_at: string;
 }
 
+export interface CategoryMergeResult {
+  target: Category;
+  expenses_moved: number;
+  recurring_moved: number;
+}
+
 export interface Expense {
   id: string;
   paid_by: string;
@@ -60,6 +82,33 @@ export interface ExpenseListResponse {
   per_page: number;
 }
 
+export interface ExpenseFilterSet {
+  year?: number;
+  month?: number;
+  category_id?: string;
+  paid_by?: string;
+  split_type?: SplitType;
+  tags_all?: string[];
+  tags_any?: string[];
+}
+
+export interface ExpenseBulkResult {
+  count: number;
+  ids: string[];
+}
+
+export interface DuplicateGroup {
+  expenses: Expense[];
+  min_similarity: number;
+  max_days_apart: number;
+}
+
+export interface DuplicateResolveResult {
+  removed: number;
+  merged: number;
+  ids: string[];
+}
+
 export interface Settlement {
   id: string;
   from_user: string;
@@ -70,6 +119,18 @@ export interface Settlement {
   created_at: string;
 }
 
+export interface SettlementListResponse {
+  settlements: Settlement[];
+  next_cursor: string | null;
+}
+
+export interface SettlementFilters {
+  date_from?: string;
+  date_to?: string;
+  from_user?: string;
+  to_user?: string;
+}
+
 export interface RecurringExpense {
   id: string;
   paid_by: string;
@@ -93,6 +154,17 @@ export interface Balance {
   user_b_fair_share: number;
   net_balance: number;
   settlements_total: number;
+  closed_through: string | null;
+}
+
+export interface BalanceCheckpoint {
+  id: string;
+  through_date: string;
+  user_a_paid: number;
+  user_b_paid: number;
+  settlements_total: number;
+  stale: boolean;
+  created_at: string;
 }
 
 export interface MonthlySummary {
@@ -122,6 +194,110 @@ export interface MonthlyTrend {
   personal: number;
 }
 
+export interface TrendPoint {
+  period: string;
+  total: number;
+  shared: number;
+  personal: number;
+  equal: number;
+  count: number;
+}
+
+export interface TrendSeries {
+  key: string | null;
+  label: string;
+  points: TrendPoint[];
+}
+
+export interface TrendResponse {
+  granularity: "week" | "month" | "quarter" | "year";
+  start: string;
+  end: string;
+  totals: TrendPoint[];
+  series: TrendSeries[];
+}
+
+export interface TagSpending {
+  tag: string;
+  total: number;
+  count: number;
+}
+
+export interface PeriodComparison {
+  current: number;
+  previous: number;
+  last_year: number;
+  delta_previous: number;
+  delta_last_year: number;
+  pct_previous: number | null;
+  pct_last_year: number | null;
+}
+
+export interface PayerComparison {
+  user_a: PeriodComparison;
+  user_b: PeriodComparison;
+  difference: number;
+}
+
+export interface ForecastMonth {
+  month: string;
+  recurring: number;
+  discretionary: number;
+  total: number;
+  shared: number;
+  personal: number;
+  equal: number;
+  user_a_share: number;
+  user_b_share: number;
+}
+
+export interface ForecastResponse {
+  history_months: number;
+  user_a_ratio: number;
+  user_b_ratio: number;
+  months: ForecastMonth[];
+  categories: {
+    category_id: string | null;
+    category_name: string;
+    recurring: number;
+    discretionary: number;
+  }[];
+}
+
+export interface CompareResponse {
+  current: string;
+  previous: string;
+  last_year: string;
+  total: PeriodComparison;
+  by_payer: PayerComparison;
+  categories: {
+    category_id: string | null;
+    category_name: string;
+    total: PeriodComparison;
+    by_payer: PayerComparison;
+  }[];
+}
+
+export interface BudgetStatus {
+  category_id: string;
+  category_name: string;
+  category_icon: string | null;
+  budget: number;
+  spent: number;
+  remaining: number;
+  percent_used: number;
+  projected: number;
+  count: number;
+}
+
+export interface BudgetStatusResponse {
+  year: number;
+  month: number;
+  days_elapsed: number;
+  days_in_month: number;
+  categories: BudgetStatus[];
+}
+
 export interface SearchResult {
   id: string;
   description: string;
@@ -130,3 +306,63 @@ export interface SearchResult {
   paid_by: string;
   snippet: string;
 }
+
+export interface DescriptionSuggestion {
+  description: string;
+  count: number;
+  category_id: string | null;
+  category_name: string | null;
+  category_icon: string | null;
+  split_type: SplitType;
+  last_amount: number;
+}
+
+export interface ExportJob {
+  id: string;
+  status: "queued" | "running" | "done" | "failed";
+  data_version: number;
+  size: number | null;
+  error: string | null;
+  created_at: string;
+  finished_at: string | null;
+  download_url: string | null;
+}
+
+export interface SyncResponse {
+  cursor: number;
+  full: boolean;
+  categories: Category[];
+  incomes: Income[];
+  expenses: Expense[];
+  settlements: Settlement[];
+  recurring: RecurringExpense[];
+  deleted: { table: string; id: string }[];
+}
+
+export interface CsvImportOptions {
+  date_column?: string;
+  amount_column?: string;
+  description_column?: string;
+  notes_column?: string;
+  has_header?: boolean;
+  date_format?: string;
+  decimal_comma?: boolean;
+  expense_sign?: "negative" | "positive" | "any";
+  delimiter?: string;
+  encoding?: string;
+  paid_by?: string;
+  category_id?: string;
+  split_type?: "shared" | "personal" | "equal";
+  tags?: string[];
+  dry_run?: boolean;
+}
+
+export interface CsvImportResult {
+  dry_run: boolean;
+  rows: number;
+  imported: number;
+  duplicates: number;
+  skipped: number;
+  errors: number;
+  error_samples: { line: number; error: string }[];
+}
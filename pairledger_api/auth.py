@@ -0,0 +1,241 @@
+"""Opt-in local JWT verification in front of the platform auth dependency.
+
+The platform's ``get_current_user`` is the authority by default: it knows
+about revoked sessions, logouts and app-level checks that a signature check
+can't see. ``auth_local_verify=true`` swaps in :func:`verify_request`, which
+trades those for no per-request round trip; a revoked token then stays valid
+until it expires (or ``auth_cache_ttl``, whichever is first). Enable it only
+once ``auth_jwks_url`` and ``auth_jwt_claims`` match what the auth service
+actually publishes and puts in its tokens.
+
+Tokens are verified in-process against the auth service's signing keys,
+which are fetched from ``auth_jwks_url`` at startup and refreshed in the
+background ahead of ``auth_keys_refresh``, so an authenticated request never
+waits on the auth service. A token signed with a key id we haven't seen
+triggers one rate-limited refresh (key rotation) before it is rejected; if a
+refresh fails the last known keys stay in use.
+
+Verified users are memoized by token hash for ``auth_cache_ttl`` seconds
+(never beyond the token's ``exp``) in a bounded LRU, so repeat requests skip
+signature checks too.
+"""
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+
+import httpx
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+from shelf_auth_middleware import ShelfUser, get_current_user as platform_get_current_user
+
+from .config import settings
+from .tracing import span
+
+logger = logging.getLogger("pairledger.auth")
+
+# ShelfUser field -> JWT claim, where the names differ
+CLAIMS = settings.auth_jwt_claims
+
+
+def _user_from_claims(claims: dict) -> ShelfUser:
+    fields = getattr(ShelfUser, "model_fields", None) or {f.name: f for f in dataclasses.fields(ShelfUser)}
+    return ShelfUser(**{
+        name: claims[CLAIMS.get(name, name)] for name in fields if CLAIMS.get(name, name) in claims
+    })
+
+
+class SigningKeys:
+    """The auth service's JWKS, keyed by ``kid`` and refreshed ahead of expiry."""
+
+    def __init__(self, url: str, refresh_interval: float, min_refresh_interval: float = 30.0):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.keys: dict[str, dict] = {}
+        self.fetched_at: float | None = None
+        self.failures = 0
+        self._attempted_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            await self._fetch()
+
+    async def _fetch(self) -> None:
+        self._attempted_at = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+            keys = {k.get("kid", ""): k for k in response.json()["keys"]}
+        except Exception as e:
+            self.failures += 1
+            logger.warning("Signing key refresh from %s failed: %s", self.url, e)
+            return
+        self.keys = keys
+        self.fetched_at = time.monotonic()
+        self.failures = 0
+
+    def _may_refresh(self) -> bool:
+        return time.monotonic() - self._attempted_at >= self.min_refresh_interval
+
+    async def get(self, kid: str) -> dict | None:
+        key = self.keys.get(kid)
+        if key is None and self._may_refresh():
+            # Possibly a rotated key: re-fetch, at most once per min_refresh_interval.
+            # Checked again under the lock so a burst of unknown kids waiting
+            # on one refresh doesn't queue up refreshes of its own.
+            async with self._lock:
+                if kid not in self.keys and self._may_refresh():
+                    await self._fetch()
+            key = self.keys.get(kid)
+        return key
+
+    async def _run(self) -> None:
+        while True:
+            # Refresh ahead of the interval; retry sooner while the auth service is failing
+            await asyncio.sleep(self.min_refresh_interval if self.failures else self.refresh_interval * 0.8)
+            await self.refresh()
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._run(), name="signing-key-refresh")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+class TokenCache:
+    """Bounded LRU of verified users keyed by SHA-256 of the token."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[ShelfUser, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> ShelfUser | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: bytes, user: ShelfUser, token_expires: float | None) -> None:
+        expires = time.time() + self.ttl
+        if token_expires is not None:
+            expires = min(expires, token_expires)
+        self._entries[key] = (user, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+signing_keys = SigningKeys(
+    settings.auth_jwks_url or f"{settings.auth_url}/.well-known/jwks.json", settings.auth_keys_refresh,
+)
+token_cache = TokenCache(settings.auth_cache_size, settings.auth_cache_ttl)
+# A shared secret means HMAC-signed tokens unless configured otherwise
+ALGORITHMS = settings.auth_jwt_algorithms or (["HS256"] if settings.auth_jwt_secret else ["RS256", "ES256"])
+
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+
+def _token(request: Request) -> str | None:
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials.strip()
+    return request.cookies.get(settings.auth_cookie_name)
+
+
+async def _verify(token: str) -> dict:
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError:
+        raise _unauthorized()
+    if settings.auth_jwt_secret:
+        key = settings.auth_jwt_secret
+    else:
+        key = await signing_keys.get(header.get("kid", ""))
+        if key is None:
+            raise _unauthorized()
+    try:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=ALGORITHMS,
+            audience=settings.auth_jwt_audience,
+            issuer=settings.auth_jwt_issuer,
+            options={"verify_aud": settings.auth_jwt_audience is not None},
+        )
+    except JWTError:
+        raise _unauthorized()
+
+
+async def verify_request(request: Request) -> ShelfUser:
+    """Dependency: the user behind the request's bearer token or session cookie."""
+    token = _token(request)
+    if not token:
+        raise _unauthorized()
+    key = hashlib.sha256(token.encode()).digest()
+    with span("auth.verify") as s:
+        user = token_cache.get(key)
+        if s is not None:
+            s.attributes["auth.cached"] = user is not None
+        if user is None:
+            claims = await _verify(token)
+            if not claims.get(CLAIMS.get("id", "id")):
+                raise _unauthorized()
+            try:
+                user = _user_from_claims(claims)
+            except (TypeError, ValueError):
+                # The token lacks a field ShelfUser requires (pydantic's
+                # ValidationError is a ValueError, a dataclass raises TypeError)
+                raise _unauthorized()
+            token_cache.set(key, user, claims.get("exp"))
+    return user
+
+
+get_current_user = verify_request if settings.auth_local_verify else platform_get_current_user
+
+
+def auth_stats() -> dict:
+    age = time.monotonic() - signing_keys.fetched_at if signing_keys.fetched_at else None
+    return {
+        "local": settings.auth_local_verify,
+        "keys": len(signing_keys.keys),
+        "keys_age_s": round(age, 1) if age is not None else None,
+        "key_refresh_failures": signing_keys.failures,
+        "cache": token_cache.stats(),
+    }
+
+
+async def start_auth() -> None:
+    if not settings.auth_local_verify:
+        return
+    if settings.auth_jwt_secret:
+        if not all(alg.startswith("HS") for alg in ALGORITHMS):
+            raise RuntimeError(f"auth_jwt_secret only verifies HS* tokens; auth_jwt_algorithms is {ALGORITHMS}")
+        return
+    await signing_keys.start()
+
+
+async def stop_auth() -> None:
+    await signing_keys.stop()
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+from uuid import UUID
+
+from .explain import capturing
+from .models import Household
+
+
+class HouseholdCache:
+    """In-process cache of computed results, scoped to a household data version.
+
+    ``households.data_version`` is bumped by triggers on every write to a
+    household's expenses, settlements, incomes, categories and recurring
+    items, so an entry is valid exactly as long as the version it was computed
+    under. When a newer version is seen, the household's older entries are
+    dropped. Households are evicted least-recently-used beyond ``max_households``.
+    """
+
+    def __init__(self, max_households: int = 256, max_entries_per_household: int = 64):
+        self.max_households = max_households
+        self.max_entries_per_household = max_entries_per_household
+        self._entries: OrderedDict[UUID, tuple[int, OrderedDict[Hashable, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, household: Household, key: Hashable, default: Any = None) -> Any:
+        if capturing():
+            # Recompute so the EXPLAIN capture sees the route's queries
+            return default
+        slot = self._entries.get(household.id)
+        if slot is None or slot[0] != household.data_version or key not in slot[1]:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(household.id)
+        slot[1].move_to_end(key)
+        self.hits += 1
+        return slot[1][key]
+
+    def set(self, household: Household, key: Hashable, value: Any) -> None:
+        slot = self._entries.get(household.id)
+        if slot is None or slot[0] < household.data_version:
+            slot = (household.data_version, OrderedDict())
+            self._entries[household.id] = slot
+        elif slot[0] > household.data_version:
+            # Computed from a stale household row; a newer version is cached.
+            return
+        slot[1][key] = value
+        slot[1].move_to_end(key)
+        while len(slot[1]) > self.max_entries_per_household:
+            slot[1].popitem(last=False)
+        self._entries.move_to_end(household.id)
+        while len(self._entries) > self.max_households:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "households": len(self._entries),
+            "entries": sum(len(slot[1]) for slot in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+household_cache = HouseholdCache()
@@ -0,0 +1,145 @@
+"""Streaming gzip/brotli compression for API responses.
+
+Bodies are compressed chunk by chunk as the app sends them, so a streamed
+export never sits in memory whole; each chunk of a multi-part body is
+sync-flushed so the client keeps receiving data as it is produced.
+Responses are left alone when they are small, already encoded (e.g. the
+precompressed SPA assets), partial, of a type not on the allow-list, or the
+client doesn't accept a supported encoding. Brotli is used when the optional
+``brotli`` package is installed and the client prefers it.
+"""
+import zlib
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+# Encodings this process can produce
+SUPPORTED = {"gzip", "br"} if brotli is not None else {"gzip"}
+
+
+def accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip().replace(" ", "")
+        try:
+            if q.startswith("q=") and float(q[2:]) == 0:
+                continue
+        except ValueError:
+            pass
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class GzipStream:
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        out = self._z.compress(chunk)
+        return out + self._z.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliStream:
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        out = self._c.process(chunk)
+        return out + (self._c.finish() if final else self._c.flush())
+
+
+def make_stream(accepted: set[str]) -> GzipStream | BrotliStream | None:
+    if brotli is not None and "br" in accepted:
+        return BrotliStream(settings.compress_brotli_quality)
+    if "gzip" in accepted:
+        return GzipStream(settings.compress_level)
+    return None
+
+
+def _compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return any(
+        media_type == allowed or (allowed.endswith("/*") and media_type.startswith(allowed[:-1]))
+        for allowed in settings.compress_types
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not settings.compress_enabled:
+            return await self.app(scope, receive, send)
+        accepted = set()
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = accepted_encodings(value.decode("latin-1"))
+                break
+        if not accepted & SUPPORTED:
+            return await self.app(scope, receive, send)
+
+        start = None
+        stream = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, stream, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                length = headers.get(b"content-length")
+                if (
+                    message["status"] in (204, 206, 304)
+                    or b"content-encoding" in headers
+                    or not _compressible(headers.get(b"content-type", b"").decode("latin-1"))
+                    or (length is not None and int(length) < settings.compress_min_size)
+                ):
+                    passthrough = True
+                    return await send(message)
+                # Decide on the first body chunk: its size settles unsized bodies
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                if stream is None:
+                    # e.g. http.response.pathsend: the server sends the file itself
+                    passthrough = True
+                    await send(start)
+                return await send(message)
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if stream is None:
+                if not more and len(body) < settings.compress_min_size:
+                    passthrough = True
+                    await send(start)
+                    return await send(message)
+                stream = make_stream(accepted)
+                headers = [
+                    (k, v) for k, v in start.get("headers", [])
+                    if k.lower() not in (b"content-length", b"vary", b"etag")
+                ]
+                vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+                headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+                headers.append((b"content-encoding", stream.encoding.encode()))
+                for k, v in start.get("headers", []):
+                    if k.lower() == b"etag":
+                        # Byte-for-byte different representation: weaken strong validators
+                        headers.append((b"etag", v if v.startswith(b"W/") else b"W/" + v))
+                await send({**start, "headers": headers})
+
+            await send({"type": "http.response.body", "body": stream.compress(body, final=not more), "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
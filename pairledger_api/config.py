@@ -8,12 +8,109 @@ class Settings(BaseSettings):
     base_path: str = "/pairledger"
     app_id: str = "pairledger"
 
+    # Local JWT verification (see auth.py), off by default: the platform's
+    # get_current_user stays the authority. Before turning it on, check
+    # auth_jwks_url and auth_jwt_claims against the auth service. Keys come
+    # from auth_jwks_url (default {auth_url}/.well-known/jwks.json) unless
+    # auth_jwt_secret is set for HS* tokens; verified users are cached per
+    # token for auth_cache_ttl. auth_jwt_algorithms defaults to HS256 with a
+    # secret, else RS256/ES256. auth_jwt_claims maps ShelfUser fields to
+    # claims where the names differ.
+    auth_local_verify: bool = False
+    auth_jwks_url: str | None = None
+    auth_jwt_claims: dict[str, str] = {"id": "sub"}
+    auth_jwt_secret: str | None = None
+    auth_jwt_algorithms: list[str] | None = None
+    auth_jwt_audience: str | None = None
+    auth_jwt_issuer: str | None = None
+    auth_cookie_name: str = "shelf_token"
+    auth_keys_refresh: float = 300.0
+    auth_cache_ttl: float = 60.0
+    auth_cache_size: int = 4096
+
     # Tunable per-system settings
     db_pool_size: int = 5
     db_max_overflow: int = 3
     log_level: str = "INFO"
     workers: int = 1
 
+    # Per-household concurrency limits by route class, and process-wide caps
+    # on the heavy classes so they can't take the whole connection pool.
+    # Requests wait up to limit_max_wait seconds for a slot, then get 429
+    # (household limit) or 503 (process-wide limit) with Retry-After.
+    limit_cheap_per_household: int = 8
+    limit_aggregate_per_household: int = 3
+    limit_bulk_per_household: int = 1
+    limit_aggregate_global: int = 4
+    limit_bulk_global: int = 2
+    limit_max_wait: float = 2.0
+    limit_retry_after: int = 2
+    # Users whose household id is remembered for keying the limits
+    limit_household_map_size: int = 10000
+
+    # Bearer token required by /metrics. When unset, /metrics is open and
+    # must only be reachable from inside the cluster.
+    metrics_token: str | None = None
+
+    # CSV statement import: rows per dedup lookup + INSERT, and upload cap
+    # (uploads are staged under data_dir/imports/tmp before parsing)
+    import_batch_size: int = 1000
+    import_max_bytes: int = 50 * 1024 * 1024
+
+    # Receipt uploads (content-addressed under data_dir/receipts); orphaned
+    # blobs older than the grace period are collected every interval
+    receipt_max_bytes: int = 20 * 1024 * 1024
+    receipt_gc_interval_hours: float = 24.0
+    receipt_gc_grace_hours: float = 24.0
+
+    # Background export jobs, written under data_dir/exports. Workers in every
+    # process claim queued jobs from the table, polling every
+    # export_poll_interval; a running job without a heartbeat for
+    # export_stale_after seconds is failed.
+    export_workers: int = 1
+    export_poll_interval: float = 2.0
+    export_heartbeat_interval: float = 10.0
+    export_stale_after: float = 60.0
+
+    # Access log sampling: route template -> fraction of requests logged.
+    # Errors and requests slower than access_log_slow_ms are always logged.
+    access_log_sample: dict[str, float] = {"/health/live": 0.0, "/health/ready": 0.0, "/health": 0.0}
+    access_log_slow_ms: float = 1000.0
+
+    # Response compression (gzip, or brotli when installed and accepted)
+    compress_enabled: bool = True
+    compress_min_size: int = 1024
+    compress_level: int = 6
+    compress_brotli_quality: int = 4
+    compress_types: list[str] = [
+        "application/json", "application/x-ndjson", "text/*", "application/javascript", "image/svg+xml",
+    ]
+
+    # Tracing: spans are recorded for every request; a trace is exported when
+    # head-sampled, slower than trace_slow_ms, or failed. Exported to
+    # data_dir/traces unless trace_otlp_endpoint (OTLP/HTTP JSON) is set.
+    trace_enabled: bool = True
+    trace_sample_rate: float = 0.0
+    trace_slow_ms: float = 1000.0
+    trace_otlp_endpoint: str | None = None
+    trace_retention_days: int = 7
+
+    # EXPLAIN capture, for debugging only: when enabled, requests sent with an
+    # X-Explain header (equal to explain_token, if set) EXPLAIN ANALYZE every
+    # statement and save the plans under data_dir/explain and in their trace.
+    explain_enabled: bool = False
+    explain_token: str | None = None
+
+    # Background readiness checks behind /health/ready
+    health_check_interval: float = 5.0
+    health_check_timeout: float = 2.0
+    health_max_pool_saturation: float = 1.0
+    # Consecutive saturated checks before readiness fails (6 x 5s = 30s)
+    health_saturated_checks: int = 6
+
+    # Yearly expense partitions created ahead of time at startup
+    partition_years_ahead: int = 1
+
     model_config = {"env_prefix": "SHELF_"}
 
 
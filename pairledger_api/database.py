@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy import text
+from sqlalchemy.pool import NullPool
 
 from .config import settings
 
@@ -11,6 +12,10 @@ if db_url.startswith("postgresql://"):
 engine = create_async_engine(db_url, pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Long-running background work (exports) gets its own unpooled connections so
+# it never holds one of the request pool's slots.
+background_engine = create_async_engine(db_url, poolclass=NullPool)
+
 
 async def get_db():
     async with async_session() as session:
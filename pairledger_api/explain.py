@@ -0,0 +1,262 @@
+"""On-demand EXPLAIN capture for debugging slow routes.
+
+With ``explain_enabled`` set, a request carrying an ``X-Explain`` header
+(whose value must equal ``explain_token`` when one is configured) runs
+``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` on every statement it executes,
+on the same connection and inside the same transaction, just before the
+statement itself. Each EXPLAIN runs in a savepoint that is rolled back, so
+writes and trigger side effects are undone (sequences still advance). The
+household cache is bypassed so cached routes show their queries too.
+
+Plans are appended, one request per line, to
+``data_dir/explain/explain-<date>.jsonl`` and attached as ``db.explain``
+spans to the request's trace, which is always exported; the response's
+``X-Explain-Id`` header is the trace id. The report flags sequential scans
+on ``expenses`` and lists the indexes each route used::
+
+    python -m pairledger_api.explain report --days 1
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import logging
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import event
+
+from .config import settings
+from .tracing import current_span, span
+
+logger = logging.getLogger("pairledger.explain")
+
+EXPLAIN_DIR = Path(settings.data_dir) / "explain"
+
+# Statements EXPLAIN accepts; SET, SAVEPOINT etc. are executed unexplained
+_EXPLAINABLE = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH|VALUES|MERGE)\b", re.IGNORECASE)
+# The parent table and its yearly/default partitions
+_EXPENSES = re.compile(r"expenses(_\d{4}|_default)?")
+_SCAN_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+_captured: ContextVar[list | None] = ContextVar("pairledger_explain", default=None)
+
+
+def capturing() -> bool:
+    return _captured.get() is not None
+
+
+# ── Plan analysis ────────────────────────────────────────────────────────
+
+def plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def summarize(plan: dict) -> dict:
+    """Sequential scans on expenses and indexes used by one EXPLAIN document."""
+    seq_scans, indexes = [], []
+    for node in plan_nodes(plan["Plan"]):
+        if node["Node Type"] == "Seq Scan" and _EXPENSES.fullmatch(node.get("Relation Name", "")):
+            seq_scans.append({
+                "relation": node["Relation Name"],
+                "rows": node.get("Actual Rows", 0) * node.get("Actual Loops", 1),
+                "removed": node.get("Rows Removed by Filter", 0),
+            })
+        elif node["Node Type"] in _SCAN_NODES:
+            indexes.append(node["Index Name"])
+    return {"seq_scans": seq_scans, "indexes": indexes, "execution_ms": plan.get("Execution Time")}
+
+
+# ── Capture ──────────────────────────────────────────────────────────────
+
+def _explain(dbapi_connection, statement: str, parameters) -> dict:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT pairledger_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+            document = cursor.fetchone()[0]
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT pairledger_explain")
+            cursor.execute("RELEASE SAVEPOINT pairledger_explain")
+    finally:
+        cursor.close()
+    return (json.loads(document) if isinstance(document, str) else document)[0]
+
+
+def capture_explain(sync_engine) -> None:
+    """EXPLAIN ANALYZE each statement on ``sync_engine`` while a request is capturing.
+
+    Register before the timing and tracing listeners so the EXPLAIN's own
+    run isn't counted as the statement's time.
+    """
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        captured = _captured.get()
+        if captured is None or executemany or not _EXPLAINABLE.match(statement):
+            return
+        entry = {"statement": statement}
+        with span("db.explain", **{"db.statement": statement[:1000]}) as s:
+            started = time.perf_counter()
+            try:
+                plan = _explain(conn.connection.dbapi_connection, statement, parameters)
+            except Exception as e:
+                entry["error"] = str(e)
+            else:
+                entry["plan"] = plan
+                if s is not None:
+                    summary = summarize(plan)
+                    s.attributes.update({
+                        "db.plan": json.dumps(plan, separators=(",", ":")),
+                        "db.plan.seq_scans": ",".join(x["relation"] for x in summary["seq_scans"]),
+                        "db.plan.indexes": ",".join(summary["indexes"]),
+                    })
+            entry["explain_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        captured.append(entry)
+
+
+_pruned: date | None = None
+
+
+def _write(record: dict) -> None:
+    global _pruned
+    today = date.today()
+    if today != _pruned:
+        # Kept as long as the traces they belong to
+        _pruned = today
+        EXPLAIN_DIR.mkdir(parents=True, exist_ok=True)
+        cutoff = (today - timedelta(days=settings.trace_retention_days)).isoformat()
+        for path in EXPLAIN_DIR.glob("explain-*.jsonl"):
+            if path.stem.removeprefix("explain-") < cutoff:
+                path.unlink(missing_ok=True)
+    with open(EXPLAIN_DIR / f"explain-{today.isoformat()}.jsonl", "a") as f:
+        f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+
+def _requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-explain":
+            if settings.explain_token is None:
+                return True
+            return hmac.compare_digest(value, settings.explain_token.encode())
+    return False
+
+
+class ExplainMiddleware:
+    """Turns on capture for requests asking for it; must run inside ``TracingMiddleware``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.explain_enabled or not _requested(scope):
+            return await self.app(scope, receive, send)
+
+        root = current_span()
+        if root is not None:
+            root.trace.sampled = True
+            explain_id = root.trace.trace_id
+        else:
+            explain_id = f"{time.time_ns():x}"
+        captured: list = []
+        token = _captured.set(captured)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-explain-id", explain_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _captured.reset(token)
+            matched = scope.get("route")
+            record = {
+                "id": explain_id,
+                "time": time.time(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(matched, "path", None) or scope["path"],
+                "status": status,
+                "statements": captured,
+            }
+            try:
+                await asyncio.to_thread(_write, record)
+            except Exception:
+                logger.exception("Failed to write EXPLAIN capture %s", explain_id)
+
+
+# ── Report ───────────────────────────────────────────────────────────────
+
+def _records(days: int) -> Iterator[dict]:
+    first = (date.today() - timedelta(days=days - 1)).isoformat()
+    for path in sorted(EXPLAIN_DIR.glob("explain-*.jsonl")):
+        if path.stem.removeprefix("explain-") >= first:
+            with open(path) as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+def report(days: int, route_prefix: str | None = None) -> int:
+    """Print per-route index usage and sequential scans on expenses; returns the scan count."""
+    routes: dict[str, dict] = defaultdict(lambda: {"requests": 0, "statements": 0, "errors": 0, "indexes": Counter(), "seq_scans": []})
+    for record in _records(days):
+        name = f"{record['method']} {record['route']}"
+        if route_prefix and not record["route"].startswith(route_prefix):
+            continue
+        stats = routes[name]
+        stats["requests"] += 1
+        for entry in record["statements"]:
+            stats["statements"] += 1
+            if "plan" not in entry:
+                stats["errors"] += 1
+                continue
+            summary = summarize(entry["plan"])
+            stats["indexes"].update(summary["indexes"])
+            for scan in summary["seq_scans"]:
+                stats["seq_scans"].append((scan, " ".join(entry["statement"].split())[:160], record["id"]))
+
+    flagged = 0
+    for name in sorted(routes):
+        stats = routes[name]
+        print(f"{name}  ({stats['requests']} requests, {stats['statements']} statements"
+              + (f", {stats['errors']} not explained" if stats["errors"] else "") + ")")
+        if stats["indexes"]:
+            print("  indexes: " + ", ".join(f"{index} ×{n}" for index, n in stats["indexes"].most_common()))
+        else:
+            print("  indexes: none")
+        for scan, statement, explain_id in stats["seq_scans"]:
+            flagged += 1
+            print(f"  SEQ SCAN {scan['relation']}: {scan['rows']} rows kept, {scan['removed']} filtered  [{explain_id}]")
+            print(f"    {statement}")
+    if not routes:
+        print(f"No captures in {EXPLAIN_DIR} for the last {days} day(s)")
+    return flagged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m pairledger_api.explain")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="index usage and sequential scans on expenses per route")
+    rep.add_argument("--days", type=int, default=1, help="captures from the last N days")
+    rep.add_argument("--route", default=None, help="only routes starting with this prefix")
+    args = parser.parse_args()
+
+    flagged = report(args.days, args.route)
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import socket
+from datetime import timedelta
+from pathlib import Path
+from uuid import UUID
+
+from sqlalchemy import select, update, delete, func
+
+from .config import settings
+from .database import background_engine
+from .models import Household, Income, Category, Expense, Settlement, RecurringExpense, ExportJob
+
+logger = logging.getLogger("pairledger.exports")
+
+EXPORTS_DIR = Path(settings.data_dir) / "exports"
+BATCH_SIZE = 1000
+
+_workers: list[asyncio.Task] = []
+
+
+# ── Row serializers (shared with the synchronous /api/export) ────────────
+
+def household_dict(h) -> dict:
+    return {
+        "name": h.name,
+        "user_a_id": str(h.user_a_id),
+        "user_b_id": str(h.user_b_id) if h.user_b_id else None,
+    }
+
+
+def category_dict(c) -> dict:
+    return {
+        "name": c.name,
+        "icon": c.icon,
+        "color": c.color,
+        "budget_monthly": float(c.budget_monthly) if c.budget_monthly else None,
+    }
+
+
+def income_dict(i) -> dict:
+    return {
+        "user_id": str(i.user_id),
+        "amount": float(i.amount),
+        "effective_from": i.effective_from.isoformat(),
+        "notes": i.notes,
+    }
+
+
+def expense_dict(e, cat_map: dict) -> dict:
+    return {
+        "paid_by": str(e.paid_by),
+        "category": cat_map.get(e.category_id, None),
+        "amount": float(e.amount),
+        "description": e.description,
+        "date": e.date.isoformat(),
+        "split_type": e.split_type,
+        "notes": e.notes,
+        "tags": e.tags or [],
+    }
+
+
+def settlement_dict(s) -> dict:
+    return {
+        "from_user": str(s.from_user),
+        "to_user": str(s.to_user),
+        "amount": float(s.amount),
+        "date": s.date.isoformat(),
+        "notes": s.notes,
+    }
+
+
+def recurring_dict(r, cat_map: dict) -> dict:
+    return {
+        "paid_by": str(r.paid_by),
+        "category": cat_map.get(r.category_id, None),
+        "amount": float(r.amount),
+        "description": r.description,
+        "split_type": r.split_type,
+        "frequency": r.frequency,
+        "day_of_month": r.day_of_month,
+        "active": r.active,
+    }
+
+
+# ── Background export jobs ───────────────────────────────────────────────
+#
+# Jobs are claimed from the export_jobs table (FOR UPDATE SKIP LOCKED), so any
+# process's workers can run any process's jobs and no job runs twice. A
+# running job's heartbeat_at is refreshed every export_heartbeat_interval;
+# a job whose owner stopped heartbeating for export_stale_after seconds
+# (crash, kill, lost connection) is failed so the client can retry it.
+# Finishing writes are conditional on still owning the job.
+
+# This process's workers, as recorded in export_jobs.owner
+OWNER = f"{socket.gethostname()[:40]}:{os.getpid()}:{os.urandom(4).hex()}"
+
+_wakeup: asyncio.Event | None = None
+
+
+def export_path(job_id: UUID) -> Path:
+    return EXPORTS_DIR / f"{job_id}.json.gz"
+
+
+def _part_path(job_id: UUID) -> Path:
+    # Per owner, so a job re-run after being declared stale can't share a file
+    return EXPORTS_DIR / f"{job_id}.{OWNER.replace(':', '-')}.part"
+
+
+def _write_rows(out, rows, to_dict, leading_comma: bool) -> None:
+    chunk = ",".join(json.dumps(to_dict(r), default=str) for r in rows)
+    if chunk:
+        out.write(("," if leading_comma else "") + chunk)
+
+
+async def _write_export(household_id: UUID, part: Path) -> None:
+    """Stream the household's data into a gzip file at ``part``.
+
+    Runs in one REPEATABLE READ transaction on a dedicated connection so the
+    file is a consistent snapshot. Rows are fetched through a server-side
+    cursor and encoded/compressed in a worker thread, a batch at a time.
+    """
+    EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    async with background_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+        async with conn.begin():
+            household = (await conn.execute(select(*Household.__table__.c).where(Household.id == household_id))).one()
+            categories = (
+                await conn.execute(
+                    select(*Category.__table__.c).where(Category.household_id == household_id).order_by(Category.name)
+                )
+            ).all()
+            cat_map = {c.id: c.name for c in categories}
+
+            sections = [
+                ("incomes", select(*Income.__table__.c).where(Income.household_id == household_id)
+                    .order_by(Income.effective_from), income_dict),
+                ("expenses", select(*Expense.__table__.c).where(Expense.household_id == household_id)
+                    .order_by(Expense.date), lambda e: expense_dict(e, cat_map)),
+                ("settlements", select(*Settlement.__table__.c).where(Settlement.household_id == household_id)
+                    .order_by(Settlement.date), settlement_dict),
+                ("recurring_expenses", select(*RecurringExpense.__table__.c)
+                    .where(RecurringExpense.household_id == household_id), lambda r: recurring_dict(r, cat_map)),
+            ]
+
+            out = await asyncio.to_thread(gzip.open, part, "wt", encoding="utf-8")
+            try:
+                header = json.dumps({"app": "pairledger", "version": "1.0.0", "household": household_dict(household)})
+                categories_json = json.dumps([category_dict(c) for c in categories])
+                await asyncio.to_thread(out.write, f'{header[:-1]}, "categories": {categories_json}')
+                for name, stmt, to_dict in sections:
+                    await asyncio.to_thread(out.write, f', "{name}": [')
+                    result = await conn.stream(stmt)
+                    first = True
+                    async for rows in result.partitions(BATCH_SIZE):
+                        await asyncio.to_thread(_write_rows, out, rows, to_dict, not first)
+                        first = False
+                    await asyncio.to_thread(out.write, "]")
+                await asyncio.to_thread(out.write, "}")
+            finally:
+                await asyncio.to_thread(out.close)
+
+
+async def _claim():
+    """Mark the oldest queued job as running under this process; None if there is none."""
+    oldest = (
+        select(ExportJob.id).where(ExportJob.status == "queued")
+        .order_by(ExportJob.created_at).limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    async with background_engine.begin() as conn:
+        return (
+            await conn.execute(
+                update(ExportJob).where(ExportJob.id == oldest)
+                .values(status="running", owner=OWNER, heartbeat_at=func.now())
+                .returning(ExportJob.id, ExportJob.household_id, ExportJob.data_version)
+            )
+        ).one_or_none()
+
+
+async def _heartbeat(job_id: UUID) -> None:
+    while True:
+        await asyncio.sleep(settings.export_heartbeat_interval)
+        try:
+            async with background_engine.begin() as conn:
+                await conn.execute(
+                    update(ExportJob).where(ExportJob.id == job_id, ExportJob.owner == OWNER)
+                    .values(heartbeat_at=func.now())
+                )
+        except Exception:
+            logger.warning("Heartbeat for export job %s failed", job_id, exc_info=True)
+
+
+async def _fail_stale() -> None:
+    async with background_engine.begin() as conn:
+        stale = (
+            await conn.execute(
+                update(ExportJob)
+                .where(
+                    ExportJob.status == "running",
+                    # Jobs from before heartbeats existed have none
+                    func.coalesce(ExportJob.heartbeat_at, ExportJob.created_at)
+                    < func.now() - timedelta(seconds=settings.export_stale_after),
+                )
+                .values(status="failed", error="Export worker stopped responding", finished_at=func.now())
+                .returning(ExportJob.id)
+            )
+        ).scalars().all()
+    for job_id in stale:
+        logger.warning("Export job %s failed: no heartbeat for %ss", job_id, settings.export_stale_after)
+
+
+async def _run_job(job) -> None:
+    part = _part_path(job.id)
+    heartbeat = asyncio.create_task(_heartbeat(job.id))
+    try:
+        await _write_export(job.household_id, part)
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.id)
+        part.unlink(missing_ok=True)
+        async with background_engine.begin() as conn:
+            await conn.execute(
+                update(ExportJob).where(ExportJob.id == job.id, ExportJob.owner == OWNER)
+                .values(status="failed", error=str(exc)[:500], finished_at=func.now())
+            )
+        return
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+    size = part.stat().st_size
+    async with background_engine.begin() as conn:
+        owned = (
+            await conn.execute(
+                update(ExportJob).where(ExportJob.id == job.id, ExportJob.owner == OWNER, ExportJob.status == "running")
+                .values(status="done", size=size, finished_at=func.now())
+                .returning(ExportJob.id)
+            )
+        ).first()
+        if not owned:
+            # Declared stale and possibly re-run elsewhere meanwhile
+            part.unlink(missing_ok=True)
+            logger.warning("Export job %s was taken over; discarding this run", job.id)
+            return
+        os.replace(part, export_path(job.id))
+        # Older finished exports of this household are superseded
+        superseded = (
+            await conn.execute(
+                delete(ExportJob)
+                .where(
+                    ExportJob.household_id == job.household_id,
+                    ExportJob.data_version < job.data_version,
+                    ExportJob.status.in_(["done", "failed"]),
+                )
+                .returning(ExportJob.id)
+            )
+        ).scalars().all()
+    for old_id in superseded:
+        export_path(old_id).unlink(missing_ok=True)
+    logger.info("Export job %s done (%d bytes)", job.id, size)
+
+
+async def _worker() -> None:
+    while True:
+        try:
+            await _fail_stale()
+            job = await _claim()
+        except Exception:
+            logger.exception("Export worker could not claim a job")
+            job = None
+        if job is None:
+            # Woken early by a job queued in this process; jobs queued
+            # elsewhere are picked up on the next poll
+            try:
+                await asyncio.wait_for(_wakeup.wait(), settings.export_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            continue
+        try:
+            await _run_job(job)
+        except Exception:
+            logger.exception("Export worker error on job %s", job.id)
+
+
+def wake_export_workers() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def start_export_workers() -> None:
+    """Start this process's export workers; they share the job table with other processes."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    _workers.extend(asyncio.create_task(_worker(), name="export-worker") for _ in range(settings.export_workers))
+
+
+async def stop_export_workers() -> None:
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    await background_engine.dispose()
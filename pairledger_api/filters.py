@@ -0,0 +1,67 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import extract
+
+from .models import Expense
+
+
+def normalize_tags(tags: list[str] | None) -> list[str]:
+    """Strip, lowercase and de-duplicate tags, preserving order."""
+    return list(dict.fromkeys(t.strip().lower() for t in tags or [] if t.strip()))
+
+
+def tag_conditions(tags_all: list[str] | None = None, tags_any: list[str] | None = None) -> list:
+    """Build tag predicates that can be served by the GIN index on expenses.tags.
+
+    ``tags_all`` compiles to ``tags @> ARRAY[...]`` and ``tags_any`` to
+    ``tags && ARRAY[...]``.
+    """
+    conditions = []
+    all_tags = normalize_tags(tags_all)
+    any_tags = normalize_tags(tags_any)
+    if all_tags:
+        conditions.append(Expense.tags.contains(all_tags))
+    if any_tags:
+        conditions.append(Expense.tags.overlap(any_tags))
+    return conditions
+
+
+def date_range(year: int, month: int | None = None) -> list:
+    """``start <= date < end`` for a calendar year, or one month of it."""
+    if month:
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    return [Expense.date >= start, Expense.date < end]
+
+
+def expense_conditions(
+    household_id: UUID,
+    year: int | None = None,
+    month: int | None = None,
+    category_id: str | None = None,
+    paid_by: str | None = None,
+    split_type: str | None = None,
+    tags_all: list[str] | None = None,
+    tags_any: list[str] | None = None,
+) -> list:
+    """WHERE clauses shared by the expense listing and the stats endpoints.
+
+    Year and year+month filters become plain ranges on ``date`` so the planner
+    can prune expense partitions and use the (household_id, date) index.
+    """
+    conditions = [Expense.household_id == household_id]
+    if year:
+        conditions.extend(date_range(year, month))
+    elif month:
+        conditions.append(extract("month", Expense.date) == month)
+    if category_id:
+        conditions.append(Expense.category_id == UUID(category_id))
+    if paid_by:
+        conditions.append(Expense.paid_by == UUID(paid_by))
+    if split_type:
+        conditions.append(Expense.split_type == split_type)
+    conditions.extend(tag_conditions(tags_all, tags_any))
+    return conditions
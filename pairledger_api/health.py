@@ -0,0 +1,122 @@
+"""Cached readiness state for the health probes.
+
+Probes never touch the database themselves. A background task checks DB
+reachability, the applied migration revision and request-pool saturation
+every ``health_check_interval`` seconds over its own unpooled connection, so
+a saturated pool can't make the probe itself time out, and the probe
+endpoints only read the last result. Pool saturation only fails readiness
+once it persists for ``health_saturated_checks`` consecutive checks, so a
+burst that saturates every replica at once doesn't pull them all from the
+load balancer together.
+"""
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from .config import settings
+from .database import engine, background_engine
+
+logger = logging.getLogger("pairledger.health")
+
+ALEMBIC_DIR = Path(__file__).parent.parent / "alembic"
+
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    capacity = pool.size() + settings.db_max_overflow
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.db_max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+    }
+
+
+class HealthChecker:
+    def __init__(self, interval: float, timeout: float, max_saturation: float, saturated_checks: int):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_saturation = max_saturation
+        self.saturated_checks = saturated_checks
+        self.head_revision: str | None = None
+        self.db_ok = False
+        self.db_latency_ms: float | None = None
+        self.revision: str | None = None
+        self.saturation = 0.0
+        self.saturated_streak = 0  # consecutive checks at or above max_saturation
+        self.error: str | None = None
+        self.checked_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    async def check(self) -> None:
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with background_engine.connect() as conn:
+                    self.revision = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+            self.db_ok = True
+            self.error = None
+        except Exception as e:
+            self.db_ok = False
+            self.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        self.db_latency_ms = round((time.monotonic() - started) * 1000, 1)
+        self.saturation = pool_stats()["saturation"]
+        self.saturated_streak = self.saturated_streak + 1 if self.saturation >= self.max_saturation else 0
+        self.checked_at = time.time()
+
+    def problems(self) -> list[str]:
+        """Reasons this instance should not take traffic; empty when ready."""
+        if self.checked_at is None:
+            return ["not checked yet"]
+        problems = []
+        if time.time() - self.checked_at > 3 * self.interval:
+            problems.append("health check result is stale")
+        if not self.db_ok:
+            problems.append("database unreachable")
+        elif self.head_revision and self.revision != self.head_revision:
+            problems.append(f"database at revision {self.revision}, expected {self.head_revision}")
+        if self.saturated_streak >= self.saturated_checks:
+            problems.append(f"connection pool saturated for {self.saturated_streak} checks")
+        return problems
+
+    def state(self) -> dict:
+        return {
+            "db": self.db_ok,
+            "db_latency_ms": self.db_latency_ms,
+            "db_error": self.error,
+            "revision": self.revision,
+            "head_revision": self.head_revision,
+            "pool_saturation": self.saturation,
+            "pool_saturated_checks": self.saturated_streak,
+            "checked_at": self.checked_at,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        self.head_revision = await asyncio.to_thread(lambda: ScriptDirectory(str(ALEMBIC_DIR)).get_current_head())
+        await self.check()
+        self._task = asyncio.create_task(self._run(), name="health-checker")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+health_checker = HealthChecker(
+    interval=settings.health_check_interval,
+    timeout=settings.health_check_timeout,
+    max_saturation=settings.health_max_pool_saturation,
+    saturated_checks=settings.health_saturated_checks,
+)
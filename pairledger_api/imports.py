@@ -0,0 +1,221 @@
+"""Staging and incremental parsing of bank-statement CSV uploads.
+
+The request body is first streamed to a temp file under
+``data_dir/imports/tmp`` without a database connection (``stage``), so a slow
+upload never holds the import's transaction open. The file is then read back
+in chunks, decoded and split into records, so only the current chunk and one
+batch of parsed rows are held in memory regardless of the statement's size.
+Records are only handed to the ``csv`` module once complete, so quoted
+fields spanning lines are handled too.
+"""
+import asyncio
+import codecs
+import csv
+import os
+import re
+import time
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator
+
+from .config import settings
+from .schemas import CsvImportOptions
+
+TMP_DIR = Path(settings.data_dir) / "imports" / "tmp"
+READ_SIZE = 1024 * 1024
+# Temp files left by a crashed process are removed after this long
+STALE_AFTER = 24 * 3600
+
+
+class CsvFormatError(ValueError):
+    """The upload as a whole can't be read with the given options."""
+
+
+class RowError(ValueError):
+    """One record can't be parsed; reported and skipped."""
+
+
+class ImportTooLarge(Exception):
+    pass
+
+
+def _sweep_stale() -> None:
+    cutoff = time.time() - STALE_AFTER
+    for path in TMP_DIR.glob("*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+async def stage(chunks: AsyncIterator[bytes]) -> Path:
+    """Write a streamed upload to a temp file, enforcing ``import_max_bytes``.
+
+    Read it back with ``staged_chunks`` and ``discard`` it when done.
+    """
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(_sweep_stale)
+    tmp = TMP_DIR / f"{os.getpid()}-{os.urandom(8).hex()}.csv"
+    size = 0
+    buffer = bytearray()
+    out = await asyncio.to_thread(open, tmp, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > settings.import_max_bytes:
+                raise ImportTooLarge()
+            buffer += chunk
+            if len(buffer) >= READ_SIZE:
+                await asyncio.to_thread(out.write, bytes(buffer))
+                buffer.clear()
+        await asyncio.to_thread(out.write, bytes(buffer))
+        await asyncio.to_thread(out.close)
+    except BaseException:
+        out.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp
+
+
+async def staged_chunks(path: Path) -> AsyncIterator[bytes]:
+    """The staged upload's bytes, read in worker threads."""
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(f.read, READ_SIZE):
+            yield chunk
+    finally:
+        f.close()
+
+
+def discard(path: Path) -> None:
+    path.unlink(missing_ok=True)
+
+
+_LINE = re.compile(r"[^\r\n]*(?:\r\n?|\n)|[^\r\n]+")
+MAX_RECORD = 64 * 1024
+
+
+async def csv_records(chunks: AsyncIterator[bytes], options: CsvImportOptions) -> AsyncIterator[tuple[int, list[str]]]:
+    """Yield ``(line number, fields)`` for each non-empty record of the upload's chunks."""
+    decoder = codecs.getincrementaldecoder(options.encoding)(errors="replace")
+    pending = ""  # a partial line, or the lines of a record with an open quote
+    line_no = 0
+
+    def complete(text: str, final: bool) -> list[tuple[int, str]]:
+        nonlocal pending, line_no
+        lines = _LINE.findall(pending + text)
+        pending = ""
+        # Hold back a trailing partial line; one ending in \r may still get its \n
+        if lines and not final and not lines[-1].endswith("\n"):
+            pending = lines.pop()
+        records = []
+        record, count = "", 0
+        for line in lines:
+            record += line
+            count += 1
+            if record.count('"') % 2 == 0:
+                records.append((line_no + 1, record))
+                line_no += count
+                record, count = "", 0
+        if record:
+            if final:
+                records.append((line_no + 1, record))
+            else:
+                pending = record + pending
+        if len(pending) > MAX_RECORD:
+            raise CsvFormatError(f"Unterminated quoted field at line {line_no + 1}")
+        return records
+
+    async for chunk in chunks:
+        records = complete(decoder.decode(chunk), final=False)
+        for (number, _), fields in zip(records, csv.reader([r for _, r in records], delimiter=options.delimiter)):
+            if fields:
+                yield number, fields
+    records = complete(decoder.decode(b"", final=True), final=True)
+    for (number, _), fields in zip(records, csv.reader([r for _, r in records], delimiter=options.delimiter)):
+        if fields:
+            yield number, fields
+
+
+_NOT_NUMERIC = re.compile(r"[^\d.,\-+]")
+
+
+def parse_amount(value: str, decimal_comma: bool) -> Decimal:
+    """Parse ``1,234.56``/``1.234,56``/``-12.00``/``(12.00)``/``€ 12`` style amounts."""
+    value = value.strip()
+    negative = value.startswith("(") and value.endswith(")")
+    value = _NOT_NUMERIC.sub("", value)
+    thousands, point = (".", ",") if decimal_comma else (",", ".")
+    value = value.replace(thousands, "").replace(point, ".")
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise RowError("invalid amount") from None
+    return -amount if negative else amount
+
+
+@lru_cache(maxsize=4096)  # statements repeat the same few hundred dates
+def parse_date(value: str, date_format: str) -> date:
+    try:
+        return datetime.strptime(value.strip(), date_format).date()
+    except ValueError:
+        raise RowError(f"date does not match {date_format}") from None
+
+
+class ColumnMap:
+    """Resolves the configured columns (header names or 0-based indexes) to positions."""
+
+    FIELDS = ("date", "amount", "description", "notes")
+
+    def __init__(self, options: CsvImportOptions, header: list[str] | None):
+        self.positions: dict[str, int] = {}
+        names = {h.strip().lower(): i for i, h in enumerate(header)} if header else {}
+        for field in self.FIELDS:
+            column = getattr(options, f"{field}_column")
+            if column is None:
+                continue
+            if column.isdigit():
+                self.positions[field] = int(column)
+            elif column.strip().lower() in names:
+                self.positions[field] = names[column.strip().lower()]
+            else:
+                raise CsvFormatError(f"Column '{column}' not found" + (" in the header" if header else ""))
+
+    def get(self, fields: list[str], field: str) -> str | None:
+        position = self.positions.get(field)
+        if position is None:
+            return None
+        if position >= len(fields):
+            raise RowError(f"missing {field} column")
+        return fields[position]
+
+
+def parse_row(fields: list[str], columns: ColumnMap, options: CsvImportOptions) -> dict | None:
+    """Map one record to expense values; None for rows that aren't expenses (e.g. credits)."""
+    amount = parse_amount(columns.get(fields, "amount"), options.decimal_comma)
+    if options.expense_sign == "negative":
+        if amount >= 0:
+            return None
+        amount = -amount
+    elif options.expense_sign == "positive":
+        if amount <= 0:
+            return None
+    else:
+        amount = abs(amount)
+    if amount == 0:
+        return None
+    if amount >= Decimal("1e10"):
+        raise RowError("amount too large")
+    description = " ".join(columns.get(fields, "description").split())
+    if not description:
+        raise RowError("empty description")
+    notes = columns.get(fields, "notes")
+    return {
+        "date": parse_date(columns.get(fields, "date"), options.date_format),
+        "amount": amount.quantize(Decimal("0.01")),
+        "description": description[:500],
+        "notes": (notes.strip() or None) if notes is not None else None,
+    }
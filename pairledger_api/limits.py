@@ -0,0 +1,139 @@
+import asyncio
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import Hashable
+from uuid import UUID
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import or_, select
+
+from .auth import get_current_user, ShelfUser
+from .config import settings
+from .database import async_session
+from .models import Household
+
+# user id -> household id (the user's own id while they have none), LRU-bounded
+# by limit_household_map_size. Filled in by get_user_household, or looked up
+# on a user's first request so both partners always share their slots.
+_household_ids: OrderedDict[UUID, UUID] = OrderedDict()
+
+
+def remember_household(user_id: UUID, household_id: UUID) -> None:
+    _household_ids[user_id] = household_id
+    _household_ids.move_to_end(user_id)
+    while len(_household_ids) > settings.limit_household_map_size:
+        _household_ids.popitem(last=False)
+
+
+async def _limit_key(user_id: UUID) -> UUID:
+    household_id = _household_ids.get(user_id)
+    if household_id is not None:
+        _household_ids.move_to_end(user_id)
+        return household_id
+    async with async_session() as db:
+        household_id = await db.scalar(
+            select(Household.id).where(or_(Household.user_a_id == user_id, Household.user_b_id == user_id))
+        )
+    remember_household(user_id, household_id or user_id)
+    return household_id or user_id
+
+
+class RouteClassLimiter:
+    """Bounded-wait concurrency limit per household, plus an optional process-wide cap."""
+
+    def __init__(self, name: str, per_household: int, global_limit: int | None, max_wait: float):
+        self.name = name
+        self.per_household = per_household
+        self.max_wait = max_wait
+        self._global = asyncio.Semaphore(global_limit) if global_limit else None
+        self._households: dict[Hashable, tuple[asyncio.Semaphore, list[int]]] = {}
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected: Counter[str] = Counter()
+        self.wait_seconds = 0.0
+
+    def _reject(self, reason: str, status_code: int):
+        self.rejected[reason] += 1
+        raise HTTPException(
+            status_code=status_code,
+            detail="Too many concurrent requests, retry shortly",
+            headers={"Retry-After": str(settings.limit_retry_after)},
+        )
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        sem, users = self._households.setdefault(key, (asyncio.Semaphore(self.per_household), [0]))
+        users[0] += 1
+        try:
+            try:
+                await asyncio.wait_for(sem.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                self._reject("household", 429)
+            try:
+                if self._global is not None:
+                    remaining = max(0.0, self.max_wait - (loop.time() - started))
+                    try:
+                        await asyncio.wait_for(self._global.acquire(), remaining)
+                    except asyncio.TimeoutError:
+                        self._reject("global", 503)
+                try:
+                    self.wait_seconds += loop.time() - started
+                    self.admitted += 1
+                    self.in_flight += 1
+                    yield
+                finally:
+                    self.in_flight -= 1
+                    if self._global is not None:
+                        self._global.release()
+            finally:
+                sem.release()
+        finally:
+            users[0] -= 1
+            if users[0] == 0:
+                del self._households[key]
+
+
+limiters = {
+    "cheap": RouteClassLimiter("cheap", settings.limit_cheap_per_household, None, settings.limit_max_wait),
+    "aggregate": RouteClassLimiter(
+        "aggregate", settings.limit_aggregate_per_household, settings.limit_aggregate_global, settings.limit_max_wait,
+    ),
+    "bulk": RouteClassLimiter(
+        "bulk", settings.limit_bulk_per_household, settings.limit_bulk_global, settings.limit_max_wait,
+    ),
+}
+
+
+def limit(route_class: str):
+    """Dependency that holds a ``route_class`` slot for the household for the request's duration."""
+    limiter = limiters[route_class]
+
+    async def dependency(user: ShelfUser = Depends(get_current_user)):
+        async with limiter.slot(await _limit_key(UUID(user.id))):
+            yield
+
+    return Depends(dependency)
+
+
+def render_metrics() -> str:
+    """Limiter counters in Prometheus text exposition format."""
+    lines = [
+        "# TYPE pairledger_limit_admitted_total counter",
+        *(f'pairledger_limit_admitted_total{{route_class="{n}"}} {l.admitted}' for n, l in limiters.items()),
+        "# TYPE pairledger_limit_rejected_total counter",
+        *(
+            f'pairledger_limit_rejected_total{{route_class="{n}",reason="{reason}"}} {l.rejected[reason]}'
+            for n, l in limiters.items()
+            for reason in ("household", "global")
+        ),
+        "# TYPE pairledger_limit_in_flight gauge",
+        *(f'pairledger_limit_in_flight{{route_class="{n}"}} {l.in_flight}' for n, l in limiters.items()),
+        "# TYPE pairledger_limit_wait_seconds_total counter",
+        *(
+            f'pairledger_limit_wait_seconds_total{{route_class="{n}"}} {l.wait_seconds:.3f}'
+            for n, l in limiters.items()
+        ),
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,189 @@
+"""Structured JSON logging off the event loop, plus per-request access logs.
+
+Log calls on the loop only build a record and put it on a queue; a
+``QueueListener`` thread does the JSON encoding and the stdout write. Every
+record logged while a request is in flight carries its request id (and the
+household, once ``get_user_household`` has resolved it), and the access log
+middleware emits one record per request with route template, status, total
+time and time spent in database calls.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+from sqlalchemy import event
+
+from .config import settings
+
+access_logger = logging.getLogger("pairledger.access")
+
+# Fields copied from a record's extras into the JSON line when present
+EXTRA_FIELDS = (
+    "request_id", "household_id", "method", "route", "path", "status",
+    "duration_ms", "db_ms", "db_queries",
+)
+
+
+class RequestContext:
+    __slots__ = ("request_id", "household_id", "db_seconds", "db_queries")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.household_id: str | None = None
+        self.db_seconds = 0.0
+        self.db_queries = 0
+
+
+_request: ContextVar[RequestContext | None] = ContextVar("pairledger_request", default=None)
+
+
+def bind_household(household_id) -> None:
+    ctx = _request.get()
+    if ctx is not None:
+        ctx.household_id = str(household_id)
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """Tags records with the current request and hands them to the listener as-is.
+
+    The default ``prepare`` formats on the calling thread; here only the
+    message is interpolated (so mutable args are captured as they were) and
+    the JSON encoding is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        ctx = _request.get()
+        if ctx is not None:
+            if getattr(record, "request_id", None) is None:
+                record.request_id = ctx.request_id
+            if getattr(record, "household_id", None) is None:
+                record.household_id = ctx.household_id
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: QueueListener | None = None
+
+
+def setup_logging(level: str) -> None:
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JSONFormatter())
+    logging.basicConfig(
+        level=getattr(logging, level.upper(), logging.INFO), handlers=[_ContextQueueHandler(log_queue)], force=True,
+    )
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records; called at shutdown."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def track_db_time(sync_engine) -> None:
+    """Add the wall time of every statement on ``sync_engine`` to the current request."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        ctx = _request.get()
+        if ctx is not None:
+            ctx.db_seconds += time.perf_counter() - started
+            ctx.db_queries += 1
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+class AccessLogMiddleware:
+    """One access record per HTTP request, sampled per route template.
+
+    ``settings.access_log_sample`` maps route templates to the fraction of
+    requests to log (e.g. ``{"/health/ready": 0.01}``). Errors and requests
+    slower than ``access_log_slow_ms`` are always logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        ctx = RequestContext(request_id or uuid.uuid4().hex)
+        token = _request.set(ctx)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-request-id", ctx.request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            matched = scope.get("route")
+            route = (matched.path or "static") if matched is not None else "unmatched"
+            rate = settings.access_log_sample.get(route, 1.0)
+            if status >= 500 or duration_ms >= settings.access_log_slow_ms or rate >= 1.0 or random.random() < rate:
+                access_logger.info(
+                    "%s %s %d", scope["method"], route, status,
+                    extra={
+                        "method": scope["method"],
+                        "route": route,
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round(duration_ms, 1),
+                        "db_ms": round(ctx.db_seconds * 1000, 1),
+                        "db_queries": ctx.db_queries,
+                    },
+                )
+            _request.reset(token)
@@ -1,19 +1,29 @@
 import asyncio
-import json
+import hmac
 import logging
 import subprocess
-import sys
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy import text
 
+from .auth import auth_stats, start_auth, stop_auth
+from .cache import household_cache
+from .compression import CompressionMiddleware
 from .config import settings
-from .database import engine, async_session, ensure_schema
+from .database import engine, ensure_schema
+from .explain import ExplainMiddleware, capture_explain
+from .exports import start_export_workers, stop_export_workers
+from .health import health_checker, pool_stats
+from .logs import AccessLogMiddleware, setup_logging, stop_logging, track_db_time
+from .limits import render_metrics
+from .partitions import ensure_expense_partitions
+from .receipts import start_receipt_gc, stop_receipt_gc
+from .static import SPAStaticFiles
+from .tracing import TracingMiddleware, trace_sql
 from .routes.household import router as household_router
 from .routes.incomes import router as incomes_router
 from .routes.categories import router as categories_router
@@ -23,24 +33,18 @@ from .routes.settlements import router as settlements_router
 from .routes.balance import router as balance_router
 from .routes.search import router as search_router
 from .routes.export import router as export_router
+from .routes.imports import router as imports_router
+from .routes.receipts import router as receipts_router
+from .routes.budgets import router as budgets_router
+from .routes.sync import router as sync_router
 
 
-# ── Structured JSON logging ─────────────────────────────────────────────
+# ── Structured JSON logging (encoded and written off the event loop) ───
 
-class JSONFormatter(logging.Formatter):
-    def format(self, record: logging.LogRecord) -> str:
-        return json.dumps({
-            "ts": self.formatTime(record),
-            "level": record.levelname,
-            "logger": record.name,
-            "msg": record.getMessage(),
-        })
-
-
-handler = logging.StreamHandler(sys.stdout)
-handler.setFormatter(JSONFormatter())
-log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
-logging.basicConfig(level=log_level, handlers=[handler], force=True)
+setup_logging(settings.log_level)
+capture_explain(engine.sync_engine)  # first, so its EXPLAINs aren't timed as the statements
+track_db_time(engine.sync_engine)
+trace_sql(engine.sync_engine)
 logger = logging.getLogger("pairledger")
 
 STATIC_DIR = Path(__file__).parent.parent / "static"
@@ -84,14 +88,29 @@ async def lifespan(app: FastAPI):
     await wait_for_db()
     await ensure_schema()
     run_migrations()
+    await ensure_expense_partitions()
+    await health_checker.start()
+    await start_auth()
+    await start_export_workers()
+    start_receipt_gc()
+    await spa.startup()
     logger.info("PairLedger ready")
     yield
     logger.info("PairLedger shutting down")
+    await stop_export_workers()
+    await stop_receipt_gc()
+    await stop_auth()
+    await health_checker.stop()
+    stop_logging()
 
 
 # ── App ──────────────────────────────────────────────────────────────────
 
 app = FastAPI(title="PairLedger", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ExplainMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(AccessLogMiddleware)
 
 app.include_router(household_router)
 app.include_router(incomes_router)
@@ -102,6 +121,10 @@ app.include_router(settlements_router)
 app.include_router(balance_router)
 app.include_router(search_router)
 app.include_router(export_router)
+app.include_router(imports_router)
+app.include_router(receipts_router)
+app.include_router(budgets_router)
+app.include_router(sync_router)
 
 
 # ── Global exception handlers ────────────────────────────────────────────
@@ -123,27 +146,46 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
-# ── Health check with DB ping ────────────────────────────────────────────
+# ── Health probes (cached, no I/O) ─────────────────────────────────────
+
+@app.get("/health/live")
+async def health_live():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready(verbose: bool = False):
+    problems = health_checker.problems()
+    body = {"status": "ok" if not problems else "unavailable", "problems": problems}
+    if verbose:
+        body.update(health_checker.state(), pool=pool_stats(), cache=household_cache.stats(), auth=auth_stats())
+    return JSONResponse(status_code=200 if not problems else 503, content=body)
+
 
 @app.get("/health")
 async def health():
-    db_ok = False
-    try:
-        async with async_session() as session:
-            await session.execute(text("SELECT 1"))
-            db_ok = True
-    except Exception:
-        pass
-
     return {
-        "status": "ok" if db_ok else "degraded",
+        "status": "ok" if not health_checker.problems() else "degraded",
         "version": "1.0.0",
         "app": "pairledger",
-        "db": db_ok,
+        "db": health_checker.db_ok,
     }
 
 
+# ── Metrics ──────────────────────────────────────────────────────────────
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    if settings.metrics_token is not None:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        expected = settings.metrics_token.encode()
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), expected):
+            return PlainTextResponse("Not authenticated", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return render_metrics()
+
+
 # ── Serve React SPA ─────────────────────────────────────────────────────
 
+spa = SPAStaticFiles(directory=str(STATIC_DIR), check_dir=False)
 if STATIC_DIR.exists():
-    app.mount("/", StaticFiles(directory=str(STATIC_DIR), html=True), name="static")
+    app.mount("/", spa, name="static")
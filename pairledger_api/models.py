@@ -4,6 +4,8 @@ from sqlalchemy import (
     Column,
     String,
     Text,
+    Integer,
+    BigInteger,
     SmallInteger,
     Boolean,
     Date,
@@ -36,6 +38,8 @@ class Household(Base):
     invite_code = Column(String(20), unique=True)
     user_a_id = Column(UUID(as_uuid=True), nullable=False)
     user_b_id = Column(UUID(as_uuid=True))
+    # Bumped by triggers on every write to the household's data; see cache.py
+    data_version = Column(BigInteger, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     incomes = relationship("Income", back_populates="household", cascade="all, delete-orphan")
@@ -49,7 +53,8 @@ class Income(Base):
     __tablename__ = "incomes"
     __table_args__ = (
         UniqueConstraint("household_id", "user_id", "effective_from", name="uq_income_user_date"),
-        Index("idx_incomes_household", "household_id"),
+        Index("idx_incomes_household_keyset", "household_id", "effective_from", "created_at", "id"),
+        Index("idx_incomes_change_seq", "household_id", "change_seq"),
         {"schema": "pairledger"},
     )
 
@@ -60,6 +65,9 @@ class Income(Base):
     effective_from = Column(Date, nullable=False)
     notes = Column(String(500))
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Maintained by triggers for delta sync; see routes/sync.py
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
 
     household = relationship("Household", back_populates="incomes")
 
@@ -69,6 +77,7 @@ class Category(Base):
     __table_args__ = (
         UniqueConstraint("household_id", "name", name="uq_category_name"),
         Index("idx_categories_household", "household_id"),
+        Index("idx_categories_change_seq", "household_id", "change_seq"),
         {"schema": "pairledger"},
     )
 
@@ -79,6 +88,9 @@ class Category(Base):
     color = Column(String(7))
     budget_monthly = Column(Numeric(12, 2))
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Maintained by triggers for delta sync; see routes/sync.py
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
 
     household = relationship("Household", back_populates="categories")
 
@@ -88,12 +100,26 @@ class Expense(Base):
     __table_args__ = (
         CheckConstraint("amount > 0", name="ck_expense_amount"),
         CheckConstraint("split_type IN ('shared', 'personal', 'equal')", name="ck_expense_split_type"),
-        Index("idx_expenses_household", "household_id"),
+        Index("idx_expenses_household_date", "household_id", "date"),
+        Index("idx_expenses_household_amount_date", "household_id", "amount", "date"),
         Index("idx_expenses_date", "date"),
         Index("idx_expenses_category", "category_id"),
         Index("idx_expenses_paid_by", "paid_by"),
         Index("idx_expenses_tags", "tags", postgresql_using="gin"),
-        {"schema": "pairledger"},
+        Index(
+            "idx_expenses_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        Index("idx_expenses_change_seq", "household_id", "change_seq"),
+        Index("idx_expenses_receipt", "receipt_sha256", postgresql_where=text("receipt_sha256 IS NOT NULL")),
+        # Import de-duplication lookups; see alembic 010
+        Index(
+            "idx_expenses_dedup",
+            text("pairledger.expense_dedup_key(household_id, date, amount, description)"),
+            postgresql_using="hash",
+        ),
+        # Yearly partitions; see alembic 007 and partitions.py
+        {"schema": "pairledger", "postgresql_partition_by": "RANGE (date)"},
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("gen_random_uuid()"))
@@ -102,22 +128,45 @@ class Expense(Base):
     category_id = Column(UUID(as_uuid=True), ForeignKey("pairledger.categories.id", ondelete="SET NULL"))
     amount = Column(Numeric(12, 2), nullable=False)
     description = Column(String(500), nullable=False)
-    date = Column(Date, nullable=False, server_default=text("CURRENT_DATE"))
+    # The partition key has to be part of the primary key
+    date = Column(Date, primary_key=True, nullable=False, server_default=text("CURRENT_DATE"))
     split_type = Column(String(10), nullable=False, server_default="shared")
     notes = Column(Text)
     tags = Column(ARRAY(Text), server_default=text("'{}'::text[]"))
     receipt_url = Column(Text)
+    # Uploaded receipt in the content-addressed store; see receipts.py
+    receipt_sha256 = Column(String(64), ForeignKey("pairledger.receipts.sha256"))
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Maintained by triggers for delta sync; see routes/sync.py
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
 
     household = relationship("Household", back_populates="expenses")
     category = relationship("Category")
 
 
+class CategoryMonthTotal(Base):
+    """Month-to-date spend per category, maintained by triggers on expenses."""
+
+    __tablename__ = "category_month_totals"
+    __table_args__ = (
+        Index("idx_category_month_totals_household", "household_id", "month"),
+        {"schema": "pairledger"},
+    )
+
+    household_id = Column(UUID(as_uuid=True), ForeignKey("pairledger.households.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(UUID(as_uuid=True), ForeignKey("pairledger.categories.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, server_default="0")
+    count = Column(Integer, nullable=False, server_default="0")
+
+
 class Settlement(Base):
     __tablename__ = "settlements"
     __table_args__ = (
         CheckConstraint("amount > 0", name="ck_settlement_amount"),
-        Index("idx_settlements_household", "household_id"),
+        Index("idx_settlements_household_keyset", "household_id", "date", "created_at", "id"),
+        Index("idx_settlements_change_seq", "household_id", "change_seq"),
         {"schema": "pairledger"},
     )
 
@@ -129,6 +178,9 @@ class Settlement(Base):
     date = Column(Date, nullable=False, server_default=text("CURRENT_DATE"))
     notes = Column(String(500))
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Maintained by triggers for delta sync; see routes/sync.py
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
 
     household = relationship("Household", back_populates="settlements")
 
@@ -140,6 +192,7 @@ class RecurringExpense(Base):
         CheckConstraint("split_type IN ('shared', 'personal', 'equal')", name="ck_recurring_split_type"),
         CheckConstraint("frequency IN ('weekly', 'biweekly', 'monthly', 'yearly')", name="ck_recurring_frequency"),
         Index("idx_recurring_household", "household_id"),
+        Index("idx_recurring_expenses_change_seq", "household_id", "change_seq"),
         {"schema": "pairledger"},
     )
 
@@ -154,6 +207,81 @@ class RecurringExpense(Base):
     day_of_month = Column(SmallInteger)
     active = Column(Boolean, nullable=False, server_default=text("true"))
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Maintained by triggers for delta sync; see routes/sync.py
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
 
     household = relationship("Household", back_populates="recurring_expenses")
     category = relationship("Category")
+
+
+class Receipt(Base):
+    __tablename__ = "receipts"
+    __table_args__ = {"schema": "pairledger"}
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    __table_args__ = (
+        UniqueConstraint("household_id", "data_version", name="uq_export_job_version"),
+        CheckConstraint("status IN ('queued', 'running', 'done', 'failed')", name="ck_export_job_status"),
+        {"schema": "pairledger"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("gen_random_uuid()"))
+    household_id = Column(UUID(as_uuid=True), ForeignKey("pairledger.households.id", ondelete="CASCADE"), nullable=False)
+    data_version = Column(BigInteger, nullable=False)
+    status = Column(String(10), nullable=False, server_default="queued")
+    size = Column(BigInteger)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    # Process running the job, and when it last said so (see exports.py)
+    owner = Column(String(64))
+    heartbeat_at = Column(DateTime(timezone=True))
+
+
+class BalanceCheckpoint(Base):
+    """Balance components summed through a closed date; see routes/balance.py."""
+
+    __tablename__ = "balance_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("household_id", "through_date", name="uq_balance_checkpoint_date"),
+        {"schema": "pairledger"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("gen_random_uuid()"))
+    household_id = Column(UUID(as_uuid=True), ForeignKey("pairledger.households.id", ondelete="CASCADE"), nullable=False)
+    through_date = Column(Date, nullable=False)
+    a_paid = Column(Numeric(14, 2), nullable=False, server_default="0")
+    b_paid = Column(Numeric(14, 2), nullable=False, server_default="0")
+    shared_total = Column(Numeric(14, 2), nullable=False, server_default="0")
+    equal_total = Column(Numeric(14, 2), nullable=False, server_default="0")
+    a_personal = Column(Numeric(14, 2), nullable=False, server_default="0")
+    b_personal = Column(Numeric(14, 2), nullable=False, server_default="0")
+    settled_a_to_b = Column(Numeric(14, 2), nullable=False, server_default="0")
+    settled_b_to_a = Column(Numeric(14, 2), nullable=False, server_default="0")
+    # Set by triggers when a write lands on or before through_date
+    stale = Column(Boolean, nullable=False, server_default="false")
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class Tombstone(Base):
+    """Record of a deleted row, so delta sync can tell clients to drop it."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("idx_tombstones_change_seq", "household_id", "change_seq"),
+        {"schema": "pairledger"},
+    )
+
+    household_id = Column(UUID(as_uuid=True), ForeignKey("pairledger.households.id", ondelete="CASCADE"), nullable=False)
+    table_name = Column(String(40), primary_key=True)
+    row_id = Column(UUID(as_uuid=True), primary_key=True)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
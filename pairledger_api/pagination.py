@@ -0,0 +1,49 @@
+"""Keyset pagination over (sort key..., id) with opaque cursors.
+
+A cursor is the sort key of the last row on a page, so the next page is a
+row-value comparison served straight from a composite index, however deep
+into the history it is, instead of an OFFSET that re-reads every row before
+it.
+"""
+import base64
+import json
+from datetime import date, datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values: tuple) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, columns: tuple) -> tuple:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(raw) != len(columns):
+            raise ValueError
+        parsers = {date: date.fromisoformat, datetime: datetime.fromisoformat, UUID: UUID}
+        return tuple(parsers[col.type.python_type](v) for col, v in zip(columns, raw))
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(query, columns: tuple, cursor: str | None, limit: int):
+    """Order ``query`` newest first by ``columns`` and fetch one page past ``cursor``.
+
+    The query asks for ``limit + 1`` rows; pass the result to ``split_page``.
+    """
+    if cursor:
+        query = query.where(tuple_(*columns) < tuple_(*_decode_cursor(cursor, columns)))
+    return query.order_by(*(c.desc() for c in columns)).limit(limit + 1)
+
+
+def split_page(rows: list, columns: tuple, limit: int) -> tuple[list, str | None]:
+    """Trim the look-ahead row and return ``(rows, next_cursor)``."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(tuple(getattr(last, c.key) for c in columns))
@@ -0,0 +1,81 @@
+"""Maintenance for the yearly partitions of pairledger.expenses.
+
+Startup calls ``ensure_expense_partitions`` so next year's partition exists
+before anyone books an expense in it; dates outside every partition land in
+``expenses_default`` until their year is created. The same helpers are
+available from the command line::
+
+    python -m pairledger_api.partitions ensure --years-ahead 2
+    python -m pairledger_api.partitions ensure --from-year 2009
+    python -m pairledger_api.partitions detach 2012
+
+Detaching keeps the year's rows in a standalone ``expenses_<year>`` table
+but removes them from every query, balance and export. In the same
+transaction it records tombstones so synced clients drop the rows, deletes
+the year's category month totals, marks checkpoints from that year on stale
+and bumps the households' data_version, as deleting the rows would have.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from sqlalchemy import text
+
+from .config import settings
+from .database import background_engine
+
+logger = logging.getLogger("pairledger.partitions")
+
+# pg advisory lock key serializing partition maintenance: workers starting
+# together would otherwise race between the existence check and CREATE TABLE
+PARTITION_LOCK = 0x70_6C_70_74
+
+
+async def ensure_expense_partitions(years_ahead: int | None = None, from_year: int | None = None) -> list[int]:
+    """Create any missing yearly partitions up to ``years_ahead`` past this year."""
+    if years_ahead is None:
+        years_ahead = settings.partition_years_ahead
+    this_year = date.today().year
+    created = []
+    async with background_engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK})
+        for year in range(from_year or this_year, this_year + years_ahead + 1):
+            made = await conn.scalar(text("SELECT pairledger.create_expense_partition(:year)"), {"year": year})
+            if made:
+                created.append(year)
+    if created:
+        logger.info("Created expense partitions for %s", ", ".join(map(str, created)))
+    return created
+
+
+async def detach_expense_partition(year: int) -> bool:
+    async with background_engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK})
+        detached = await conn.scalar(text("SELECT pairledger.detach_expense_partition(:year)"), {"year": year})
+    if detached:
+        logger.info("Detached expense partition for %d", year)
+    return bool(detached)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m pairledger_api.partitions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ensure = sub.add_parser("ensure", help="create missing yearly partitions")
+    ensure.add_argument("--years-ahead", type=int, default=None)
+    ensure.add_argument("--from-year", type=int, default=None)
+    detach = sub.add_parser("detach", help="detach one year's partition from expenses")
+    detach.add_argument("year", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "ensure":
+        created = asyncio.run(ensure_expense_partitions(args.years_ahead, args.from_year))
+        print(f"created: {created or 'none'}")
+    else:
+        detached = asyncio.run(detach_expense_partition(args.year))
+        print("detached" if detached else f"no attached partition for {args.year}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Content-addressed receipt store under ``data_dir/receipts``.
+
+Uploads are streamed to a temp file while being hashed, without holding a
+database connection, then moved to ``objects/<sha[:2]>/<sha256>`` in a short
+transaction that also records them; a receipt that is already stored is
+kept once and the new copy dropped. The ``receipts`` table records each blob
+and ``expenses.receipt_sha256`` points at it, so a blob no expense references
+is an orphan: ``collect_orphans`` deletes those rows and files once they are
+older than ``receipt_gc_grace_hours``, plus temp files and files left without
+a row by crashed uploads (an upload in progress keeps its temp file's mtime
+fresh). Uploads hold a shared advisory lock from placing the file until
+their transaction commits, and collection holds it exclusively, so a blob is
+never collected between being placed and being referenced.
+
+    python -m pairledger_api.receipts gc
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+from sqlalchemy import text
+
+from .config import settings
+from .database import background_engine
+
+logger = logging.getLogger("pairledger.receipts")
+
+RECEIPTS_DIR = Path(settings.data_dir) / "receipts"
+OBJECTS_DIR = RECEIPTS_DIR / "objects"
+TMP_DIR = RECEIPTS_DIR / "tmp"
+WRITE_SIZE = 1024 * 1024
+# pg advisory lock key: shared by uploads, exclusive for collection
+STORE_LOCK = 0x70_6C_72_63
+
+# Leading bytes -> content type; anything else is rejected
+SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"%PDF-", "application/pdf"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class ReceiptTooLarge(Exception):
+    pass
+
+
+class UnsupportedReceipt(Exception):
+    pass
+
+
+def sniff(head: bytes) -> str | None:
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1"):
+        return "image/heic"
+    return None
+
+
+def object_path(sha256: str) -> Path:
+    return OBJECTS_DIR / sha256[:2] / sha256
+
+
+def _place(tmp: Path, sha256: str) -> None:
+    final = object_path(sha256)
+    if final.exists():
+        tmp.unlink()
+        return
+    final.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp, final)
+
+
+async def stage(chunks: AsyncIterator[bytes]) -> tuple[Path, str, int, str]:
+    """Write a streamed upload to a temp file; returns (temp path, sha256, size, content type).
+
+    At most ``WRITE_SIZE`` bytes are buffered; file I/O runs in worker threads.
+    Pass the temp file to ``place`` (under ``STORE_LOCK``) or ``discard`` it.
+    """
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = TMP_DIR / f"{os.getpid()}-{os.urandom(8).hex()}"
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    buffer = bytearray()
+    out = await asyncio.to_thread(open, tmp, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > settings.receipt_max_bytes:
+                raise ReceiptTooLarge()
+            digest.update(chunk)
+            buffer += chunk
+            if content_type is None and len(buffer) >= 16:
+                content_type = sniff(bytes(buffer[:16]))
+                if content_type is None:
+                    raise UnsupportedReceipt()
+            if len(buffer) >= WRITE_SIZE:
+                await asyncio.to_thread(out.write, bytes(buffer))
+                buffer.clear()
+        if content_type is None:
+            raise UnsupportedReceipt()
+        await asyncio.to_thread(out.write, bytes(buffer))
+        await asyncio.to_thread(out.close)
+    except BaseException:
+        out.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp, digest.hexdigest(), size, content_type
+
+
+async def place(tmp: Path, sha256: str) -> None:
+    """Move a staged upload into the store, or drop it if the blob is already there."""
+    await asyncio.to_thread(_place, tmp, sha256)
+
+
+def discard(tmp: Path) -> None:
+    tmp.unlink(missing_ok=True)
+
+
+def _sweep_files(known: set[str], cutoff: float) -> int:
+    """Delete stored files without a row, and stale temp files, older than ``cutoff``."""
+    removed = 0
+    for path in [*OBJECTS_DIR.glob("*/*"), *TMP_DIR.glob("*")]:
+        try:
+            if path.name not in known and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+async def collect_orphans(grace_hours: float | None = None) -> int:
+    """Delete receipts no expense references; returns how many files were removed."""
+    grace_hours = settings.receipt_gc_grace_hours if grace_hours is None else grace_hours
+    async with background_engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": STORE_LOCK})
+        deleted = (
+            await conn.execute(
+                text("""
+                    DELETE FROM pairledger.receipts r
+                    WHERE r.created_at < now() - make_interval(secs => :grace)
+                      AND NOT EXISTS (SELECT 1 FROM pairledger.expenses e WHERE e.receipt_sha256 = r.sha256)
+                    RETURNING r.sha256
+                """),
+                {"grace": grace_hours * 3600},
+            )
+        ).scalars().all()
+        known = set((await conn.execute(text("SELECT sha256 FROM pairledger.receipts"))).scalars().all())
+        for sha256 in deleted:
+            object_path(sha256).unlink(missing_ok=True)
+        swept = await asyncio.to_thread(_sweep_files, known, time.time() - grace_hours * 3600)
+    if deleted or swept:
+        logger.info("Receipt GC: %d unreferenced, %d stray files removed", len(deleted), swept)
+    return len(deleted) + swept
+
+
+async def _gc_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.receipt_gc_interval_hours * 3600)
+        try:
+            await collect_orphans()
+        except Exception:
+            logger.exception("Receipt GC failed")
+
+
+_gc_task: asyncio.Task | None = None
+
+
+def start_receipt_gc() -> None:
+    global _gc_task
+    if settings.receipt_gc_interval_hours > 0:
+        _gc_task = asyncio.create_task(_gc_loop(), name="receipt-gc")
+
+
+async def stop_receipt_gc() -> None:
+    global _gc_task
+    if _gc_task:
+        _gc_task.cancel()
+        await asyncio.gather(_gc_task, return_exceptions=True)
+        _gc_task = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m pairledger_api.receipts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gc = sub.add_parser("gc", help="delete receipts no expense references")
+    gc.add_argument("--grace-hours", type=float, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    removed = asyncio.run(collect_orphans(args.grace_hours))
+    print(f"removed: {removed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,42 @@
+from datetime import date, timedelta
 from uuid import UUID
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, extract, case, text
-from shelf_auth_middleware import get_current_user, ShelfUser
+from sqlalchemy import select, update, func, desc, case, text
+from sqlalchemy.engine import Row
 
+from ..auth import get_current_user, ShelfUser
+from ..cache import household_cache
 from ..database import get_db
-from ..models import Expense, Settlement, Income, Category
+from ..limits import limit
+from ..writes import insert_returning, delete_returning
+from ..filters import expense_conditions, normalize_tags
+from ..models import Household, Expense, Settlement, Income, Category, BalanceCheckpoint, RecurringExpense
 from ..schemas import (
     BalanceResponse,
+    BalanceClose,
+    BalanceCheckpointResponse,
     MonthlySummary,
     CategorySpending,
     MonthlyTrend,
+    TrendPoint,
+    TrendSeries,
+    TrendResponse,
+    TagSpending,
+    PeriodComparison,
+    PayerComparison,
+    CategoryComparison,
+    CompareResponse,
+    ForecastMonth,
+    ForecastCategory,
+    ForecastResponse,
 )
+from ..tracing import TracedRoute, current_span, span
 from .household import get_user_household
 
-router = APIRouter(prefix="/api", tags=["balance"])
+router = APIRouter(prefix="/api", tags=["balance"], dependencies=[limit("aggregate")], route_class=TracedRoute)
 
 
 async def _get_split_ratio(household_id: UUID, user_a_id: UUID, user_b_id: UUID | None, db: AsyncSession) -> tuple[float, float]:
@@ -49,21 +69,31 @@ async def _get_split_ratio(household_id: UUID, user_a_id: UUID, user_b_id: UUID
     return 0.5, 0.5
 
 
-@router.get("/balance", response_model=BalanceResponse)
-async def get_balance(
-    user: ShelfUser = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    uid = UUID(user.id)
-    household = await get_user_household(uid, db)
-    if not household:
-        raise HTTPException(status_code=404, detail="No household found")
+# Components the balance is derived from. Fair shares are applied at read
+# time with the current income ratio, so a checkpoint of these sums gives
+# exactly the balance a scan over all history would.
+TOTAL_FIELDS = (
+    "a_paid", "b_paid", "shared_total", "equal_total",
+    "a_personal", "b_personal", "settled_a_to_b", "settled_b_to_a",
+)
+
 
+async def _balance_totals(
+    household: Household, db: AsyncSession, after: date | None = None, through: date | None = None,
+) -> dict[str, Decimal]:
+    """Sum the balance components over expenses and settlements dated in (after, through]."""
     a_id = household.user_a_id
     b_id = household.user_b_id
-    a_ratio, b_ratio = await _get_split_ratio(household.id, a_id, b_id, db)
-
-    # Sum expenses by split type and payer
+    expense_filter = [Expense.household_id == household.id]
+    settlement_filter = [Settlement.household_id == household.id]
+    if after:
+        expense_filter.append(Expense.date > after)
+        settlement_filter.append(Settlement.date > after)
+    if through:
+        expense_filter.append(Expense.date <= through)
+        settlement_filter.append(Settlement.date <= through)
+
+    totals = dict.fromkeys(TOTAL_FIELDS, Decimal("0"))
     expenses = (
         await db.execute(
             select(
@@ -71,59 +101,131 @@ async def get_balance(
                 Expense.split_type,
                 func.sum(Expense.amount).label("total"),
             )
-            .where(Expense.household_id == household.id)
+            .where(*expense_filter)
             .group_by(Expense.paid_by, Expense.split_type)
         )
     ).all()
-
-    a_paid = 0.0
-    b_paid = 0.0
-    a_fair_share = 0.0
-    b_fair_share = 0.0
-
     for row in expenses:
-        total = float(row.total)
         payer_is_a = row.paid_by == a_id
-
-        if payer_is_a:
-            a_paid += total
-        else:
-            b_paid += total
-
+        totals["a_paid" if payer_is_a else "b_paid"] += row.total
         if row.split_type == "shared":
-            a_fair_share += total * a_ratio
-            b_fair_share += total * b_ratio
+            totals["shared_total"] += row.total
         elif row.split_type == "equal":
-            a_fair_share += total * 0.5
-            b_fair_share += total * 0.5
+            totals["equal_total"] += row.total
         elif row.split_type == "personal":
-            if payer_is_a:
-                a_fair_share += total
-            else:
-                b_fair_share += total
+            totals["a_personal" if payer_is_a else "b_personal"] += row.total
 
-    # Settlements
-    settlements_a_to_b = (
+    settled = (
         await db.execute(
-            select(func.coalesce(func.sum(Settlement.amount), 0)).where(
-                Settlement.household_id == household.id,
-                Settlement.from_user == a_id,
-            )
+            select(
+                func.coalesce(func.sum(Settlement.amount).filter(Settlement.from_user == a_id), 0),
+                func.coalesce(
+                    func.sum(Settlement.amount).filter(
+                        Settlement.from_user == (b_id or a_id), Settlement.to_user == a_id,
+                    ),
+                    0,
+                ),
+            ).where(*settlement_filter)
         )
-    ).scalar() or 0
+    ).one()
+    totals["settled_a_to_b"] += settled[0]
+    totals["settled_b_to_a"] += settled[1]
+    return totals
+
 
-    settlements_b_to_a = (
+async def _checkpoint_base(household: Household, db: AsyncSession) -> BalanceCheckpoint | None:
+    """Latest checkpoint, first recomputing any that a backdated write made stale.
+
+    Stale checkpoints are always the newest ones (the trigger marks every
+    checkpoint on or after the earliest touched date), so they are rebuilt
+    oldest first, each from the one before it. The household row lock keeps
+    writers out until the caller commits.
+    """
+    latest = (
         await db.execute(
-            select(func.coalesce(func.sum(Settlement.amount), 0)).where(
-                Settlement.household_id == household.id,
-                Settlement.from_user == (b_id or a_id),
-                Settlement.to_user == a_id,
-            )
+            select(BalanceCheckpoint)
+            .where(BalanceCheckpoint.household_id == household.id)
+            .order_by(desc(BalanceCheckpoint.through_date))
+            .limit(1)
         )
-    ).scalar() or 0
+    ).scalar_one_or_none()
+    if latest is None or not latest.stale:
+        return latest
+
+    await db.execute(select(Household.id).where(Household.id == household.id).with_for_update())
+    checkpoints = (
+        await db.execute(
+            select(BalanceCheckpoint)
+            .where(BalanceCheckpoint.household_id == household.id)
+            .order_by(BalanceCheckpoint.through_date)
+            .execution_options(populate_existing=True)
+        )
+    ).scalars().all()
+
+    prev = None
+    for cp in checkpoints:
+        if cp.stale:
+            delta = await _balance_totals(
+                household, db, after=prev.through_date if prev else None, through=cp.through_date,
+            )
+            values = {f: (getattr(prev, f) if prev else 0) + delta[f] for f in TOTAL_FIELDS}
+            await db.execute(
+                update(BalanceCheckpoint).where(BalanceCheckpoint.id == cp.id).values(stale=False, **values)
+            )
+            for f, v in values.items():
+                setattr(cp, f, v)
+            cp.stale = False
+        prev = cp
+    return prev
+
+
+def _checkpoint_to_response(cp: BalanceCheckpoint | Row) -> BalanceCheckpointResponse:
+    return BalanceCheckpointResponse(
+        id=str(cp.id),
+        through_date=cp.through_date.isoformat(),
+        user_a_paid=float(cp.a_paid),
+        user_b_paid=float(cp.b_paid),
+        settlements_total=float(cp.settled_a_to_b + cp.settled_b_to_a),
+        stale=cp.stale,
+        created_at=cp.created_at.isoformat(),
+    )
+
+
+@router.get("/balance", response_model=BalanceResponse)
+async def get_balance(
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    a_id = household.user_a_id
+    b_id = household.user_b_id
+    with span("balance.split_ratio"):
+        a_ratio, b_ratio = await _get_split_ratio(household.id, a_id, b_id, db)
+
+    # Start from the last closed period and only scan activity after it
+    with span("balance.checkpoint") as checkpoint_span:
+        base = await _checkpoint_base(household, db)
+        if checkpoint_span is not None:
+            checkpoint_span.attributes["closed_through"] = base.through_date.isoformat() if base else ""
+    with span("balance.totals"):
+        totals = await _balance_totals(household, db, after=base.through_date if base else None)
+    if base:
+        for f in TOTAL_FIELDS:
+            totals[f] += getattr(base, f)
+    await db.commit()
+
+    t = {f: float(v) for f, v in totals.items()}
+    a_paid = t["a_paid"]
+    b_paid = t["b_paid"]
+    a_fair_share = t["shared_total"] * a_ratio + t["equal_total"] * 0.5 + t["a_personal"]
+    b_fair_share = t["shared_total"] * b_ratio + t["equal_total"] * 0.5 + t["b_personal"]
 
     # Net: positive = A owes B
-    net = (a_fair_share - a_paid) - float(settlements_a_to_b) + float(settlements_b_to_a)
+    net = (a_fair_share - a_paid) - t["settled_a_to_b"] + t["settled_b_to_a"]
 
     return BalanceResponse(
         user_a_id=str(a_id),
@@ -133,14 +235,98 @@ async def get_balance(
         user_a_fair_share=round(a_fair_share, 2),
         user_b_fair_share=round(b_fair_share, 2),
         net_balance=round(net, 2),
-        settlements_total=round(float(settlements_a_to_b) + float(settlements_b_to_a), 2),
+        settlements_total=round(t["settled_a_to_b"] + t["settled_b_to_a"], 2),
+        closed_through=base.through_date.isoformat() if base else None,
+    )
+
+
+@router.post("/balance/close", response_model=BalanceCheckpointResponse, status_code=201)
+async def close_period(
+    data: BalanceClose,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Checkpoint the balance components through a past date.
+
+    Later writes dated on or before it mark the checkpoint stale rather than
+    being rejected; the next balance read rebuilds it.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    yesterday = date.today() - timedelta(days=1)
+    through = data.through_date or yesterday
+    if through > yesterday:
+        raise HTTPException(status_code=400, detail="Only days that are over can be closed")
+
+    # Hold the household lock while summing so no write can slip in between
+    # the sums and the new checkpoint
+    await db.execute(select(Household.id).where(Household.id == household.id).with_for_update())
+    base = await _checkpoint_base(household, db)
+    if base and through <= base.through_date:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Already closed through {base.through_date.isoformat()}")
+
+    totals = await _balance_totals(household, db, after=base.through_date if base else None, through=through)
+    if base:
+        for f in TOTAL_FIELDS:
+            totals[f] += getattr(base, f)
+    checkpoint = await insert_returning(db, BalanceCheckpoint, dict(
+        household_id=household.id,
+        through_date=through,
+        **totals,
+    ))
+    return _checkpoint_to_response(checkpoint)
+
+
+@router.get("/balance/checkpoints", response_model=list[BalanceCheckpointResponse])
+async def list_checkpoints(
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    checkpoints = (
+        await db.execute(
+            select(BalanceCheckpoint)
+            .where(BalanceCheckpoint.household_id == household.id)
+            .order_by(desc(BalanceCheckpoint.through_date))
+        )
+    ).scalars().all()
+    return [_checkpoint_to_response(cp) for cp in checkpoints]
+
+
+@router.delete("/balance/checkpoints/{checkpoint_id}", status_code=204)
+async def delete_checkpoint(
+    checkpoint_id: str,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Reopen a closed period. Each checkpoint is cumulative, so later ones stay valid."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    deleted = await delete_returning(
+        db, BalanceCheckpoint,
+        [BalanceCheckpoint.id == UUID(checkpoint_id), BalanceCheckpoint.household_id == household.id],
     )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Checkpoint not found")
 
 
 @router.get("/stats/monthly", response_model=MonthlySummary)
 async def monthly_stats(
-    year: int = Query(...),
+    year: int = Query(..., ge=1, le=9998),
     month: int = Query(..., ge=1, le=12),
+    tags_all: list[str] | None = Query(None),
+    tags_any: list[str] | None = Query(None),
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -149,13 +335,8 @@ async def monthly_stats(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    base = (
-        select(Expense)
-        .where(
-            Expense.household_id == household.id,
-            extract("year", Expense.date) == year,
-            extract("month", Expense.date) == month,
-        )
+    base = select(Expense).where(
+        *expense_conditions(household.id, year=year, month=month, tags_all=tags_all, tags_any=tags_any)
     )
 
     expenses = (await db.execute(base)).scalars().all()
@@ -205,8 +386,10 @@ async def monthly_stats(
 
 @router.get("/stats/categories", response_model=list[CategorySpending])
 async def category_stats(
-    year: int | None = Query(None),
+    year: int | None = Query(None, ge=1, le=9998),
     month: int | None = Query(None, ge=1, le=12),
+    tags_all: list[str] | None = Query(None),
+    tags_any: list[str] | None = Query(None),
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -221,14 +404,9 @@ async def category_stats(
             func.sum(Expense.amount).label("total"),
             func.count(Expense.id).label("count"),
         )
-        .where(Expense.household_id == household.id)
+        .where(*expense_conditions(household.id, year=year, month=month, tags_all=tags_all, tags_any=tags_any))
     )
 
-    if year:
-        query = query.where(extract("year", Expense.date) == year)
-    if month:
-        query = query.where(extract("month", Expense.date) == month)
-
     query = query.group_by(Expense.category_id).order_by(desc("total"))
     rows = (await db.execute(query)).all()
 
@@ -254,41 +432,511 @@ async def category_stats(
     return results
 
 
+# Granularity -> (date_trunc unit, generate_series step)
+TREND_GRANULARITIES = {
+    "week": ("week", "1 week"),
+    "month": ("month", "1 month"),
+    "quarter": ("quarter", "3 months"),
+    "year": ("year", "1 year"),
+}
+
+# series_by -> (expression for the series key, label join)
+TREND_SERIES = {
+    None: ("NULL::uuid", None),
+    "category": ("category_id", "LEFT JOIN pairledger.categories c ON c.id = a.series_key"),
+    "payer": ("paid_by", None),
+}
+
+
+def _add_months(d: date, n: int) -> date:
+    months = d.year * 12 + d.month - 1 + n
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _trend_bounds(granularity: str, periods: int, today: date) -> tuple[date, date]:
+    """Start of the first period and start of the period after the current one."""
+    if granularity == "week":
+        current = today - timedelta(days=today.weekday())
+        return current - timedelta(weeks=periods - 1), current + timedelta(weeks=1)
+    if granularity == "month":
+        current = today.replace(day=1)
+        return _add_months(current, -(periods - 1)), _add_months(current, 1)
+    if granularity == "quarter":
+        current = date(today.year, (today.month - 1) // 3 * 3 + 1, 1)
+        return _add_months(current, -3 * (periods - 1)), _add_months(current, 3)
+    return date(today.year - periods + 1, 1, 1), date(today.year + 1, 1, 1)
+
+
+async def _compute_trends(
+    household: Household,
+    db: AsyncSession,
+    granularity: str,
+    periods: int,
+    series_by: str | None,
+    tags_all: list[str] | None,
+    tags_any: list[str] | None,
+) -> TrendResponse:
+    """Gap-filled spend per period, optionally split into per-key series.
+
+    Buckets are ``date_trunc`` periods over a ``generate_series`` spine, so
+    periods without spend come back as zeros. Everything is one query; results
+    are cached until the household's data version changes.
+    """
+    today = date.today()
+    all_tags = normalize_tags(tags_all)
+    any_tags = normalize_tags(tags_any)
+    cache_key = ("trends", today, granularity, periods, series_by, tuple(all_tags), tuple(any_tags))
+    cached = household_cache.get(household, cache_key)
+    if (handler_span := current_span()) is not None:
+        handler_span.attributes["trends.cache_hit"] = cached is not None
+    if cached is not None:
+        return cached
+
+    unit, step = TREND_GRANULARITIES[granularity]
+    series_expr, label_join = TREND_SERIES[series_by]
+    start, end = _trend_bounds(granularity, periods, today)
+
+    params = {"hid": str(household.id), "start": start, "end": end}
+    tag_filter = ""
+    if all_tags:
+        tag_filter += " AND tags @> CAST(:tags_all AS text[])"
+        params["tags_all"] = all_tags
+    if any_tags:
+        tag_filter += " AND tags && CAST(:tags_any AS text[])"
+        params["tags_any"] = any_tags
+
+    if series_by is None:
+        keys_sql = "SELECT NULL::uuid AS series_key, NULL::text AS label"
+    else:
+        label = "c.name" if label_join else "NULL::text"
+        keys_sql = f"SELECT DISTINCT a.series_key, {label} AS label FROM agg a {label_join or ''}"
+
+    rows = (
+        await db.execute(
+            text(f"""
+                WITH spine AS (
+                    SELECT generate_series(
+                        CAST(:start AS date)::timestamp, CAST(:end AS date)::timestamp - INTERVAL '1 day', INTERVAL '{step}'
+                    )::date AS period
+                ),
+                agg AS (
+                    SELECT
+                        date_trunc('{unit}', date::timestamp)::date AS period,
+                        {series_expr} AS series_key,
+                        SUM(amount) AS total,
+                        SUM(amount) FILTER (WHERE split_type = 'shared') AS shared,
+                        SUM(amount) FILTER (WHERE split_type = 'personal') AS personal,
+                        SUM(amount) FILTER (WHERE split_type = 'equal') AS equal,
+                        COUNT(*) AS count
+                    FROM pairledger.expenses
+                    WHERE household_id = :hid
+                      AND date >= :start AND date < :end
+                      {tag_filter}
+                    GROUP BY 1, 2
+                ),
+                keys AS ({keys_sql})
+                SELECT
+                    s.period,
+                    k.series_key,
+                    k.label,
+                    COALESCE(a.total, 0) AS total,
+                    COALESCE(a.shared, 0) AS shared,
+                    COALESCE(a.personal, 0) AS personal,
+                    COALESCE(a.equal, 0) AS equal,
+                    COALESCE(a.count, 0) AS count
+                FROM spine s
+                CROSS JOIN keys k
+                LEFT JOIN agg a ON a.period = s.period AND a.series_key IS NOT DISTINCT FROM k.series_key
+                ORDER BY k.label NULLS LAST, k.series_key NULLS FIRST, s.period
+            """),
+            params,
+        )
+    ).fetchall()
+
+    totals: dict[date, list[float]] = {}
+    series: dict[str | None, TrendSeries] = {}
+    for row in rows:
+        amounts = [float(row.total), float(row.shared), float(row.personal), float(row.equal), row.count]
+        bucket = totals.setdefault(row.period, [0.0, 0.0, 0.0, 0.0, 0])
+        for i, value in enumerate(amounts):
+            bucket[i] += value
+        if series_by is None:
+            continue
+        key = str(row.series_key) if row.series_key else None
+        if key not in series:
+            if series_by == "category":
+                label = row.label or "Uncategorized"
+            else:
+                label = "user_a" if row.series_key == household.user_a_id else "user_b"
+            series[key] = TrendSeries(key=key, label=label, points=[])
+        series[key].points.append(_trend_point(row.period, amounts))
+
+    # An empty series query leaves no spine rows behind; fill the totals anyway.
+    period = start
+    while period < end:
+        totals.setdefault(period, [0.0, 0.0, 0.0, 0.0, 0])
+        period = _next_period(granularity, period)
+
+    result = TrendResponse(
+        granularity=granularity,
+        start=start.isoformat(),
+        end=end.isoformat(),
+        totals=[_trend_point(p, amounts) for p, amounts in sorted(totals.items())],
+        series=list(series.values()),
+    )
+    household_cache.set(household, cache_key, result)
+    return result
+
+
+def _next_period(granularity: str, period: date) -> date:
+    if granularity == "week":
+        return period + timedelta(weeks=1)
+    return _add_months(period, {"month": 1, "quarter": 3, "year": 12}[granularity])
+
+
+def _trend_point(period: date, amounts: list) -> TrendPoint:
+    total, shared, personal, equal, count = amounts
+    return TrendPoint(
+        period=period.isoformat(),
+        total=round(total, 2),
+        shared=round(shared, 2),
+        personal=round(personal, 2),
+        equal=round(equal, 2),
+        count=count,
+    )
+
+
 @router.get("/stats/trends", response_model=list[MonthlyTrend])
 async def spending_trends(
-    months: int = Query(12, ge=1, le=60),
+    months: int = Query(12, ge=1, le=240),
+    tags_all: list[str] | None = Query(None),
+    tags_any: list[str] | None = Query(None),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    trends = await _compute_trends(household, db, "month", months, None, tags_all, tags_any)
+    return [
+        MonthlyTrend(month=p.period[:7], total=p.total, shared=p.shared, personal=p.personal)
+        for p in trends.totals
+    ]
+
+
+@router.get("/stats/trends/series", response_model=TrendResponse)
+async def spending_trend_series(
+    granularity: str = Query("month", pattern=r"^(week|month|quarter|year)$"),
+    periods: int = Query(12, ge=1, le=520),
+    series_by: str | None = Query(None, pattern=r"^(category|payer)$"),
+    tags_all: list[str] | None = Query(None),
+    tags_any: list[str] | None = Query(None),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    return await _compute_trends(household, db, granularity, periods, series_by, tags_all, tags_any)
+
+
+@router.get("/stats/tags", response_model=list[TagSpending])
+async def tag_stats(
+    year: int | None = Query(None, ge=1, le=9998),
+    month: int | None = Query(None, ge=1, le=12),
+    tags_any: list[str] | None = Query(None),
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """Spend per tag, aggregated in SQL over the unnested tag arrays."""
     uid = UUID(user.id)
     household = await get_user_household(uid, db)
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
+    tag = func.unnest(Expense.tags).column_valued("tag")
     rows = (
         await db.execute(
-            text("""
-                SELECT
-                    TO_CHAR(date, 'YYYY-MM') AS month,
-                    COALESCE(SUM(amount), 0) AS total,
-                    COALESCE(SUM(CASE WHEN split_type = 'shared' THEN amount ELSE 0 END), 0) AS shared,
-                    COALESCE(SUM(CASE WHEN split_type = 'personal' THEN amount ELSE 0 END), 0) AS personal
-                FROM pairledger.expenses
-                WHERE household_id = :hid
-                  AND date >= CURRENT_DATE - :months * INTERVAL '1 month'
-                GROUP BY TO_CHAR(date, 'YYYY-MM')
-                ORDER BY month
-            """),
-            {"hid": str(household.id), "months": months},
+            select(
+                tag.label("tag"),
+                func.sum(Expense.amount).label("total"),
+                func.count().label("count"),
+            )
+            .where(*expense_conditions(household.id, year=year, month=month, tags_any=tags_any))
+            .group_by(tag)
+            .order_by(desc("total"))
         )
-    ).fetchall()
+    ).all()
 
     return [
-        MonthlyTrend(
-            month=row.month,
-            total=round(float(row.total), 2),
-            shared=round(float(row.shared), 2),
-            personal=round(float(row.personal), 2),
-        )
+        TagSpending(tag=row.tag, total=round(float(row.total), 2), count=row.count)
         for row in rows
     ]
+
+
+def _period_comparison(current: float, previous: float, last_year: float) -> PeriodComparison:
+    return PeriodComparison(
+        current=round(current, 2),
+        previous=round(previous, 2),
+        last_year=round(last_year, 2),
+        delta_previous=round(current - previous, 2),
+        delta_last_year=round(current - last_year, 2),
+        pct_previous=round((current - previous) / previous * 100, 1) if previous else None,
+        pct_last_year=round((current - last_year) / last_year * 100, 1) if last_year else None,
+    )
+
+
+def _payer_comparison(payers: dict[str, list[float]]) -> PayerComparison:
+    return PayerComparison(
+        user_a=_period_comparison(*payers["user_a"]),
+        user_b=_period_comparison(*payers["user_b"]),
+        difference=round(payers["user_a"][0] - payers["user_b"][0], 2),
+    )
+
+
+# One pass over the three months: FILTER splits the periods, GROUPING SETS
+# produce per-category-and-payer, per-category, per-payer and overall rows.
+# GROUPING() is a bitmask of the rolled-up columns: 1 = paid_by, 2 = category_id.
+COMPARE_SQL = text("""
+    WITH agg AS (
+        SELECT
+            category_id,
+            paid_by,
+            GROUPING(category_id, paid_by) AS rollup,
+            SUM(amount) FILTER (WHERE date >= :current_start) AS current,
+            SUM(amount) FILTER (WHERE date >= :previous_start AND date < :current_start) AS previous,
+            SUM(amount) FILTER (WHERE date < :previous_start) AS last_year
+        FROM pairledger.expenses
+        WHERE household_id = :hid
+          AND ((date >= :previous_start AND date < :current_end)
+               OR (date >= :last_year_start AND date < :last_year_end))
+        GROUP BY GROUPING SETS ((category_id, paid_by), (category_id), (paid_by), ())
+    )
+    SELECT a.*, c.name AS category_name
+    FROM agg a
+    LEFT JOIN pairledger.categories c ON c.id = a.category_id
+""")
+
+
+@router.get("/stats/compare", response_model=CompareResponse)
+async def compare_stats(
+    year: int | None = Query(None, ge=2, le=9998),
+    month: int | None = Query(None, ge=1, le=12),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """A month against the month before and the same month last year, overall,
+    per payer and per category (with per-payer splits), in one query.
+
+    Defaults to the current month; cached until the household's data changes.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    today = date.today()
+    current_start = date(year or today.year, month or today.month, 1)
+    cache_key = ("compare", current_start)
+    cached = household_cache.get(household, cache_key)
+    if cached is not None:
+        return cached
+
+    previous_start = _add_months(current_start, -1)
+    last_year_start = _add_months(current_start, -12)
+    rows = (
+        await db.execute(COMPARE_SQL, {
+            "hid": household.id,
+            "current_start": current_start,
+            "current_end": _add_months(current_start, 1),
+            "previous_start": previous_start,
+            "last_year_start": last_year_start,
+            "last_year_end": _add_months(last_year_start, 1),
+        })
+    ).all()
+
+    def payer(paid_by: UUID) -> str:
+        return "user_a" if paid_by == household.user_a_id else "user_b"
+
+    def zeros() -> dict[str, list[float]]:
+        return {"user_a": [0.0, 0.0, 0.0], "user_b": [0.0, 0.0, 0.0]}
+
+    total = [0.0, 0.0, 0.0]
+    payers = zeros()
+    categories: dict[UUID | None, dict] = {}
+    for row in rows:
+        values = [float(row.current or 0), float(row.previous or 0), float(row.last_year or 0)]
+        if row.rollup == 3:
+            total = values
+        elif row.rollup == 2:
+            payers[payer(row.paid_by)] = [a + b for a, b in zip(payers[payer(row.paid_by)], values)]
+        else:
+            category = categories.setdefault(
+                row.category_id, {"name": row.category_name, "total": [0.0, 0.0, 0.0], "payers": zeros()},
+            )
+            if row.rollup == 1:
+                category["total"] = values
+            else:
+                bucket = category["payers"][payer(row.paid_by)]
+                category["payers"][payer(row.paid_by)] = [a + b for a, b in zip(bucket, values)]
+
+    result = CompareResponse(
+        current=current_start.strftime("%Y-%m"),
+        previous=previous_start.strftime("%Y-%m"),
+        last_year=last_year_start.strftime("%Y-%m"),
+        total=_period_comparison(*total),
+        by_payer=_payer_comparison(payers),
+        categories=[
+            CategoryComparison(
+                category_id=str(cid) if cid else None,
+                category_name=c["name"] or "Uncategorized",
+                total=_period_comparison(*c["total"]),
+                by_payer=_payer_comparison(c["payers"]),
+            )
+            for cid, c in sorted(categories.items(), key=lambda item: item[1]["total"][0], reverse=True)
+        ],
+    )
+    household_cache.set(household, cache_key, result)
+    return result
+
+
+# Occurrences per month a recurring item averages, for netting it out of
+# historical spend
+MONTHLY_EQUIVALENT = {"weekly": 52 / 12, "biweekly": 26 / 12, "monthly": 1.0, "yearly": 1 / 12}
+
+
+def _occurrences(frequency: str, anchor: date, start: date, end: date) -> int:
+    """How many times an item falls in ``[start, end)`` (one calendar month).
+
+    Weekly and biweekly items repeat every 7/14 days from ``anchor`` (the
+    day they were created), yearly items in the anchor's month; counted
+    arithmetically, without walking the days.
+    """
+    if frequency == "monthly":
+        return 1
+    if frequency == "yearly":
+        return 1 if start.month == anchor.month else 0
+    step = 7 if frequency == "weekly" else 14
+    first = start + timedelta(days=(anchor - start).days % step)
+    return 0 if first >= end else (end - first - timedelta(days=1)).days // step + 1
+
+
+@router.get("/forecast", response_model=ForecastResponse)
+async def forecast(
+    months: int = Query(6, ge=1, le=60),
+    history_months: int = Query(6, ge=1, le=36),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Projected spend for the next ``months`` calendar months.
+
+    Each month is the active recurring items expanded into their occurrences,
+    plus discretionary spend: the average over the last ``history_months``
+    full months per category, split type and payer, less what recurring
+    items already account for in that bucket. Fair shares use the current
+    income ratio. Cached until the household's data (including recurring
+    items and incomes) changes.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    this_month = date.today().replace(day=1)
+    cache_key = ("forecast", this_month, months, history_months)
+    cached = household_cache.get(household, cache_key)
+    if cached is not None:
+        return cached
+
+    with span("balance.split_ratio"):
+        ratio_a, ratio_b = await _get_split_ratio(household.id, household.user_a_id, household.user_b_id, db)
+    recurring = (
+        await db.execute(
+            select(RecurringExpense).where(RecurringExpense.household_id == household.id, RecurringExpense.active)
+        )
+    ).scalars().all()
+    history = (
+        await db.execute(
+            select(Expense.category_id, Expense.split_type, Expense.paid_by, func.sum(Expense.amount).label("total"))
+            .where(
+                Expense.household_id == household.id,
+                Expense.date >= _add_months(this_month, -history_months),
+                Expense.date < this_month,
+            )
+            .group_by(Expense.category_id, Expense.split_type, Expense.paid_by)
+        )
+    ).all()
+    names = {
+        c.id: c.name
+        for c in (await db.execute(select(Category).where(Category.household_id == household.id))).scalars()
+    }
+
+    def bucket(category_id, split_type: str, paid_by: UUID) -> tuple:
+        return category_id, split_type, paid_by == household.user_a_id
+
+    discretionary: dict[tuple, float] = {}
+    for row in history:
+        key = bucket(row.category_id, row.split_type, row.paid_by)
+        discretionary[key] = discretionary.get(key, 0.0) + float(row.total) / history_months
+    for item in recurring:
+        key = bucket(item.category_id, item.split_type, item.paid_by)
+        if key in discretionary:
+            discretionary[key] -= float(item.amount) * MONTHLY_EQUIVALENT[item.frequency]
+    discretionary = {key: amount for key, amount in discretionary.items() if amount > 0}
+
+    starts = [_add_months(this_month, i) for i in range(1, months + 2)]
+    categories: dict[UUID | None, list[float]] = {}
+    result_months = []
+    for start, end in zip(starts, starts[1:]):
+        by_split = {"shared": 0.0, "personal": 0.0, "equal": 0.0}
+        personal = [0.0, 0.0]  # user_a, user_b
+        recurring_total = 0.0
+        entries = [
+            (bucket(item.category_id, item.split_type, item.paid_by),
+             float(item.amount) * _occurrences(item.frequency, item.created_at.date(), start, end), True)
+            for item in recurring
+        ]
+        entries += [(key, amount, False) for key, amount in discretionary.items()]
+        for (category_id, split_type, by_a), amount, is_recurring in entries:
+            if not amount:
+                continue
+            by_split[split_type] += amount
+            if split_type == "personal":
+                personal[0 if by_a else 1] += amount
+            categories.setdefault(category_id, [0.0, 0.0])[0 if is_recurring else 1] += amount
+            if is_recurring:
+                recurring_total += amount
+        total = sum(by_split.values())
+        result_months.append(ForecastMonth(
+            month=start.strftime("%Y-%m"),
+            recurring=round(recurring_total, 2),
+            discretionary=round(total - recurring_total, 2),
+            total=round(total, 2),
+            shared=round(by_split["shared"], 2),
+            personal=round(by_split["personal"], 2),
+            equal=round(by_split["equal"], 2),
+            user_a_share=round(by_split["shared"] * ratio_a + by_split["equal"] / 2 + personal[0], 2),
+            user_b_share=round(by_split["shared"] * ratio_b + by_split["equal"] / 2 + personal[1], 2),
+        ))
+
+    result = ForecastResponse(
+        history_months=history_months,
+        user_a_ratio=round(ratio_a, 4),
+        user_b_ratio=round(ratio_b, 4),
+        months=result_months,
+        categories=[
+            ForecastCategory(
+                category_id=str(cid) if cid else None,
+                category_name=names.get(cid, "Uncategorized"),
+                recurring=round(amounts[0], 2),
+                discretionary=round(amounts[1], 2),
+            )
+            for cid, amounts in sorted(categories.items(), key=lambda item: sum(item[1]), reverse=True)
+        ],
+    )
+    household_cache.set(household, cache_key, result)
+    return result
@@ -0,0 +1,81 @@
+import calendar
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+
+from ..auth import get_current_user, ShelfUser
+from ..database import get_db
+from ..limits import limit
+from ..models import Category, CategoryMonthTotal
+from ..schemas import BudgetStatus, BudgetStatusResponse
+from ..tracing import TracedRoute, span
+from .household import get_user_household
+
+router = APIRouter(prefix="/api/budgets", tags=["budgets"], dependencies=[limit("cheap")], route_class=TracedRoute)
+
+
+@router.get("/status", response_model=BudgetStatusResponse)
+async def budget_status(
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Current-month budget status for every budgeted category.
+
+    Served from the month-to-date counters in ``category_month_totals``, so
+    the cost is one indexed lookup per category regardless of history size.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    today = date.today()
+    month_start = today.replace(day=1)
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+
+    with span("budgets.counters"):
+        rows = (
+            await db.execute(
+                select(
+                    Category.id,
+                    Category.name,
+                    Category.icon,
+                    Category.budget_monthly,
+                    CategoryMonthTotal.total,
+                    CategoryMonthTotal.count,
+                )
+                .outerjoin(
+                    CategoryMonthTotal,
+                    and_(CategoryMonthTotal.category_id == Category.id, CategoryMonthTotal.month == month_start),
+                )
+                .where(Category.household_id == household.id, Category.budget_monthly.isnot(None))
+                .order_by(Category.name)
+            )
+        ).all()
+
+    categories = []
+    for row in rows:
+        budget = float(row.budget_monthly)
+        spent = float(row.total or 0)
+        categories.append(BudgetStatus(
+            category_id=str(row.id),
+            category_name=row.name,
+            category_icon=row.icon,
+            budget=round(budget, 2),
+            spent=round(spent, 2),
+            remaining=round(budget - spent, 2),
+            percent_used=round(spent / budget * 100, 1) if budget > 0 else 0.0,
+            projected=round(spent / today.day * days_in_month, 2),
+            count=row.count or 0,
+        ))
+
+    return BudgetStatusResponse(
+        year=today.year,
+        month=today.month,
+        days_elapsed=today.day,
+        days_in_month=days_in_month,
+        categories=categories,
+    )
@@ -3,18 +3,22 @@ from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from shelf_auth_middleware import get_current_user, ShelfUser
+from sqlalchemy import select, update, delete
+from sqlalchemy.engine import Row
 
+from ..auth import get_current_user, ShelfUser
 from ..database import get_db
-from ..models import Category
-from ..schemas import CategoryCreate, CategoryUpdate, CategoryResponse
+from ..limits import limit
+from ..models import Category, Expense, RecurringExpense
+from ..schemas import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryMergeResult
+from ..writes import insert_returning, update_returning, delete_returning
+from ..tracing import TracedRoute
 from .household import get_user_household
 
-router = APIRouter(prefix="/api/categories", tags=["categories"])
+router = APIRouter(prefix="/api/categories", tags=["categories"], route_class=TracedRoute)
 
 
-def _cat_to_response(c: Category) -> CategoryResponse:
+def _cat_to_response(c: Category | Row) -> CategoryResponse:
     return CategoryResponse(
         id=str(c.id),
         name=c.name,
@@ -25,7 +29,7 @@ def _cat_to_response(c: Category) -> CategoryResponse:
     )
 
 
-@router.get("", response_model=list[CategoryResponse])
+@router.get("", response_model=list[CategoryResponse], dependencies=[limit("cheap")])
 async def list_categories(
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -46,7 +50,7 @@ async def list_categories(
     return [_cat_to_response(c) for c in cats]
 
 
-@router.post("", response_model=CategoryResponse, status_code=201)
+@router.post("", response_model=CategoryResponse, status_code=201, dependencies=[limit("cheap")])
 async def create_category(
     data: CategoryCreate,
     user: ShelfUser = Depends(get_current_user),
@@ -57,21 +61,18 @@ async def create_category(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    cat = Category(
+    row = await insert_returning(db, Category, dict(
         household_id=household.id,
         name=data.name.strip(),
         icon=data.icon,
         color=data.color,
         budget_monthly=Decimal(str(data.budget_monthly)) if data.budget_monthly else None,
-    )
-    db.add(cat)
-    await db.commit()
-    await db.refresh(cat)
+    ))
 
-    return _cat_to_response(cat)
+    return _cat_to_response(row)
 
 
-@router.put("/{category_id}", response_model=CategoryResponse)
+@router.put("/{category_id}", response_model=CategoryResponse, dependencies=[limit("cheap")])
 async def update_category(
     category_id: str,
     data: CategoryUpdate,
@@ -83,32 +84,20 @@ async def update_category(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    cat = (
-        await db.execute(
-            select(Category).where(
-                Category.id == UUID(category_id),
-                Category.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not cat:
-        raise HTTPException(status_code=404, detail="Category not found")
-
     update_data = data.model_dump(exclude_unset=True)
     if "budget_monthly" in update_data and update_data["budget_monthly"] is not None:
         update_data["budget_monthly"] = Decimal(str(update_data["budget_monthly"]))
 
-    for key, value in update_data.items():
-        setattr(cat, key, value)
-
-    await db.commit()
-    await db.refresh(cat)
+    row = await update_returning(
+        db, Category, [Category.id == UUID(category_id), Category.household_id == household.id], update_data,
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Category not found")
 
-    return _cat_to_response(cat)
+    return _cat_to_response(row)
 
 
-@router.delete("/{category_id}", status_code=204)
+@router.delete("/{category_id}", status_code=204, dependencies=[limit("cheap")])
 async def delete_category(
     category_id: str,
     user: ShelfUser = Depends(get_current_user),
@@ -119,17 +108,63 @@ async def delete_category(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    cat = (
-        await db.execute(
-            select(Category).where(
-                Category.id == UUID(category_id),
-                Category.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
+    deleted = await delete_returning(db, Category, [Category.id == UUID(category_id), Category.household_id == household.id])
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Category not found")
 
-    if not cat:
+
+@router.post("/{category_id}/merge-into/{target_id}", response_model=CategoryMergeResult, dependencies=[limit("bulk")])
+async def merge_category(
+    category_id: str,
+    target_id: str,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Fold one category into another and delete it, in a single transaction.
+
+    Expenses and recurring items are reassigned with one UPDATE each. The
+    per-category month totals for every affected month move with the
+    expense UPDATE, via the statement-level triggers on expenses.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    source_uuid = UUID(category_id)
+    target_uuid = UUID(target_id)
+    if source_uuid == target_uuid:
+        raise HTTPException(status_code=400, detail="Cannot merge a category into itself")
+
+    cats = {
+        c.id: c
+        for c in (
+            await db.execute(
+                select(Category).where(
+                    Category.id.in_([source_uuid, target_uuid]),
+                    Category.household_id == household.id,
+                )
+            )
+        ).scalars()
+    }
+    if source_uuid not in cats or target_uuid not in cats:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    await db.delete(cat)
+    expenses_moved = await db.execute(
+        update(Expense)
+        .where(Expense.household_id == household.id, Expense.category_id == source_uuid)
+        .values(category_id=target_uuid)
+    )
+    recurring_moved = await db.execute(
+        update(RecurringExpense)
+        .where(RecurringExpense.household_id == household.id, RecurringExpense.category_id == source_uuid)
+        .values(category_id=target_uuid)
+    )
+    await db.execute(delete(Category).where(Category.id == source_uuid))
     await db.commit()
+
+    return CategoryMergeResult(
+        target=_cat_to_response(cats[target_uuid]),
+        expenses_moved=expenses_moved.rowcount,
+        recurring_moved=recurring_moved.rowcount,
+    )
@@ -1,25 +1,38 @@
+from datetime import date
 from uuid import UUID
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, extract
-from shelf_auth_middleware import get_current_user, ShelfUser
+from sqlalchemy import case, select, func, desc, update, delete, text
+from sqlalchemy.engine import Row
 
+from ..auth import get_current_user, ShelfUser
+from ..cache import household_cache
 from ..database import get_db
+from ..limits import limit
+from ..filters import expense_conditions, normalize_tags
 from ..models import Expense, Category
 from ..schemas import (
     ExpenseCreate,
     ExpenseUpdate,
     ExpenseResponse,
     ExpenseListResponse,
+    ExpenseBulkSelection,
+    ExpenseBulkUpdate,
+    ExpenseBulkResult,
+    DuplicateGroup,
+    DuplicateResolve,
+    DuplicateResolveResult,
 )
+from ..writes import insert_returning, update_returning, delete_returning
+from ..tracing import TracedRoute
 from .household import get_user_household
 
-router = APIRouter(prefix="/api/expenses", tags=["expenses"])
+router = APIRouter(prefix="/api/expenses", tags=["expenses"], route_class=TracedRoute)
 
 
-def _expense_to_response(e: Expense, cat_name: str | None = None, cat_icon: str | None = None) -> ExpenseResponse:
+def _expense_to_response(e: Expense | Row, cat_name: str | None = None, cat_icon: str | None = None) -> ExpenseResponse:
     return ExpenseResponse(
         id=str(e.id),
         paid_by=str(e.paid_by),
@@ -37,15 +50,17 @@ def _expense_to_response(e: Expense, cat_name: str | None = None, cat_icon: str
     )
 
 
-@router.get("", response_model=ExpenseListResponse)
+@router.get("", response_model=ExpenseListResponse, dependencies=[limit("cheap")])
 async def list_expenses(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    year: int | None = Query(None),
+    year: int | None = Query(None, ge=1, le=9998),
     month: int | None = Query(None, ge=1, le=12),
     category_id: str | None = Query(None),
     paid_by: str | None = Query(None),
     split_type: str | None = Query(None),
+    tags_all: list[str] | None = Query(None),
+    tags_any: list[str] | None = Query(None),
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -54,28 +69,22 @@ async def list_expenses(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
+    conditions = expense_conditions(
+        household.id,
+        year=year,
+        month=month,
+        category_id=category_id,
+        paid_by=paid_by,
+        split_type=split_type,
+        tags_all=tags_all,
+        tags_any=tags_any,
+    )
     query = (
         select(Expense, Category.name, Category.icon)
         .outerjoin(Category, Expense.category_id == Category.id)
-        .where(Expense.household_id == household.id)
+        .where(*conditions)
     )
-    count_query = select(func.count(Expense.id)).where(Expense.household_id == household.id)
-
-    if year:
-        query = query.where(extract("year", Expense.date) == year)
-        count_query = count_query.where(extract("year", Expense.date) == year)
-    if month:
-        query = query.where(extract("month", Expense.date) == month)
-        count_query = count_query.where(extract("month", Expense.date) == month)
-    if category_id:
-        query = query.where(Expense.category_id == UUID(category_id))
-        count_query = count_query.where(Expense.category_id == UUID(category_id))
-    if paid_by:
-        query = query.where(Expense.paid_by == UUID(paid_by))
-        count_query = count_query.where(Expense.paid_by == UUID(paid_by))
-    if split_type:
-        query = query.where(Expense.split_type == split_type)
-        count_query = count_query.where(Expense.split_type == split_type)
+    count_query = select(func.count(Expense.id)).where(*conditions)
 
     total = (await db.execute(count_query)).scalar() or 0
 
@@ -91,7 +100,7 @@ async def list_expenses(
     )
 
 
-@router.post("", response_model=ExpenseResponse, status_code=201)
+@router.post("", response_model=ExpenseResponse, status_code=201, dependencies=[limit("cheap")])
 async def create_expense(
     data: ExpenseCreate,
     user: ShelfUser = Depends(get_current_user),
@@ -107,9 +116,9 @@ async def create_expense(
     if paid_by not in (household.user_a_id, household.user_b_id):
         raise HTTPException(status_code=400, detail="Payer is not a household member")
 
-    tags = list(dict.fromkeys(t.strip().lower() for t in data.tags if t.strip()))
+    tags = normalize_tags(data.tags)
 
-    expense = Expense(
+    row = await insert_returning(db, Expense, dict(
         household_id=household.id,
         paid_by=paid_by,
         category_id=UUID(data.category_id) if data.category_id else None,
@@ -120,24 +129,279 @@ async def create_expense(
         notes=data.notes,
         tags=tags,
         receipt_url=data.receipt_url,
-    )
-    db.add(expense)
+    ))
+
+    return _expense_to_response(row, cat_name=row.category_name, cat_icon=row.category_icon)
+
+
+def _bulk_conditions(selection: ExpenseBulkSelection, household_id: UUID) -> list:
+    """WHERE clauses for a bulk operation: an explicit id list or a filter set."""
+    if (selection.ids is None) == (selection.filters is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of ids or filters")
+    if selection.ids is not None:
+        return [Expense.household_id == household_id, Expense.id.in_([UUID(i) for i in selection.ids])]
+    filters = selection.filters.model_dump(exclude_none=True)
+    if not filters:
+        raise HTTPException(status_code=400, detail="At least one filter is required for a bulk operation")
+    return expense_conditions(household_id, **filters)
+
+
+@router.patch("/bulk", response_model=ExpenseBulkResult, dependencies=[limit("bulk")])
+async def bulk_update_expenses(
+    data: ExpenseBulkUpdate,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Apply the same changes to many expenses in one UPDATE statement."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    conditions = _bulk_conditions(data, household.id)
+
+    changes = data.changes.model_dump(exclude_unset=True)
+    add_tags = normalize_tags(changes.pop("add_tags", None))
+    remove_tags = normalize_tags(changes.pop("remove_tags", None))
+    if "category_id" in changes and changes["category_id"]:
+        changes["category_id"] = UUID(changes["category_id"])
+    if "paid_by" in changes:
+        if not changes["paid_by"]:
+            raise HTTPException(status_code=400, detail="paid_by cannot be cleared")
+        changes["paid_by"] = UUID(changes["paid_by"])
+        if changes["paid_by"] not in (household.user_a_id, household.user_b_id):
+            raise HTTPException(status_code=400, detail="Payer is not a household member")
+    for key in ("split_type", "date"):
+        if key in changes and changes[key] is None:
+            raise HTTPException(status_code=400, detail=f"{key} cannot be cleared")
+    if add_tags or remove_tags:
+        changes["tags"] = text(
+            "ARRAY(SELECT DISTINCT t FROM unnest(coalesce(tags, '{}') || CAST(:add_tags AS text[])) AS t"
+            " WHERE t <> ALL(CAST(:remove_tags AS text[])) ORDER BY t)"
+        ).bindparams(add_tags=add_tags, remove_tags=remove_tags)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+
+    # Month-to-date counters and the household data version are adjusted by
+    # statement-level triggers inside this same statement.
+    rows = (
+        await db.execute(update(Expense).where(*conditions).values(**changes).returning(Expense.id))
+    ).all()
     await db.commit()
-    await db.refresh(expense)
 
-    # Fetch category name
-    cat_name = None
-    cat_icon = None
-    if expense.category_id:
-        cat = (await db.execute(select(Category).where(Category.id == expense.category_id))).scalar_one_or_none()
-        if cat:
-            cat_name = cat.name
-            cat_icon = cat.icon
+    return ExpenseBulkResult(count=len(rows), ids=[str(row.id) for row in rows])
+
+
+@router.delete("/bulk", response_model=ExpenseBulkResult, dependencies=[limit("bulk")])
+async def bulk_delete_expenses(
+    data: ExpenseBulkSelection,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete many expenses in one DELETE statement."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    conditions = _bulk_conditions(data, household.id)
+    rows = (await db.execute(delete(Expense).where(*conditions).returning(Expense.id))).all()
+    await db.commit()
 
-    return _expense_to_response(expense, cat_name=cat_name, cat_icon=cat_icon)
+    return ExpenseBulkResult(count=len(rows), ids=[str(row.id) for row in rows])
+
+
+DUPLICATE_PAIRS = text("""
+    SELECT a.id AS a_id, b.id AS b_id, b.date - a.date AS days_apart,
+           similarity(a.description, b.description) AS score
+    FROM pairledger.expenses a
+    JOIN pairledger.expenses b
+      ON b.household_id = a.household_id
+     AND b.amount = a.amount
+     AND b.date BETWEEN a.date AND a.date + CAST(:days AS integer)
+     AND (b.date, b.id) > (a.date, a.id)
+    WHERE a.household_id = :household_id
+      AND a.date >= :date_from AND a.date <= :date_to
+      AND (lower(a.description) = lower(b.description)
+           OR similarity(a.description, b.description) >= CAST(:min_similarity AS real))
+""")
+
+
+@router.get("/duplicates", response_model=list[DuplicateGroup], dependencies=[limit("aggregate")])
+async def find_duplicates(
+    days: int = Query(3, ge=0, le=31),
+    min_similarity: float = Query(0.4, ge=0, le=1),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    max_groups: int = Query(100, ge=1, le=500),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Likely double entries: same amount, dated within ``days`` of each other
+    and with similar descriptions (pg_trgm similarity), newest groups first.
 
+    Candidate pairs come from one self-join over the (household_id, amount,
+    date) index; pairs sharing an expense are merged into one group.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
 
-@router.get("/{expense_id}", response_model=ExpenseResponse)
+    cache_key = ("duplicates", days, min_similarity, date_from, date_to, max_groups)
+    cached = household_cache.get(household, cache_key)
+    if cached is not None:
+        return cached
+
+    pairs = (await db.execute(DUPLICATE_PAIRS, {
+        "household_id": household.id,
+        "days": days,
+        "min_similarity": min_similarity,
+        "date_from": date_from or date.min,
+        "date_to": date_to or date.max,
+    })).all()
+
+    # Union-find over the pairs: A~B and B~C is one group of three
+    parent: dict[UUID, UUID] = {}
+
+    def root(x: UUID) -> UUID:
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for pair in pairs:
+        parent[root(pair.a_id)] = root(pair.b_id)
+    members: dict[UUID, list[UUID]] = {}
+    for expense_id in parent:
+        members.setdefault(root(expense_id), []).append(expense_id)
+    scores: dict[UUID, tuple[float, int]] = {}
+    for pair in pairs:
+        key = root(pair.a_id)
+        score, days_apart = scores.get(key, (1.0, 0))
+        scores[key] = (min(score, float(pair.score)), max(days_apart, pair.days_apart))
+
+    rows = (
+        await db.execute(
+            select(Expense, Category.name, Category.icon)
+            .outerjoin(Category, Expense.category_id == Category.id)
+            .where(Expense.household_id == household.id, Expense.id.in_(list(parent)))
+        )
+    ).all() if parent else []
+    by_id = {row[0].id: row for row in rows}
+
+    groups = []
+    for key, ids in members.items():
+        expenses = sorted((by_id[i] for i in ids if i in by_id), key=lambda r: (r[0].date, r[0].created_at))
+        if len(expenses) < 2:
+            continue
+        score, days_apart = scores[key]
+        groups.append(DuplicateGroup(
+            expenses=[_expense_to_response(r[0], cat_name=r[1], cat_icon=r[2]) for r in expenses],
+            min_similarity=round(score, 3),
+            max_days_apart=days_apart,
+        ))
+    groups.sort(key=lambda g: g.expenses[-1].date, reverse=True)
+    result = groups[:max_groups]
+    household_cache.set(household, cache_key, result)
+    return result
+
+
+# The kept row's receipt wins, else the earliest removed row's. A stored
+# receipt (receipt_sha256) moves with its hash and is re-served under the
+# kept id; a plain receipt_url link is copied as is.
+MERGE_DUPLICATES = text("""
+    UPDATE pairledger.expenses k
+    SET tags = ARRAY(SELECT DISTINCT t FROM unnest(coalesce(k.tags, '{}') || m.tags) AS t ORDER BY t),
+        notes = coalesce(k.notes, m.notes),
+        category_id = coalesce(k.category_id, m.category_id),
+        receipt_sha256 = CASE WHEN k.receipt_sha256 IS NOT NULL OR k.receipt_url IS NOT NULL
+                              THEN k.receipt_sha256 ELSE m.receipt_sha256 END,
+        receipt_url = CASE
+            WHEN k.receipt_sha256 IS NOT NULL
+              OR (k.receipt_url IS NULL AND m.receipt_sha256 IS NOT NULL)
+                THEN '/api/expenses/' || k.id || '/receipt'
+            ELSE coalesce(k.receipt_url, m.receipt_url)
+        END
+    FROM (
+        SELECT p.keep_id,
+               coalesce(array_agg(DISTINCT t.tag) FILTER (WHERE t.tag IS NOT NULL), '{}') AS tags,
+               (array_agg(r.notes ORDER BY r.created_at) FILTER (WHERE r.notes IS NOT NULL))[1] AS notes,
+               (array_agg(r.category_id ORDER BY r.created_at) FILTER (WHERE r.category_id IS NOT NULL))[1]
+                   AS category_id,
+               -- Same filter and order, so both come from the same row
+               (array_agg(r.receipt_sha256 ORDER BY r.created_at, r.id)
+                   FILTER (WHERE r.receipt_sha256 IS NOT NULL OR r.receipt_url IS NOT NULL))[1] AS receipt_sha256,
+               (array_agg(r.receipt_url ORDER BY r.created_at, r.id)
+                   FILTER (WHERE r.receipt_sha256 IS NOT NULL OR r.receipt_url IS NOT NULL))[1] AS receipt_url
+        FROM unnest(CAST(:keep_ids AS uuid[]), CAST(:remove_ids AS uuid[])) AS p(keep_id, remove_id)
+        JOIN pairledger.expenses r ON r.id = p.remove_id AND r.household_id = :household_id
+        LEFT JOIN LATERAL unnest(r.tags) AS t(tag) ON true
+        GROUP BY p.keep_id
+    ) AS m
+    WHERE k.id = m.keep_id AND k.household_id = :household_id
+    RETURNING k.id
+""")
+
+
+@router.post("/duplicates/resolve", response_model=DuplicateResolveResult, dependencies=[limit("bulk")])
+async def resolve_duplicates(
+    data: DuplicateResolve,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Keep one expense per group and delete the rest, optionally merging them
+    into the kept one first; one UPDATE and one DELETE for all groups."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    keep_ids = [UUID(g.keep) for g in data.groups]
+    pairs = [(keep, UUID(r)) for keep, g in zip(keep_ids, data.groups) for r in g.remove]
+    remove_ids = [r for _, r in pairs]
+    if len(set(remove_ids)) != len(remove_ids) or set(remove_ids) & set(keep_ids):
+        raise HTTPException(status_code=400, detail="Each expense can be kept or removed only once")
+
+    # All ids must be this household's expenses before anything is deleted: a
+    # stale or mistyped keep id would make the merge a no-op and lose the rows.
+    # Locked so a concurrent delete can't slip in between.
+    wanted = set(keep_ids) | set(remove_ids)
+    found = set(
+        (
+            await db.execute(
+                select(Expense.id)
+                .where(Expense.household_id == household.id, Expense.id.in_(wanted))
+                .with_for_update()
+            )
+        ).scalars().all()
+    )
+    if missing := wanted - found:
+        raise HTTPException(
+            status_code=404,
+            detail="Expenses not found: " + ", ".join(sorted(str(i) for i in missing)[:20]),
+        )
+
+    merged = 0
+    if data.merge:
+        merged = len((await db.execute(MERGE_DUPLICATES, {
+            "household_id": household.id,
+            "keep_ids": [k for k, _ in pairs],
+            "remove_ids": remove_ids,
+        })).all())
+    rows = (
+        await db.execute(
+            delete(Expense)
+            .where(Expense.household_id == household.id, Expense.id.in_(remove_ids))
+            .returning(Expense.id)
+        )
+    ).all()
+    await db.commit()
+
+    return DuplicateResolveResult(removed=len(rows), merged=merged, ids=[str(row.id) for row in rows])
+
+
+@router.get("/{expense_id}", response_model=ExpenseResponse, dependencies=[limit("cheap")])
 async def get_expense(
     expense_id: str,
     user: ShelfUser = Depends(get_current_user),
@@ -162,7 +426,7 @@ async def get_expense(
     return _expense_to_response(row[0], cat_name=row[1], cat_icon=row[2])
 
 
-@router.put("/{expense_id}", response_model=ExpenseResponse)
+@router.put("/{expense_id}", response_model=ExpenseResponse, dependencies=[limit("cheap")])
 async def update_expense(
     expense_id: str,
     data: ExpenseUpdate,
@@ -174,18 +438,6 @@ async def update_expense(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    expense = (
-        await db.execute(
-            select(Expense).where(
-                Expense.id == UUID(expense_id),
-                Expense.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-
     update_data = data.model_dump(exclude_unset=True)
 
     if "amount" in update_data:
@@ -195,26 +447,23 @@ async def update_expense(
     if "paid_by" in update_data and update_data["paid_by"]:
         update_data["paid_by"] = UUID(update_data["paid_by"])
     if "tags" in update_data and update_data["tags"] is not None:
-        update_data["tags"] = list(dict.fromkeys(t.strip().lower() for t in update_data["tags"] if t.strip()))
-
-    for key, value in update_data.items():
-        setattr(expense, key, value)
-
-    await db.commit()
-    await db.refresh(expense)
+        update_data["tags"] = normalize_tags(update_data["tags"])
+    if "receipt_url" in update_data:
+        # A stored receipt's URL is managed by the receipt endpoints
+        update_data["receipt_url"] = case(
+            (Expense.receipt_sha256.is_not(None), Expense.receipt_url), else_=update_data["receipt_url"],
+        )
 
-    cat_name = None
-    cat_icon = None
-    if expense.category_id:
-        cat = (await db.execute(select(Category).where(Category.id == expense.category_id))).scalar_one_or_none()
-        if cat:
-            cat_name = cat.name
-            cat_icon = cat.icon
+    row = await update_returning(
+        db, Expense, [Expense.id == UUID(expense_id), Expense.household_id == household.id], update_data,
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Expense not found")
 
-    return _expense_to_response(expense, cat_name=cat_name, cat_icon=cat_icon)
+    return _expense_to_response(row, cat_name=row.category_name, cat_icon=row.category_icon)
 
 
-@router.delete("/{expense_id}", status_code=204)
+@router.delete("/{expense_id}", status_code=204, dependencies=[limit("cheap")])
 async def delete_expense(
     expense_id: str,
     user: ShelfUser = Depends(get_current_user),
@@ -225,17 +474,6 @@ async def delete_expense(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    expense = (
-        await db.execute(
-            select(Expense).where(
-                Expense.id == UUID(expense_id),
-                Expense.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not expense:
+    deleted = await delete_returning(db, Expense, [Expense.id == UUID(expense_id), Expense.household_id == household.id])
+    if not deleted:
         raise HTTPException(status_code=404, detail="Expense not found")
-
-    await db.delete(expense)
-    await db.commit()
@@ -2,19 +2,46 @@ import json
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from shelf_auth_middleware import get_current_user, ShelfUser
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 
+from ..auth import get_current_user, ShelfUser
 from ..database import get_db
-from ..models import Household, Income, Category, Expense, Settlement, RecurringExpense
+from ..exports import (
+    household_dict,
+    category_dict,
+    income_dict,
+    expense_dict,
+    settlement_dict,
+    recurring_dict,
+    export_path,
+    wake_export_workers,
+)
+from ..limits import limit
+from ..models import Income, Category, Expense, Settlement, RecurringExpense, ExportJob
+from ..schemas import ExportJobResponse
+from ..tracing import TracedRoute
 from .household import get_user_household
 
-router = APIRouter(prefix="/api", tags=["export"])
+router = APIRouter(prefix="/api", tags=["export"], route_class=TracedRoute)
 
 
-@router.get("/export")
+def _job_to_response(j: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        id=str(j.id),
+        status=j.status,
+        data_version=j.data_version,
+        size=j.size,
+        error=j.error,
+        created_at=j.created_at.isoformat(),
+        finished_at=j.finished_at.isoformat() if j.finished_at else None,
+        download_url=f"/api/export/jobs/{j.id}/download" if j.status == "done" else None,
+    )
+
+
+@router.get("/export", dependencies=[limit("bulk")])
 async def export_data(
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -38,65 +65,12 @@ async def export_data(
     export = {
         "app": "pairledger",
         "version": "1.0.0",
-        "household": {
-            "name": household.name,
-            "user_a_id": str(household.user_a_id),
-            "user_b_id": str(household.user_b_id) if household.user_b_id else None,
-        },
-        "categories": [
-            {
-                "name": c.name,
-                "icon": c.icon,
-                "color": c.color,
-                "budget_monthly": float(c.budget_monthly) if c.budget_monthly else None,
-            }
-            for c in categories
-        ],
-        "incomes": [
-            {
-                "user_id": str(i.user_id),
-                "amount": float(i.amount),
-                "effective_from": i.effective_from.isoformat(),
-                "notes": i.notes,
-            }
-            for i in incomes
-        ],
-        "expenses": [
-            {
-                "paid_by": str(e.paid_by),
-                "category": cat_map.get(e.category_id, None),
-                "amount": float(e.amount),
-                "description": e.description,
-                "date": e.date.isoformat(),
-                "split_type": e.split_type,
-                "notes": e.notes,
-                "tags": e.tags or [],
-            }
-            for e in expenses
-        ],
-        "settlements": [
-            {
-                "from_user": str(s.from_user),
-                "to_user": str(s.to_user),
-                "amount": float(s.amount),
-                "date": s.date.isoformat(),
-                "notes": s.notes,
-            }
-            for s in settlements
-        ],
-        "recurring_expenses": [
-            {
-                "paid_by": str(r.paid_by),
-                "category": cat_map.get(r.category_id, None),
-                "amount": float(r.amount),
-                "description": r.description,
-                "split_type": r.split_type,
-                "frequency": r.frequency,
-                "day_of_month": r.day_of_month,
-                "active": r.active,
-            }
-            for r in recurring
-        ],
+        "household": household_dict(household),
+        "categories": [category_dict(c) for c in categories],
+        "incomes": [income_dict(i) for i in incomes],
+        "expenses": [expense_dict(e, cat_map) for e in expenses],
+        "settlements": [settlement_dict(s) for s in settlements],
+        "recurring_expenses": [recurring_dict(r, cat_map) for r in recurring],
     }
 
     content = json.dumps(export, indent=2, default=str)
@@ -105,3 +79,112 @@ async def export_data(
         media_type="application/json",
         headers={"Content-Disposition": "attachment; filename=pairledger-export.json"},
     )
+
+
+@router.post("/export/jobs", response_model=ExportJobResponse, status_code=202, dependencies=[limit("cheap")])
+async def create_export_job(
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a background export of the household's current data.
+
+    Jobs are keyed by household data version, so repeating the request while
+    nothing has changed returns the existing job instead of exporting again.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    job = (
+        await db.execute(
+            insert(ExportJob)
+            .values(household_id=household.id, data_version=household.data_version)
+            .on_conflict_do_nothing(constraint="uq_export_job_version")
+            .returning(ExportJob)
+        )
+    ).scalar_one_or_none()
+    if job is None:
+        # Already requested for this version; retry it only if it failed
+        job = (
+            await db.execute(
+                update(ExportJob)
+                .where(
+                    ExportJob.household_id == household.id,
+                    ExportJob.data_version == household.data_version,
+                    ExportJob.status == "failed",
+                )
+                .values(status="queued", error=None, finished_at=None, owner=None, heartbeat_at=None)
+                .returning(ExportJob)
+            )
+        ).scalar_one_or_none()
+        if job is None:
+            existing = (
+                await db.execute(
+                    select(ExportJob).where(
+                        ExportJob.household_id == household.id,
+                        ExportJob.data_version == household.data_version,
+                    )
+                )
+            ).scalar_one()
+            await db.commit()
+            return _job_to_response(existing)
+    await db.commit()
+
+    wake_export_workers()
+    return _job_to_response(job)
+
+
+@router.get("/export/jobs/{job_id}", response_model=ExportJobResponse, dependencies=[limit("cheap")])
+async def get_export_job(
+    job_id: str,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    job = (
+        await db.execute(
+            select(ExportJob).where(ExportJob.id == UUID(job_id), ExportJob.household_id == household.id)
+        )
+    ).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    return _job_to_response(job)
+
+
+@router.get("/export/jobs/{job_id}/download", dependencies=[limit("cheap")])
+async def download_export(
+    job_id: str,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Serve a finished export. FileResponse handles Range and ETag/If-None-Match."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    job = (
+        await db.execute(
+            select(ExportJob).where(ExportJob.id == UUID(job_id), ExportJob.household_id == household.id)
+        )
+    ).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+
+    path = export_path(job.id)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Export file is no longer available")
+
+    return FileResponse(
+        path,
+        media_type="application/gzip",
+        filename=f"pairledger-export-{job.data_version}.json.gz",
+    )
@@ -4,13 +4,16 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
-from shelf_auth_middleware import get_current_user, ShelfUser
 
+from ..auth import get_current_user, ShelfUser
 from ..database import get_db
+from ..limits import limit, remember_household
+from ..logs import bind_household
 from ..models import Household
 from ..schemas import HouseholdCreate, HouseholdJoin, HouseholdResponse
+from ..tracing import TracedRoute, span
 
-router = APIRouter(prefix="/api/household", tags=["household"])
+router = APIRouter(prefix="/api/household", tags=["household"], dependencies=[limit("cheap")], route_class=TracedRoute)
 
 
 def _generate_invite_code() -> str:
@@ -19,12 +22,17 @@ def _generate_invite_code() -> str:
 
 async def get_user_household(user_id: UUID, db: AsyncSession) -> Household | None:
     """Get the household for a user (either as user_a or user_b)."""
-    result = await db.execute(
-        select(Household).where(
-            or_(Household.user_a_id == user_id, Household.user_b_id == user_id)
+    with span("household.lookup"):
+        result = await db.execute(
+            select(Household).where(
+                or_(Household.user_a_id == user_id, Household.user_b_id == user_id)
+            )
         )
-    )
-    return result.scalar_one_or_none()
+        household = result.scalar_one_or_none()
+    if household:
+        remember_household(user_id, household.id)
+        bind_household(household.id)
+    return household
 
 
 def _household_to_response(h: Household) -> HouseholdResponse:
@@ -0,0 +1,165 @@
+from collections import Counter
+from pathlib import Path
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, text
+
+from ..auth import get_current_user, ShelfUser
+from ..config import settings
+from ..database import get_db
+from ..filters import normalize_tags
+from ..imports import (
+    ColumnMap, CsvFormatError, ImportTooLarge, RowError, csv_records, discard, parse_row, stage, staged_chunks,
+)
+from ..limits import limit
+from ..models import Expense
+from ..schemas import CsvImportOptions, CsvImportError, CsvImportResult
+from ..tracing import TracedRoute, span
+from .household import get_user_household
+
+router = APIRouter(prefix="/api/import", tags=["import"], route_class=TracedRoute)
+
+MAX_ERROR_SAMPLES = 50
+
+# Dedup key of each incoming row (in order) and how many recorded expenses
+# share it, probing idx_expenses_dedup; e.date = u.d prunes partitions.
+DEDUP_LOOKUP = text("""
+    SELECT u.key, (
+        SELECT count(*) FROM pairledger.expenses e
+        WHERE pairledger.expense_dedup_key(e.household_id, e.date, e.amount, e.description) = u.key
+          AND e.household_id = CAST(:household_id AS uuid) AND e.date = u.d
+    ) AS existing
+    FROM (
+        SELECT n, d, pairledger.expense_dedup_key(CAST(:household_id AS uuid), d, a, s) AS key
+        FROM unnest(CAST(:dates AS date[]), CAST(:amounts AS numeric(12, 2)[]), CAST(:descriptions AS text[]))
+            WITH ORDINALITY AS t(d, a, s, n)
+    ) AS u
+    ORDER BY u.n
+""")
+
+
+@router.post("/csv", response_model=CsvImportResult, dependencies=[limit("bulk")])
+async def import_csv(
+    request: Request,
+    options: Annotated[CsvImportOptions, Query()],
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Import a bank statement sent as the raw ``text/csv`` request body.
+
+    The upload is staged to a temp file first, with no transaction open;
+    rows are then parsed from it and written in batches of
+    ``import_batch_size`` inside one short transaction. A row is a duplicate
+    when an expense with the same day, amount and (case/whitespace-folded)
+    description is already recorded; a file repeating a row that often is
+    legitimate (two identical coffees) imports the extra copies. With
+    ``dry_run`` nothing is written and the counts say what would happen.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    paid_by = UUID(options.paid_by) if options.paid_by else uid
+    if paid_by not in (household.user_a_id, household.user_b_id):
+        raise HTTPException(status_code=400, detail="Payer is not a household member")
+    fixed = dict(
+        household_id=household.id,
+        paid_by=paid_by,
+        category_id=UUID(options.category_id) if options.category_id else None,
+        split_type=options.split_type,
+        tags=normalize_tags(options.tags),
+    )
+
+    # Release the connection while the body streams in: the import's
+    # triggers lock the household row until commit, so the transaction must
+    # not wait on a slow upload
+    await db.commit()
+    try:
+        staged = await stage(request.stream())
+    except ImportTooLarge:
+        raise HTTPException(status_code=413, detail="Upload too large")
+    try:
+        return await _import_staged(staged, options, household.id, fixed, db)
+    finally:
+        discard(staged)
+
+
+async def _import_staged(
+    staged: Path, options: CsvImportOptions, household_id: UUID, fixed: dict, db: AsyncSession,
+) -> CsvImportResult:
+    counts = Counter()
+    samples: list[CsvImportError] = []
+    batch: list[dict] = []
+    # Per dedup key: recorded expenses before the import, and rows seen so far
+    recorded: dict[str, int] = {}
+    seen: Counter[str] = Counter()
+
+    async def flush():
+        with span("import.batch", rows=len(batch)):
+            keys = (await db.execute(DEDUP_LOOKUP, {
+                "household_id": household_id,
+                "dates": [v["date"] for v in batch],
+                "amounts": [v["amount"] for v in batch],
+                "descriptions": [v["description"] for v in batch],
+            })).all()
+            accepted = []
+            for values, (key, existing) in zip(batch, keys):
+                recorded.setdefault(key, existing)
+                seen[key] += 1
+                if seen[key] <= recorded[key]:
+                    counts["duplicates"] += 1
+                else:
+                    accepted.append({**fixed, **values})
+            if accepted and not options.dry_run:
+                # Statement-level triggers update counters once per batch
+                await db.execute(insert(Expense), accepted)
+            counts["imported"] += len(accepted)
+        batch.clear()
+
+    columns = None
+    try:
+        if not options.has_header:
+            columns = ColumnMap(options, None)
+        async for line, fields in csv_records(staged_chunks(staged), options):
+            if columns is None:
+                columns = ColumnMap(options, fields)
+                continue
+            counts["rows"] += 1
+            try:
+                values = parse_row(fields, columns, options)
+            except RowError as e:
+                counts["errors"] += 1
+                if len(samples) < MAX_ERROR_SAMPLES:
+                    samples.append(CsvImportError(line=line, error=str(e)))
+                continue
+            if values is None:
+                counts["skipped"] += 1
+                continue
+            batch.append(values)
+            if len(batch) >= settings.import_batch_size:
+                await flush()
+        if batch:
+            await flush()
+    except (CsvFormatError, LookupError) as e:
+        # LookupError: unknown encoding
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if options.dry_run:
+        await db.rollback()
+    else:
+        await db.commit()
+
+    return CsvImportResult(
+        dry_run=options.dry_run,
+        rows=counts["rows"],
+        imported=counts["imported"],
+        duplicates=counts["duplicates"],
+        skipped=counts["skipped"],
+        errors=counts["errors"],
+        error_samples=samples,
+    )
@@ -1,48 +1,94 @@
+from datetime import date
 from uuid import UUID
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from shelf_auth_middleware import get_current_user, ShelfUser
+from sqlalchemy import select, desc, func
+from sqlalchemy.engine import Row
 
+from ..auth import get_current_user, ShelfUser
 from ..database import get_db
+from ..limits import limit
 from ..models import Household, Income
-from ..schemas import IncomeCreate, IncomeResponse, SplitRatio
+from ..pagination import keyset_page, split_page
+from ..schemas import IncomeCreate, IncomeResponse, IncomeListResponse, HistorySummary, SplitRatio
+from ..writes import insert_returning, delete_returning
+from ..tracing import TracedRoute
 from .household import get_user_household
 
-router = APIRouter(prefix="/api/incomes", tags=["incomes"])
+router = APIRouter(prefix="/api/incomes", tags=["incomes"], dependencies=[limit("cheap")], route_class=TracedRoute)
 
 
-@router.get("", response_model=list[IncomeResponse])
+def _income_to_response(i: Income | Row) -> IncomeResponse:
+    return IncomeResponse(
+        id=str(i.id),
+        user_id=str(i.user_id),
+        amount=float(i.amount),
+        effective_from=i.effective_from.isoformat(),
+        notes=i.notes,
+        created_at=i.created_at.isoformat(),
+    )
+
+
+KEYSET = (Income.effective_from, Income.created_at, Income.id)
+
+
+def _income_conditions(
+    household_id: UUID, date_from: date | None, date_to: date | None, user_id: str | None,
+) -> list:
+    conditions = [Income.household_id == household_id]
+    if date_from:
+        conditions.append(Income.effective_from >= date_from)
+    if date_to:
+        conditions.append(Income.effective_from <= date_to)
+    if user_id:
+        conditions.append(Income.user_id == UUID(user_id))
+    return conditions
+
+
+@router.get("", response_model=IncomeListResponse)
 async def list_incomes(
+    cursor: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    user_id: str | None = Query(None),
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """Income entries, latest effective date first, one keyset page at a time."""
     uid = UUID(user.id)
     household = await get_user_household(uid, db)
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    incomes = (
-        await db.execute(
-            select(Income)
-            .where(Income.household_id == household.id)
-            .order_by(desc(Income.effective_from))
-        )
-    ).scalars().all()
-
-    return [
-        IncomeResponse(
-            id=str(i.id),
-            user_id=str(i.user_id),
-            amount=float(i.amount),
-            effective_from=i.effective_from.isoformat(),
-            notes=i.notes,
-            created_at=i.created_at.isoformat(),
-        )
-        for i in incomes
-    ]
+    conditions = _income_conditions(household.id, date_from, date_to, user_id)
+    query = keyset_page(select(Income).where(*conditions), KEYSET, cursor, limit)
+    incomes, next_cursor = split_page((await db.execute(query)).scalars().all(), KEYSET, limit)
+
+    return IncomeListResponse(incomes=[_income_to_response(i) for i in incomes], next_cursor=next_cursor)
+
+
+@router.get("/summary", response_model=HistorySummary)
+async def income_summary(
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    user_id: str | None = Query(None),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Count and total of the income entries matching the same filters as the list."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    conditions = _income_conditions(household.id, date_from, date_to, user_id)
+    count, total = (
+        await db.execute(select(func.count(), func.coalesce(func.sum(Income.amount), 0)).where(*conditions))
+    ).one()
+    return HistorySummary(count=count, total=float(total))
 
 
 @router.post("", response_model=IncomeResponse, status_code=201)
@@ -56,25 +102,15 @@ async def create_income(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    income = Income(
+    income = await insert_returning(db, Income, dict(
         household_id=household.id,
         user_id=uid,
         amount=Decimal(str(data.amount)),
         effective_from=data.effective_from,
         notes=data.notes,
-    )
-    db.add(income)
-    await db.commit()
-    await db.refresh(income)
+    ))
 
-    return IncomeResponse(
-        id=str(income.id),
-        user_id=str(income.user_id),
-        amount=float(income.amount),
-        effective_from=income.effective_from.isoformat(),
-        notes=income.notes,
-        created_at=income.created_at.isoformat(),
-    )
+    return _income_to_response(income)
 
 
 @router.delete("/{income_id}", status_code=204)
@@ -88,21 +124,10 @@ async def delete_income(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    income = (
-        await db.execute(
-            select(Income).where(
-                Income.id == UUID(income_id),
-                Income.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not income:
+    deleted = await delete_returning(db, Income, [Income.id == UUID(income_id), Income.household_id == household.id])
+    if not deleted:
         raise HTTPException(status_code=404, detail="Income not found")
 
-    await db.delete(income)
-    await db.commit()
-
 
 @router.get("/split-ratio", response_model=SplitRatio)
 async def get_split_ratio(
@@ -0,0 +1,132 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from ..auth import get_current_user, ShelfUser
+from ..database import get_db
+from ..limits import limit
+from ..models import Expense, Receipt
+from ..receipts import STORE_LOCK, ReceiptTooLarge, UnsupportedReceipt, discard, object_path, place, stage
+from ..schemas import ExpenseResponse
+from ..writes import update_returning
+from ..tracing import TracedRoute
+from .expenses import _expense_to_response
+from .household import get_user_household
+
+router = APIRouter(prefix="/api/expenses", tags=["receipts"], route_class=TracedRoute)
+
+
+def _receipt_url(expense_id: UUID) -> str:
+    return f"/api/expenses/{expense_id}/receipt"
+
+
+@router.post("/{expense_id}/receipt", response_model=ExpenseResponse, dependencies=[limit("cheap")])
+async def upload_receipt(
+    expense_id: str,
+    request: Request,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Attach a receipt photo or PDF, sent as the raw request body.
+
+    The body is streamed into the content-addressed store, never held whole
+    in memory; identical files are stored once. Replaces any previous receipt,
+    which is collected later if nothing else references it.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    conditions = [Expense.id == UUID(expense_id), Expense.household_id == household.id]
+    if not (await db.execute(select(Expense.id).where(*conditions))).first():
+        raise HTTPException(status_code=404, detail="Expense not found")
+    # Release the connection while the body streams in: a slow phone upload
+    # must not pin a pool slot
+    await db.commit()
+
+    try:
+        tmp, sha256, size, content_type = await stage(request.stream())
+    except ReceiptTooLarge:
+        raise HTTPException(status_code=413, detail="Receipt too large")
+    except UnsupportedReceipt:
+        raise HTTPException(status_code=415, detail="Receipts must be JPEG, PNG, WebP, HEIC, GIF or PDF")
+
+    try:
+        # Held until commit, so orphan collection can't remove the blob before
+        # this expense references it; placing it under the lock also restores
+        # a blob collection removed while the upload was streaming
+        await db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": STORE_LOCK})
+        await place(tmp, sha256)
+        await db.execute(
+            insert(Receipt).values(sha256=sha256, size=size, content_type=content_type)
+            .on_conflict_do_nothing(index_elements=[Receipt.sha256])
+        )
+        row = await update_returning(
+            db, Expense, conditions, {"receipt_sha256": sha256, "receipt_url": _receipt_url(UUID(expense_id))},
+        )
+    finally:
+        discard(tmp)
+    if not row:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    return _expense_to_response(row, cat_name=row.category_name, cat_icon=row.category_icon)
+
+
+@router.get("/{expense_id}/receipt", dependencies=[limit("cheap")])
+async def download_receipt(
+    expense_id: str,
+    request: Request,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Serve the stored receipt; supports Range and If-None-Match, and
+    zero-copy sendfile where the server offers ``http.response.pathsend``."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    receipt = (
+        await db.execute(
+            select(Receipt)
+            .join(Expense, Expense.receipt_sha256 == Receipt.sha256)
+            .where(Expense.id == UUID(expense_id), Expense.household_id == household.id)
+        )
+    ).scalar_one_or_none()
+    if not receipt:
+        raise HTTPException(status_code=404, detail="Receipt not found")
+
+    # Content-addressed: the hash is a strong validator
+    etag = f'"{receipt.sha256}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    path = object_path(receipt.sha256)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Receipt not found")
+    return FileResponse(path, media_type=receipt.content_type, headers=headers)
+
+
+@router.delete("/{expense_id}/receipt", status_code=204, dependencies=[limit("cheap")])
+async def delete_receipt(
+    expense_id: str,
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Detach the receipt; the file goes with the next orphan collection."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    row = await update_returning(
+        db, Expense, [Expense.id == UUID(expense_id), Expense.household_id == household.id],
+        {"receipt_sha256": None, "receipt_url": None},
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Expense not found")
@@ -4,17 +4,21 @@ from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from shelf_auth_middleware import get_current_user, ShelfUser
+from sqlalchemy.engine import Row
 
+from ..auth import get_current_user, ShelfUser
 from ..database import get_db
+from ..limits import limit
 from ..models import RecurringExpense, Category
 from ..schemas import RecurringCreate, RecurringUpdate, RecurringResponse
+from ..writes import insert_returning, update_returning, delete_returning
+from ..tracing import TracedRoute
 from .household import get_user_household
 
-router = APIRouter(prefix="/api/recurring", tags=["recurring"])
+router = APIRouter(prefix="/api/recurring", tags=["recurring"], dependencies=[limit("cheap")], route_class=TracedRoute)
 
 
-def _recurring_to_response(r: RecurringExpense, cat_name: str | None = None) -> RecurringResponse:
+def _recurring_to_response(r: RecurringExpense | Row, cat_name: str | None = None) -> RecurringResponse:
     return RecurringResponse(
         id=str(r.id),
         paid_by=str(r.paid_by),
@@ -65,7 +69,7 @@ async def create_recurring(
 
     paid_by = UUID(data.paid_by) if data.paid_by else uid
 
-    rec = RecurringExpense(
+    row = await insert_returning(db, RecurringExpense, dict(
         household_id=household.id,
         paid_by=paid_by,
         category_id=UUID(data.category_id) if data.category_id else None,
@@ -74,18 +78,9 @@ async def create_recurring(
         split_type=data.split_type,
         frequency=data.frequency,
         day_of_month=data.day_of_month,
-    )
-    db.add(rec)
-    await db.commit()
-    await db.refresh(rec)
-
-    cat_name = None
-    if rec.category_id:
-        cat = (await db.execute(select(Category).where(Category.id == rec.category_id))).scalar_one_or_none()
-        if cat:
-            cat_name = cat.name
+    ))
 
-    return _recurring_to_response(rec, cat_name=cat_name)
+    return _recurring_to_response(row, cat_name=row.category_name)
 
 
 @router.put("/{recurring_id}", response_model=RecurringResponse)
@@ -100,18 +95,6 @@ async def update_recurring(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    rec = (
-        await db.execute(
-            select(RecurringExpense).where(
-                RecurringExpense.id == UUID(recurring_id),
-                RecurringExpense.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not rec:
-        raise HTTPException(status_code=404, detail="Recurring expense not found")
-
     update_data = data.model_dump(exclude_unset=True)
     if "amount" in update_data:
         update_data["amount"] = Decimal(str(update_data["amount"]))
@@ -120,19 +103,16 @@ async def update_recurring(
     if "paid_by" in update_data and update_data["paid_by"]:
         update_data["paid_by"] = UUID(update_data["paid_by"])
 
-    for key, value in update_data.items():
-        setattr(rec, key, value)
-
-    await db.commit()
-    await db.refresh(rec)
-
-    cat_name = None
-    if rec.category_id:
-        cat = (await db.execute(select(Category).where(Category.id == rec.category_id))).scalar_one_or_none()
-        if cat:
-            cat_name = cat.name
+    row = await update_returning(
+        db,
+        RecurringExpense,
+        [RecurringExpense.id == UUID(recurring_id), RecurringExpense.household_id == household.id],
+        update_data,
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Recurring expense not found")
 
-    return _recurring_to_response(rec, cat_name=cat_name)
+    return _recurring_to_response(row, cat_name=row.category_name)
 
 
 @router.delete("/{recurring_id}", status_code=204)
@@ -146,17 +126,8 @@ async def delete_recurring(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    rec = (
-        await db.execute(
-            select(RecurringExpense).where(
-                RecurringExpense.id == UUID(recurring_id),
-                RecurringExpense.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not rec:
+    deleted = await delete_returning(
+        db, RecurringExpense, [RecurringExpense.id == UUID(recurring_id), RecurringExpense.household_id == household.id],
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Recurring expense not found")
-
-    await db.delete(rec)
-    await db.commit()
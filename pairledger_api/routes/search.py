@@ -3,13 +3,19 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from shelf_auth_middleware import get_current_user, ShelfUser
 
+from ..auth import get_current_user, ShelfUser
 from ..database import get_db
-from ..schemas import SearchResult
+from ..limits import limit
+from ..schemas import SearchResult, DescriptionSuggestion
+from ..tracing import TracedRoute
 from .household import get_user_household
 
-router = APIRouter(prefix="/api", tags=["search"])
+router = APIRouter(prefix="/api", tags=["search"], dependencies=[limit("aggregate")], route_class=TracedRoute)
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 @router.get("/search", response_model=list[SearchResult])
@@ -34,18 +40,27 @@ async def search_expenses(
                         plainto_tsquery('english', :query),
                         'MaxWords=30, MinWords=10, StartSel=**, StopSel=**'
                     ) AS snippet,
-                    ts_rank(
-                        to_tsvector('english', coalesce(description, '') || ' ' || coalesce(notes, '')),
-                        plainto_tsquery('english', :query)
+                    GREATEST(
+                        ts_rank(
+                            to_tsvector('english', coalesce(description, '') || ' ' || coalesce(notes, '')),
+                            plainto_tsquery('english', :query)
+                        ),
+                        word_similarity(:query, description)
                     ) AS rank
                 FROM pairledger.expenses
                 WHERE household_id = :hid
-                  AND to_tsvector('english', coalesce(description, '') || ' ' || coalesce(notes, ''))
-                      @@ plainto_tsquery('english', :query)
+                  AND (
+                      to_tsvector('english', coalesce(description, '') || ' ' || coalesce(notes, ''))
+                          @@ plainto_tsquery('english', :query)
+                      -- Merchant names, prefixes and typos the english dictionary
+                      -- cannot stem; served by idx_expenses_description_trgm
+                      OR description ILIKE :pattern
+                      OR :query <% description
+                  )
                 ORDER BY rank DESC
                 LIMIT :limit
             """),
-            {"query": q, "hid": str(household.id), "limit": limit},
+            {"query": q, "pattern": f"%{_like_escape(q)}%", "hid": str(household.id), "limit": limit},
         )
     ).fetchall()
 
@@ -62,6 +77,67 @@ async def search_expenses(
     ]
 
 
+@router.get("/search/suggest", response_model=list[DescriptionSuggestion])
+async def suggest_descriptions(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(8, ge=1, le=20),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Autocomplete for the expense form: the household's most frequent
+    matching descriptions, each with its usual category and split type."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    q = q.strip()
+    rows = (
+        await db.execute(
+            text("""
+                WITH grouped AS (
+                    SELECT
+                        (array_agg(description ORDER BY date DESC, created_at DESC))[1] AS description,
+                        COUNT(*) AS count,
+                        mode() WITHIN GROUP (ORDER BY category_id) AS category_id,
+                        mode() WITHIN GROUP (ORDER BY split_type) AS split_type,
+                        (array_agg(amount ORDER BY date DESC, created_at DESC))[1] AS last_amount,
+                        bool_or(description ILIKE :prefix) AS is_prefix
+                    FROM pairledger.expenses
+                    WHERE household_id = :hid
+                      AND (description ILIKE :pattern OR :query <% description)
+                    GROUP BY lower(description)
+                )
+                SELECT g.*, c.name AS category_name, c.icon AS category_icon
+                FROM grouped g
+                LEFT JOIN pairledger.categories c ON c.id = g.category_id
+                ORDER BY g.is_prefix DESC, g.count DESC, g.description
+                LIMIT :limit
+            """),
+            {
+                "query": q,
+                "prefix": f"{_like_escape(q)}%",
+                "pattern": f"%{_like_escape(q)}%",
+                "hid": str(household.id),
+                "limit": limit,
+            },
+        )
+    ).fetchall()
+
+    return [
+        DescriptionSuggestion(
+            description=row.description,
+            count=row.count,
+            category_id=str(row.category_id) if row.category_id else None,
+            category_name=row.category_name,
+            category_icon=row.category_icon,
+            split_type=row.split_type,
+            last_amount=float(row.last_amount),
+        )
+        for row in rows
+    ]
+
+
 @router.get("/tags", response_model=list[str])
 async def list_tags(
     user: ShelfUser = Depends(get_current_user),
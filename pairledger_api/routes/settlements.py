@@ -1,49 +1,108 @@
+from datetime import date
 from uuid import UUID
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from shelf_auth_middleware import get_current_user, ShelfUser
+from sqlalchemy import select, func
+from sqlalchemy.engine import Row
 
+from ..auth import get_current_user, ShelfUser
 from ..database import get_db
+from ..limits import limit
 from ..models import Settlement
-from ..schemas import SettlementCreate, SettlementResponse
+from ..pagination import keyset_page, split_page
+from ..schemas import SettlementCreate, SettlementResponse, SettlementListResponse, HistorySummary
+from ..writes import insert_returning, delete_returning
+from ..tracing import TracedRoute
 from .household import get_user_household
 
-router = APIRouter(prefix="/api/settlements", tags=["settlements"])
+router = APIRouter(prefix="/api/settlements", tags=["settlements"], dependencies=[limit("cheap")], route_class=TracedRoute)
 
 
-@router.get("", response_model=list[SettlementResponse])
+def _settlement_to_response(s: Settlement | Row) -> SettlementResponse:
+    return SettlementResponse(
+        id=str(s.id),
+        from_user=str(s.from_user),
+        to_user=str(s.to_user),
+        amount=float(s.amount),
+        date=s.date.isoformat(),
+        notes=s.notes,
+        created_at=s.created_at.isoformat(),
+    )
+
+
+KEYSET = (Settlement.date, Settlement.created_at, Settlement.id)
+
+
+def _settlement_conditions(
+    household_id: UUID,
+    date_from: date | None,
+    date_to: date | None,
+    from_user: str | None,
+    to_user: str | None,
+) -> list:
+    conditions = [Settlement.household_id == household_id]
+    if date_from:
+        conditions.append(Settlement.date >= date_from)
+    if date_to:
+        conditions.append(Settlement.date <= date_to)
+    if from_user:
+        conditions.append(Settlement.from_user == UUID(from_user))
+    if to_user:
+        conditions.append(Settlement.to_user == UUID(to_user))
+    return conditions
+
+
+@router.get("", response_model=SettlementListResponse)
 async def list_settlements(
+    cursor: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    from_user: str | None = Query(None),
+    to_user: str | None = Query(None),
     user: ShelfUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """Settlements newest first, one keyset page at a time."""
     uid = UUID(user.id)
     household = await get_user_household(uid, db)
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    settlements = (
+    conditions = _settlement_conditions(household.id, date_from, date_to, from_user, to_user)
+    query = keyset_page(select(Settlement).where(*conditions), KEYSET, cursor, limit)
+    settlements, next_cursor = split_page((await db.execute(query)).scalars().all(), KEYSET, limit)
+
+    return SettlementListResponse(
+        settlements=[_settlement_to_response(s) for s in settlements],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/summary", response_model=HistorySummary)
+async def settlement_summary(
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    from_user: str | None = Query(None),
+    to_user: str | None = Query(None),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Count and total of the settlements matching the same filters as the list."""
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    conditions = _settlement_conditions(household.id, date_from, date_to, from_user, to_user)
+    count, total = (
         await db.execute(
-            select(Settlement)
-            .where(Settlement.household_id == household.id)
-            .order_by(desc(Settlement.date), desc(Settlement.created_at))
-        )
-    ).scalars().all()
-
-    return [
-        SettlementResponse(
-            id=str(s.id),
-            from_user=str(s.from_user),
-            to_user=str(s.to_user),
-            amount=float(s.amount),
-            date=s.date.isoformat(),
-            notes=s.notes,
-            created_at=s.created_at.isoformat(),
+            select(func.count(), func.coalesce(func.sum(Settlement.amount), 0)).where(*conditions)
         )
-        for s in settlements
-    ]
+    ).one()
+    return HistorySummary(count=count, total=float(total))
 
 
 @router.post("", response_model=SettlementResponse, status_code=201)
@@ -66,27 +125,16 @@ async def create_settlement(
     if from_uid == to_uid:
         raise HTTPException(status_code=400, detail="Cannot settle with yourself")
 
-    settlement = Settlement(
+    settlement = await insert_returning(db, Settlement, dict(
         household_id=household.id,
         from_user=from_uid,
         to_user=to_uid,
         amount=Decimal(str(data.amount)),
         date=data.date,
         notes=data.notes,
-    )
-    db.add(settlement)
-    await db.commit()
-    await db.refresh(settlement)
+    ))
 
-    return SettlementResponse(
-        id=str(settlement.id),
-        from_user=str(settlement.from_user),
-        to_user=str(settlement.to_user),
-        amount=float(settlement.amount),
-        date=settlement.date.isoformat(),
-        notes=settlement.notes,
-        created_at=settlement.created_at.isoformat(),
-    )
+    return _settlement_to_response(settlement)
 
 
 @router.delete("/{settlement_id}", status_code=204)
@@ -100,17 +148,8 @@ async def delete_settlement(
     if not household:
         raise HTTPException(status_code=404, detail="No household found")
 
-    settlement = (
-        await db.execute(
-            select(Settlement).where(
-                Settlement.id == UUID(settlement_id),
-                Settlement.household_id == household.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not settlement:
+    deleted = await delete_returning(
+        db, Settlement, [Settlement.id == UUID(settlement_id), Settlement.household_id == household.id],
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Settlement not found")
-
-    await db.delete(settlement)
-    await db.commit()
@@ -0,0 +1,90 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from ..auth import get_current_user, ShelfUser
+from ..database import get_db
+from ..limits import limit
+from ..models import Income, Category, Expense, Settlement, RecurringExpense, Tombstone
+from ..schemas import SyncResponse, SyncDeletion
+from ..tracing import TracedRoute
+from .household import get_user_household
+from .categories import _cat_to_response
+from .expenses import _expense_to_response
+from .incomes import _income_to_response
+from .recurring import _recurring_to_response
+from .settlements import _settlement_to_response
+
+router = APIRouter(prefix="/api", tags=["sync"], dependencies=[limit("cheap")], route_class=TracedRoute)
+
+
+@router.get("/sync", response_model=SyncResponse)
+async def sync(
+    since: int | None = Query(None, ge=0),
+    user: ShelfUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Everything that changed after cursor ``since``, plus deletions.
+
+    Omit ``since`` for a full snapshot. Every tracked row carries the
+    household data version of the statement that last wrote it
+    (``change_seq``), and deletes leave a tombstone, so a delta is one
+    indexed range scan per table. The returned cursor is the household
+    version read before any rows. Rows committed while this request runs may
+    show up again in the next delta; clients apply changes as upserts.
+    """
+    uid = UUID(user.id)
+    household = await get_user_household(uid, db)
+    if not household:
+        raise HTTPException(status_code=404, detail="No household found")
+
+    cursor = household.data_version
+    full = since is None or since > cursor
+
+    def changed(model):
+        conditions = [model.household_id == household.id]
+        if not full:
+            conditions.append(model.change_seq > since)
+        return conditions
+
+    categories = (await db.execute(select(Category).where(*changed(Category)))).scalars().all()
+    incomes = (await db.execute(select(Income).where(*changed(Income)))).scalars().all()
+    expenses = (
+        await db.execute(
+            select(Expense, Category.name, Category.icon)
+            .outerjoin(Category, Expense.category_id == Category.id)
+            .where(*changed(Expense))
+        )
+    ).all()
+    settlements = (await db.execute(select(Settlement).where(*changed(Settlement)))).scalars().all()
+    recurring = (
+        await db.execute(
+            select(RecurringExpense, Category.name)
+            .outerjoin(Category, RecurringExpense.category_id == Category.id)
+            .where(*changed(RecurringExpense))
+        )
+    ).all()
+
+    deleted = []
+    if not full:
+        tombstones = (
+            await db.execute(
+                select(Tombstone.table_name, Tombstone.row_id).where(
+                    Tombstone.household_id == household.id, Tombstone.change_seq > since,
+                )
+            )
+        ).all()
+        deleted = [SyncDeletion(table=t.table_name, id=str(t.row_id)) for t in tombstones]
+
+    return SyncResponse(
+        cursor=cursor,
+        full=full,
+        categories=[_cat_to_response(c) for c in categories],
+        incomes=[_income_to_response(i) for i in incomes],
+        expenses=[_expense_to_response(row[0], cat_name=row[1], cat_icon=row[2]) for row in expenses],
+        settlements=[_settlement_to_response(s) for s in settlements],
+        recurring=[_recurring_to_response(row[0], cat_name=row[1]) for row in recurring],
+        deleted=deleted,
+    )
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+import datetime
 from datetime import date
 
 
@@ -39,6 +40,16 @@ class IncomeResponse(BaseModel):
     created_at: str
 
 
+class IncomeListResponse(BaseModel):
+    incomes: list[IncomeResponse]
+    next_cursor: Optional[str]  # pass back as ?cursor= for the next page
+
+
+class HistorySummary(BaseModel):
+    count: int
+    total: float
+
+
 class SplitRatio(BaseModel):
     user_a_id: str
     user_a_income: float
@@ -73,12 +84,18 @@ class CategoryResponse(BaseModel):
     created_at: str
 
 
+class CategoryMergeResult(BaseModel):
+    target: CategoryResponse
+    expenses_moved: int
+    recurring_moved: int
+
+
 # ── Expense ───────────────────────────────────────────────────────────
 
 class ExpenseCreate(BaseModel):
     amount: float = Field(..., gt=0)
     description: str = Field(..., min_length=1, max_length=500)
-    date: date = Field(default_factory=date.today)
+    date: datetime.date = Field(default_factory=date.today)
     category_id: Optional[str] = None
     paid_by: Optional[str] = None  # defaults to current user
     split_type: str = Field("shared", pattern=r"^(shared|personal|equal)$")
@@ -90,7 +107,7 @@ class ExpenseCreate(BaseModel):
 class ExpenseUpdate(BaseModel):
     amount: Optional[float] = Field(None, gt=0)
     description: Optional[str] = Field(None, min_length=1, max_length=500)
-    date: Optional[date] = None
+    date: Optional[datetime.date] = None
     category_id: Optional[str] = None
     paid_by: Optional[str] = None
     split_type: Optional[str] = Field(None, pattern=r"^(shared|personal|equal)$")
@@ -122,13 +139,109 @@ class ExpenseListResponse(BaseModel):
     per_page: int
 
 
+class ExpenseFilterSet(BaseModel):
+    """The filters accepted by ``GET /api/expenses``, for selecting rows in bulk."""
+    year: Optional[int] = Field(None, ge=1, le=9998)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    category_id: Optional[str] = None
+    paid_by: Optional[str] = None
+    split_type: Optional[str] = Field(None, pattern=r"^(shared|personal|equal)$")
+    tags_all: Optional[list[str]] = None
+    tags_any: Optional[list[str]] = None
+
+
+class ExpenseBulkSelection(BaseModel):
+    # Exactly one of ids / filters
+    ids: Optional[list[str]] = Field(None, min_length=1, max_length=10000)
+    filters: Optional[ExpenseFilterSet] = None
+
+
+class ExpenseBulkChanges(BaseModel):
+    category_id: Optional[str] = None
+    paid_by: Optional[str] = None
+    split_type: Optional[str] = Field(None, pattern=r"^(shared|personal|equal)$")
+    date: Optional[datetime.date] = None
+    add_tags: list[str] = Field(default_factory=list)
+    remove_tags: list[str] = Field(default_factory=list)
+
+
+class ExpenseBulkUpdate(ExpenseBulkSelection):
+    changes: ExpenseBulkChanges
+
+
+class ExpenseBulkResult(BaseModel):
+    count: int
+    ids: list[str]
+
+
+class DuplicateGroup(BaseModel):
+    expenses: list[ExpenseResponse]  # oldest first
+    min_similarity: float  # weakest description match within the group
+    max_days_apart: int
+
+
+class DuplicateResolution(BaseModel):
+    keep: str
+    remove: list[str] = Field(..., min_length=1)
+
+
+class DuplicateResolve(BaseModel):
+    groups: list[DuplicateResolution] = Field(..., min_length=1, max_length=1000)
+    # Fold tags, and notes/category/receipt where the kept row has none,
+    # from the removed rows into the kept one before deleting them
+    merge: bool = True
+
+
+class DuplicateResolveResult(BaseModel):
+    removed: int
+    merged: int
+    ids: list[str]  # removed expense ids
+
+
+class CsvImportOptions(BaseModel):
+    """Column mapping and formats for ``POST /api/import/csv`` (query parameters)."""
+    # Header names, or 0-based column indexes when the file has no header
+    date_column: str = "date"
+    amount_column: str = "amount"
+    description_column: str = "description"
+    notes_column: Optional[str] = None
+    has_header: bool = True
+    date_format: str = "%Y-%m-%d"
+    decimal_comma: bool = False  # 1.234,56 rather than 1,234.56
+    # Which amounts are expenses: debits shown as negative (the usual bank
+    # export), positive amounts, or every row as its absolute value
+    expense_sign: str = Field("negative", pattern=r"^(negative|positive|any)$")
+    delimiter: str = Field(",", min_length=1, max_length=1)
+    encoding: str = "utf-8-sig"
+    paid_by: Optional[str] = None  # defaults to current user
+    category_id: Optional[str] = None
+    split_type: str = Field("shared", pattern=r"^(shared|personal|equal)$")
+    tags: list[str] = Field(default_factory=lambda: ["imported"])
+    dry_run: bool = False
+
+
+class CsvImportError(BaseModel):
+    line: int
+    error: str
+
+
+class CsvImportResult(BaseModel):
+    dry_run: bool
+    rows: int  # data rows read
+    imported: int  # inserted, or that would be inserted on a dry run
+    duplicates: int  # already recorded; repeats within the file count only up to what's recorded
+    skipped: int  # not expenses under expense_sign, e.g. credits
+    errors: int
+    error_samples: list[CsvImportError]
+
+
 # ── Settlement ────────────────────────────────────────────────────────
 
 class SettlementCreate(BaseModel):
     from_user: str
     to_user: str
     amount: float = Field(..., gt=0)
-    date: date = Field(default_factory=date.today)
+    date: datetime.date = Field(default_factory=date.today)
     notes: Optional[str] = Field(None, max_length=500)
 
 
@@ -142,6 +255,11 @@ class SettlementResponse(BaseModel):
     created_at: str
 
 
+class SettlementListResponse(BaseModel):
+    settlements: list[SettlementResponse]
+    next_cursor: Optional[str]  # pass back as ?cursor= for the next page
+
+
 # ── Recurring ─────────────────────────────────────────────────────────
 
 class RecurringCreate(BaseModel):
@@ -190,6 +308,22 @@ class BalanceResponse(BaseModel):
     user_b_fair_share: float
     net_balance: float  # positive = A owes B, negative = B owes A
     settlements_total: float
+    closed_through: Optional[str] = None  # latest checkpoint the totals start from
+
+
+class BalanceClose(BaseModel):
+    # Defaults to yesterday; today stays open so new entries never land in a closed period
+    through_date: Optional[datetime.date] = None
+
+
+class BalanceCheckpointResponse(BaseModel):
+    id: str
+    through_date: str
+    user_a_paid: float
+    user_b_paid: float
+    settlements_total: float
+    stale: bool
+    created_at: str
 
 
 class MonthlySummary(BaseModel):
@@ -219,6 +353,147 @@ class MonthlyTrend(BaseModel):
     personal: float
 
 
+class TrendPoint(BaseModel):
+    period: str  # period start, "2026-01-01"
+    total: float
+    shared: float
+    personal: float
+    equal: float
+    count: int
+
+
+class TrendSeries(BaseModel):
+    key: Optional[str]  # category id or payer id; None for uncategorized
+    label: str
+    points: list[TrendPoint]
+
+
+class TrendResponse(BaseModel):
+    granularity: str
+    start: str
+    end: str  # exclusive
+    totals: list[TrendPoint]
+    series: list[TrendSeries]
+
+
+class PeriodComparison(BaseModel):
+    current: float
+    previous: float  # the month before
+    last_year: float  # the same month a year earlier
+    delta_previous: float  # current - previous
+    delta_last_year: float
+    pct_previous: Optional[float]  # None when the base period is zero
+    pct_last_year: Optional[float]
+
+
+class PayerComparison(BaseModel):
+    user_a: PeriodComparison
+    user_b: PeriodComparison
+    difference: float  # current-period user_a - user_b
+
+
+class CategoryComparison(BaseModel):
+    category_id: Optional[str]
+    category_name: str
+    total: PeriodComparison
+    by_payer: PayerComparison
+
+
+class CompareResponse(BaseModel):
+    current: str  # "2026-10"
+    previous: str
+    last_year: str
+    total: PeriodComparison
+    by_payer: PayerComparison
+    categories: list[CategoryComparison]  # by current spend, descending
+
+
+class ForecastMonth(BaseModel):
+    month: str  # "2026-11"
+    recurring: float
+    discretionary: float
+    total: float
+    shared: float
+    personal: float
+    equal: float
+    user_a_share: float  # fair share at the current income ratio
+    user_b_share: float
+
+
+class ForecastCategory(BaseModel):
+    category_id: Optional[str]
+    category_name: str
+    recurring: float  # projected over the whole horizon
+    discretionary: float
+
+
+class ForecastResponse(BaseModel):
+    history_months: int  # full months the discretionary averages are taken over
+    user_a_ratio: float
+    user_b_ratio: float
+    months: list[ForecastMonth]
+    categories: list[ForecastCategory]  # by projected total, descending
+
+
+class TagSpending(BaseModel):
+    tag: str
+    total: float
+    count: int
+
+
+# ── Budgets ───────────────────────────────────────────────────────────
+
+class BudgetStatus(BaseModel):
+    category_id: str
+    category_name: str
+    category_icon: Optional[str]
+    budget: float
+    spent: float
+    remaining: float
+    percent_used: float
+    projected: float  # month-end spend at the current burn rate
+    count: int
+
+
+class BudgetStatusResponse(BaseModel):
+    year: int
+    month: int
+    days_elapsed: int
+    days_in_month: int
+    categories: list[BudgetStatus]
+
+
+# ── Sync ──────────────────────────────────────────────────────────────
+
+class SyncDeletion(BaseModel):
+    table: str
+    id: str
+
+
+class SyncResponse(BaseModel):
+    cursor: int  # pass back as ?since= on the next call
+    full: bool  # True when this is a complete snapshot rather than a delta
+    categories: list[CategoryResponse]
+    incomes: list[IncomeResponse]
+    expenses: list[ExpenseResponse]
+    settlements: list[SettlementResponse]
+    recurring: list[RecurringResponse]
+    deleted: list[SyncDeletion]
+
+
+# ── Export ────────────────────────────────────────────────────────────
+
+class ExportJobResponse(BaseModel):
+    id: str
+    status: str  # queued | running | done | failed
+    data_version: int
+    size: Optional[int]
+    error: Optional[str]
+    created_at: str
+    finished_at: Optional[str]
+    download_url: Optional[str]
+
+
 # ── Search ────────────────────────────────────────────────────────────
 
 class SearchResult(BaseModel):
@@ -228,3 +503,13 @@ class SearchResult(BaseModel):
     date: str
     paid_by: str
     snippet: str
+
+
+class DescriptionSuggestion(BaseModel):
+    description: str
+    count: int
+    category_id: Optional[str]
+    category_name: Optional[str]
+    category_icon: Optional[str]
+    split_type: str
+    last_amount: float
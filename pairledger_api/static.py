@@ -0,0 +1,106 @@
+"""SPA asset serving with precompressed variants and long-lived caching.
+
+``precompress`` writes ``.gz`` (and ``.br`` when the optional ``brotli``
+package is installed) next to every compressible file in the build once, at
+startup; later starts reuse variants that are newer than their source.
+Requests pick the best variant their ``Accept-Encoding`` allows, so nothing
+is compressed per request.
+
+Vite emits content-hashed bundles under ``assets/``, which are served as
+``immutable`` for a year; ``index.html`` and other unhashed files are
+revalidated against their ETag on every load.
+"""
+import gzip
+import logging
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from .compression import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # optional; gzip variants only
+    brotli = None
+
+logger = logging.getLogger("pairledger.static")
+
+COMPRESSIBLE = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".webmanifest", ".ico"}
+MIN_SIZE = 1024
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[a-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def _fresh(variant: Path, source: Path) -> bool:
+    return variant.exists() and variant.stat().st_mtime >= source.stat().st_mtime
+
+
+class SPAStaticFiles(StaticFiles):
+    def __init__(self, directory: str | os.PathLike, **kwargs):
+        super().__init__(directory=directory, html=True, **kwargs)
+        self.root = Path(os.path.realpath(directory))
+        # source file path -> {encoding: (variant path, variant stat)}
+        self.variants: dict[str, dict[str, tuple[str, os.stat_result]]] = {}
+
+    def precompress(self) -> None:
+        """Create missing or outdated compressed variants; runs in a worker thread."""
+        written = 0
+        for source in self.root.rglob("*"):
+            if not source.is_file() or source.suffix not in COMPRESSIBLE or source.stat().st_size < MIN_SIZE:
+                continue
+            data = None
+            encodings = {}
+            targets = [("gzip", source.with_name(source.name + ".gz"))]
+            if brotli is not None:
+                targets.insert(0, ("br", source.with_name(source.name + ".br")))
+            for encoding, variant in targets:
+                if not _fresh(variant, source):
+                    data = data if data is not None else source.read_bytes()
+                    packed = brotli.compress(data, quality=11) if encoding == "br" else gzip.compress(data, 9, mtime=0)
+                    if len(packed) >= len(data):
+                        continue
+                    tmp = variant.with_name(variant.name + ".tmp")
+                    tmp.write_bytes(packed)
+                    tmp.replace(variant)
+                    written += 1
+                encodings[encoding] = (str(variant), variant.stat())
+            if encodings:
+                self.variants[os.path.realpath(source)] = encodings
+        logger.info("Static assets: %d precompressed, %d written", len(self.variants), written)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        relative = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+        headers = {"Cache-Control": IMMUTABLE if HASHED_ASSET.match(relative) else REVALIDATE}
+
+        serve_path, media_type = full_path, None
+        # full_path comes from lookup_path, already resolved like the keys
+        variants = self.variants.get(full_path)
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding in ("br", "gzip"):
+                if encoding in variants and encoding in accepted:
+                    serve_path, stat_result = variants[encoding]
+                    headers["Content-Encoding"] = encoding
+                    # Type of the original file, not of the .br/.gz
+                    media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+                    break
+
+        response = FileResponse(
+            serve_path, status_code=status_code, stat_result=stat_result, headers=headers, media_type=media_type,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def startup(self) -> None:
+        if self.root.exists():
+            await anyio.to_thread.run_sync(self.precompress)
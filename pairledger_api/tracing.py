@@ -0,0 +1,311 @@
+"""In-process tracing: request → route → handler sections → SQL.
+
+``TracingMiddleware`` opens a root span per HTTP request and keeps the span
+tree in a context var; ``TracedRoute`` adds a span for the route with
+synthetic children for dependency resolution (auth, household lookup,
+limits), the handler body and response serialization; SQL statements become
+child spans via engine events; ``span("name")`` marks sections inside
+handlers.
+
+Spans are always recorded (they're a few small objects per request), and the
+decision to export is made when the request finishes: a trace is exported if
+it was head-sampled (``trace_sample_rate``, or a sampled W3C ``traceparent``
+from the caller), took longer than ``trace_slow_ms`` or failed. Exported
+traces are OTLP/JSON ``ExportTraceServiceRequest`` documents, appended one
+per line to ``data_dir/traces/traces-<date>.jsonl`` or POSTed to
+``trace_otlp_endpoint`` by a background thread.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
+from functools import wraps
+from pathlib import Path
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from .config import settings
+
+logger = logging.getLogger("pairledger.tracing")
+
+TRACES_DIR = Path(settings.data_dir) / "traces"
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: str | None, kind: int = INTERNAL, start_ns: int | None = None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes: dict = {}
+        self.error = False
+        trace.spans.append(self)
+
+    def end(self, end_ns: int | None = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+
+    def to_otlp(self) -> dict:
+        out = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2} if self.error else {},
+        }
+        if self.parent_id:
+            out["parentSpanId"] = self.parent_id
+        return out
+
+
+class Trace:
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, trace_id: str | None, sampled: bool):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.sampled = sampled
+        self.spans: list[Span] = []
+
+
+def _otlp_value(v) -> dict:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+_current: ContextVar[Span | None] = ContextVar("pairledger_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a child of the current span; a no-op outside a traced request."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    s = Span(parent.trace, name, parent.span_id)
+    s.attributes.update(attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException:
+        s.error = True
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+# ── Export ───────────────────────────────────────────────────────────────
+
+class _Exporter:
+    """Batches finished traces on a queue and writes them from a daemon thread."""
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._day: date | None = None
+
+    def submit(self, trace: Trace) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(trace)
+
+    def _run(self) -> None:
+        client = httpx.Client(timeout=5.0) if settings.trace_otlp_endpoint else None
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + 1.0
+            while len(batch) < 100 and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch, client)
+            except Exception:
+                logger.exception("Failed to export %d traces", len(batch))
+
+    @staticmethod
+    def _prune(today: date) -> None:
+        TRACES_DIR.mkdir(parents=True, exist_ok=True)
+        cutoff = (today - timedelta(days=settings.trace_retention_days)).isoformat()
+        for path in TRACES_DIR.glob("traces-*.jsonl"):
+            if path.stem.removeprefix("traces-") < cutoff:
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _document(batch: list[Trace]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": settings.app_id}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "pairledger_api.tracing"},
+                    "spans": [s.to_otlp() for trace in batch for s in trace.spans],
+                }],
+            }],
+        }
+
+    def _write(self, batch: list[Trace], client: httpx.Client | None) -> None:
+        document = self._document(batch)
+        if client is not None:
+            client.post(settings.trace_otlp_endpoint, json=document).raise_for_status()
+            return
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._prune(today)
+        with open(TRACES_DIR / f"traces-{today.isoformat()}.jsonl", "a") as f:
+            f.write(json.dumps(document, separators=(",", ":")) + "\n")
+
+
+_exporter = _Exporter()
+
+
+# ── Request, route and SQL instrumentation ───────────────────────────────
+
+def _parse_traceparent(scope) -> tuple[str | None, str | None, bool]:
+    for name, value in scope["headers"]:
+        if name == b"traceparent":
+            parts = value.decode("latin-1").split("-")
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                return parts[1], parts[2], parts[3] == "01"
+    return None, None, False
+
+
+class TracingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.trace_enabled:
+            return await self.app(scope, receive, send)
+
+        trace_id, parent_id, upstream_sampled = _parse_traceparent(scope)
+        trace = Trace(trace_id, upstream_sampled or random.random() < settings.trace_sample_rate)
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, kind=SERVER)
+        root.attributes.update({"http.method": scope["method"], "http.target": scope["path"]})
+        token = _current.set(root)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            root.end()
+            matched = scope.get("route")
+            if matched is not None and getattr(matched, "path", None):
+                root.name = f"{scope['method']} {matched.path}"
+                root.attributes["http.route"] = matched.path
+            root.attributes["http.status_code"] = status
+            root.error = status >= 500
+            duration_ms = (root.end_ns - root.start_ns) / 1e6
+            if trace.sampled or root.error or duration_ms >= settings.trace_slow_ms:
+                _exporter.submit(trace)
+
+
+# When the endpoint body finished, so the route span can tell handler time
+# from response serialization
+_handler_end: ContextVar[int | None] = ContextVar("pairledger_handler_end", default=None)
+
+
+class TracedRoute(APIRoute):
+    """Route that splits its time into dependencies, handler and serialization spans."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        @wraps(endpoint)
+        async def traced_endpoint(*args, **kw):
+            route_span = _current.get()
+            if route_span is None:
+                return await endpoint(*args, **kw)
+            Span(route_span.trace, "dependencies", route_span.span_id, start_ns=route_span.start_ns).end()
+            with span("handler"):
+                result = await endpoint(*args, **kw)
+            _handler_end.set(time.time_ns())
+            return result
+
+        super().__init__(path, traced_endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            token = _handler_end.set(None)
+            try:
+                with span(f"route {self.path}") as s:
+                    response = await handler(request)
+                    handler_end = _handler_end.get()
+                    if s is not None and handler_end is not None:
+                        Span(s.trace, "serialize", s.span_id, start_ns=handler_end).end()
+                return response
+            finally:
+                _handler_end.reset(token)
+
+        return traced_handler
+
+
+def trace_sql(sync_engine) -> None:
+    """Record every statement on ``sync_engine`` as a child of the current span."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        parent = _current.get()
+        if parent is None:
+            conn.info.setdefault("trace_spans", []).append(None)
+            return
+        s = Span(parent.trace, "db.query", parent.span_id, kind=CLIENT)
+        s.attributes.update({"db.system": "postgresql", "db.statement": statement[:1000]})
+        conn.info.setdefault("trace_spans", []).append(s)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        s = conn.info["trace_spans"].pop()
+        if s is not None:
+            s.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("trace_spans"):
+            s = conn.info["trace_spans"].pop()
+            if s is not None:
+                s.error = True
+                s.end()
@@ -0,0 +1,47 @@
+"""Single-round-trip write helpers.
+
+Each helper issues one ``INSERT``/``UPDATE``/``DELETE ... RETURNING``
+statement and commits. For tables with a ``category_id`` the returned row is
+wrapped in a CTE and joined to ``categories``, so responses that show the
+category name need neither a ``refresh()`` nor a follow-up lookup.
+"""
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Base, Category
+
+
+def _with_category(written):
+    if "category_id" not in written.c:
+        return select(written)
+    return (
+        select(written, Category.name.label("category_name"), Category.icon.label("category_icon"))
+        .outerjoin(Category, Category.id == written.c.category_id)
+    )
+
+
+async def insert_returning(db: AsyncSession, model: type[Base], values: dict) -> Row:
+    """Insert one row and return it, with ``category_name``/``category_icon`` where applicable."""
+    written = insert(model).values(**values).returning(*model.__table__.c).cte("written")
+    row = (await db.execute(_with_category(written))).one()
+    await db.commit()
+    return row
+
+
+async def update_returning(db: AsyncSession, model: type[Base], conditions: list, values: dict) -> Row | None:
+    """Update the row matching ``conditions`` and return it, or None if nothing matched."""
+    if values:
+        written = update(model).where(*conditions).values(**values).returning(*model.__table__.c).cte("written")
+    else:
+        written = select(model.__table__).where(*conditions).cte("written")
+    row = (await db.execute(_with_category(written))).one_or_none()
+    await db.commit()
+    return row
+
+
+async def delete_returning(db: AsyncSession, model: type[Base], conditions: list) -> bool:
+    """Delete the row matching ``conditions``; returns whether a row was deleted."""
+    deleted = (await db.execute(delete(model).where(*conditions).returning(model.id))).first()
+    await db.commit()
+    return deleted is not None
@@ -0,0 +1,111 @@
+"""CPU cost vs. bytes saved for response compression on typical payloads.
+
+    python scripts/bench_compression.py [--repeat 20]
+
+Payloads are synthetic but shaped like the real responses: a 100-row
+expense page with notes and tags, five years of monthly trends split by
+category, and a 5,000-expense export streamed in 64 KiB chunks (each chunk
+sync-flushed, as CompressionMiddleware does). Brotli rows appear when the
+``brotli`` package is installed.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pairledger_api.compression import BrotliStream, GzipStream, brotli  # noqa: E402
+
+WORDS = (
+    "groceries market rent utilities dinner takeaway fuel parking train coffee pharmacy gift "
+    "insurance internet phone gym cinema hardware garden pet vet books clothes shoes repair"
+).split()
+CATEGORIES = [(str(uuid.uuid4()), name) for name in ("Groceries", "Rent", "Utilities", "Dining", "Transport",
+                                                      "Health", "Home", "Fun", "Gifts", "Travel")]
+USERS = [str(uuid.uuid4()), str(uuid.uuid4())]
+
+
+def _expense(rng: random.Random, day: date) -> dict:
+    cat_id, cat_name = rng.choice(CATEGORIES)
+    return {
+        "id": str(uuid.uuid4()),
+        "paid_by": rng.choice(USERS),
+        "category_id": cat_id,
+        "category_name": cat_name,
+        "category_icon": None,
+        "amount": round(rng.uniform(2, 400), 2),
+        "description": " ".join(rng.choices(WORDS, k=rng.randint(1, 4))),
+        "date": day.isoformat(),
+        "split_type": rng.choice(["shared", "shared", "equal", "personal"]),
+        "notes": " ".join(rng.choices(WORDS, k=rng.randint(0, 30))) or None,
+        "tags": rng.sample(WORDS, rng.randint(0, 3)),
+        "receipt_url": None,
+        "created_at": f"{day.isoformat()}T12:{rng.randint(10, 59)}:00+00:00",
+    }
+
+
+def payloads() -> dict[str, list[bytes]]:
+    rng = random.Random(42)
+    today = date(2026, 10, 1)
+    page = {
+        "expenses": [_expense(rng, today - timedelta(days=i // 3)) for i in range(100)],
+        "total": 4213, "page": 1, "per_page": 100,
+    }
+    months = [date(today.year - 5 + (today.month + i) // 12, (today.month + i) % 12 + 1, 1) for i in range(60)]
+    trends = {
+        "granularity": "month",
+        "series": [
+            {"key": cid, "label": name,
+             "points": [{"period": m.isoformat(), "total": round(rng.uniform(0, 900), 2), "count": rng.randint(0, 40)}
+                        for m in months]}
+            for cid, name in CATEGORIES
+        ],
+    }
+    export = json.dumps({
+        "expenses": [_expense(rng, today - timedelta(days=i // 4)) for i in range(5000)],
+    }).encode()
+    return {
+        "expense page (100 rows)": [json.dumps(page).encode()],
+        "trends (5y x 10 series)": [json.dumps(trends).encode()],
+        "export (5k rows, 64K chunks)": [export[i:i + 65536] for i in range(0, len(export), 65536)],
+    }
+
+
+def encoders():
+    for level in (1, 4, 6, 9):
+        yield f"gzip-{level}", lambda level=level: GzipStream(level)
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f"br-{quality}", lambda quality=quality: BrotliStream(quality)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'payload':30} {'encoder':8} {'raw KiB':>9} {'out KiB':>9} {'saved':>7} {'ms':>8} {'MiB/s':>8} {'KiB saved/ms':>13}")
+    for name, chunks in payloads().items():
+        raw = sum(len(c) for c in chunks)
+        for label, factory in encoders():
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                stream = factory()
+                out = sum(len(stream.compress(c, final=i == len(chunks) - 1)) for i, c in enumerate(chunks))
+                best = min(best, time.perf_counter() - started)
+            ms = best * 1000
+            print(
+                f"{name:30} {label:8} {raw / 1024:9.1f} {out / 1024:9.1f} {1 - out / raw:7.1%} "
+                f"{ms:8.2f} {raw / 2**20 / best:8.1f} {(raw - out) / 1024 / ms:13.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Stand-in for the platform auth service, for local runs and tests.
+
+    python scripts/dev_auth_server.py [--port 8001]
+    SHELF_AUTH_URL=http://localhost:8001 uvicorn pairledger_api.main:app
+
+Generates an RSA key at startup and serves it as a JWKS at
+``/.well-known/jwks.json``; ``POST /token?sub=<user id>`` issues a signed
+RS256 token for that user, ``POST /rotate`` switches to a fresh key (the old
+one stays published so outstanding tokens keep verifying). ``jwks_requests``
+counts key fetches, for tests.
+"""
+import argparse
+import base64
+import os
+import time
+
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI
+from jose import jwt
+
+app = FastAPI(title="dev auth")
+keys: list[tuple[str, rsa.RSAPrivateKey]] = []
+jwks_requests = 0
+
+
+def _b64(n: int) -> str:
+    return base64.urlsafe_b64encode(n.to_bytes((n.bit_length() + 7) // 8, "big")).rstrip(b"=").decode()
+
+
+def _new_key() -> None:
+    keys.append((os.urandom(8).hex(), rsa.generate_private_key(public_exponent=65537, key_size=2048)))
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    global jwks_requests
+    jwks_requests += 1
+    return {"keys": [
+        {"kty": "RSA", "use": "sig", "alg": "RS256", "kid": kid,
+         "n": _b64(key.public_key().public_numbers().n), "e": _b64(key.public_key().public_numbers().e)}
+        for kid, key in keys
+    ]}
+
+
+@app.post("/token")
+async def token(sub: str, email: str | None = None, ttl: int = 3600):
+    kid, key = keys[-1]
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    now = int(time.time())
+    claims = {"sub": sub, "iat": now, "exp": now + ttl}
+    if email:
+        claims["email"] = email
+    return {"access_token": jwt.encode(claims, pem.decode(), algorithm="RS256", headers={"kid": kid})}
+
+
+@app.post("/rotate")
+async def rotate():
+    _new_key()
+    return {"kid": keys[-1][0]}
+
+
+_new_key()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8001)
+    uvicorn.run(app, host="127.0.0.1", port=parser.parse_args().port)
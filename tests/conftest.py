@@ -0,0 +1,26 @@
+"""Stand-in for the platform auth package when it isn't installed.
+
+``shelf_auth_middleware`` is only installed in the Docker image (from
+platform/shared); outside it a minimal ``ShelfUser`` and a rejecting
+``get_current_user`` are registered so ``pairledger_api.auth`` imports.
+"""
+import sys
+import types
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+try:
+    import shelf_auth_middleware  # noqa: F401
+except ImportError:
+    class ShelfUser(BaseModel):
+        id: str
+        email: str | None = None
+
+    async def get_current_user():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    stub = types.ModuleType("shelf_auth_middleware")
+    stub.ShelfUser = ShelfUser
+    stub.get_current_user = get_current_user
+    sys.modules["shelf_auth_middleware"] = stub
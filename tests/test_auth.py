@@ -0,0 +1,124 @@
+"""Local token verification against the stand-in auth server (scripts/dev_auth_server.py)."""
+import asyncio
+import importlib.util
+import socket
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import HTTPException
+from jose import jwt
+from starlette.requests import Request
+
+from pairledger_api import auth
+
+DEV_SERVER = Path(__file__).parent.parent / "scripts" / "dev_auth_server.py"
+
+
+@pytest.fixture(scope="module")
+def dev_auth():
+    spec = importlib.util.spec_from_file_location("dev_auth_server", DEV_SERVER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(module.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    module.url = f"http://127.0.0.1:{port}"
+    yield module
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def keys(dev_auth, monkeypatch):
+    """Fresh key set and token cache pointed at the dev server."""
+    signing_keys = auth.SigningKeys(f"{dev_auth.url}/.well-known/jwks.json", refresh_interval=300)
+    monkeypatch.setattr(auth, "signing_keys", signing_keys)
+    monkeypatch.setattr(auth, "token_cache", auth.TokenCache(max_entries=16, ttl=60))
+    monkeypatch.setattr(auth, "ALGORITHMS", ["RS256"])
+    monkeypatch.setattr(auth.settings, "auth_jwt_secret", None)
+    monkeypatch.setattr(auth.settings, "auth_jwt_audience", None)
+    monkeypatch.setattr(auth.settings, "auth_jwt_issuer", None)
+    asyncio.run(signing_keys.refresh())
+    return signing_keys
+
+
+def issue(dev_auth, **params) -> str:
+    params.setdefault("sub", "00000000-0000-0000-0000-0000000000a1")
+    return httpx.post(f"{dev_auth.url}/token", params=params).json()["access_token"]
+
+
+def verify(token: str):
+    request = Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+    return asyncio.run(auth.verify_request(request))
+
+
+def assert_unauthorized(token: str):
+    with pytest.raises(HTTPException) as exc:
+        verify(token)
+    assert exc.value.status_code == 401
+
+
+def test_valid_token(dev_auth, keys):
+    user = verify(issue(dev_auth, email="a@example.com"))
+    assert user.id == "00000000-0000-0000-0000-0000000000a1"
+
+
+def test_expired_token(dev_auth, keys):
+    assert_unauthorized(issue(dev_auth, ttl=-60))
+
+
+def test_wrong_algorithm(dev_auth, keys):
+    kid = next(iter(keys.keys))
+    claims = {"sub": "00000000-0000-0000-0000-0000000000a1", "exp": int(time.time()) + 60}
+    assert_unauthorized(jwt.encode(claims, "not-the-key", algorithm="HS256", headers={"kid": kid}))
+
+
+def test_unknown_kid_after_rotate(dev_auth, keys):
+    keys.min_refresh_interval = 0
+    httpx.post(f"{dev_auth.url}/rotate")
+    fetches = dev_auth.jwks_requests
+    user = verify(issue(dev_auth))
+    assert user.id == "00000000-0000-0000-0000-0000000000a1"
+    assert dev_auth.jwks_requests == fetches + 1
+
+
+def test_unknown_kid_burst_refreshes_once(dev_auth, keys):
+    keys.min_refresh_interval = 0.5
+    time.sleep(0.5)
+    fetches = dev_auth.jwks_requests
+    claims = {"sub": "00000000-0000-0000-0000-0000000000a1", "exp": int(time.time()) + 60}
+    forged = [jwt.encode(claims, "x", algorithm="HS256", headers={"kid": f"forged-{i}"}) for i in range(10)]
+
+    async def burst():
+        requests = [Request({"type": "http", "headers": [(b"authorization", f"Bearer {t}".encode())]}) for t in forged]
+        return await asyncio.gather(*(auth.verify_request(r) for r in requests), return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert all(isinstance(r, HTTPException) and r.status_code == 401 for r in results)
+    assert dev_auth.jwks_requests == fetches + 1
+
+
+def test_cache_hit_skips_key_fetch(dev_auth, keys):
+    token = issue(dev_auth)
+    verify(token)
+    fetches = dev_auth.jwks_requests
+    verify(token)
+    assert auth.token_cache.hits == 1
+    assert dev_auth.jwks_requests == fetches
+
+
+def test_missing_user_fields_is_unauthorized(dev_auth, keys, monkeypatch):
+    def reject(claims):
+        raise ValueError("missing field")
+
+    monkeypatch.setattr(auth, "_user_from_claims", reject)
+    assert_unauthorized(issue(dev_auth))